@@ -0,0 +1,50 @@
+"""
+Buffered analytics writes for hot request paths.
+
+Events are held in memory per process and written with one ``bulk_create``
+once ``ANALYTICS_BUFFER_SIZE`` accumulate, at most ``ANALYTICS_BUFFER_INTERVAL``
+seconds after the first one is buffered, and when the process exits (see
+``core.buffers``). Each event keeps the time it was recorded, not the time
+of the flush.
+"""
+import logging
+from django.utils import timezone
+from core.buffers import WriteBuffer
+from .models import AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsEventBuffer(WriteBuffer):
+    """Accumulate analytics events in memory and insert them in batches"""
+
+    size_setting = 'ANALYTICS_BUFFER_SIZE'
+    default_size = 100
+    interval_setting = 'ANALYTICS_BUFFER_INTERVAL'
+    default_interval = 10
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def record(self, **fields):
+        fields.setdefault('timestamp', timezone.now())
+        with self.lock:
+            self.events.append(AnalyticsEvent(**fields))
+            size = len(self.events)
+        self.pending_added(size)
+
+    def take(self):
+        events, self.events = self.events, []
+        return events
+
+    def write(self, events):
+        try:
+            return len(AnalyticsEvent.objects.bulk_create(events, batch_size=500))
+        except Exception as e:
+            # Analytics must never fail the request that happened to trigger the flush
+            logger.warning('Dropped %s buffered analytics events: %s', len(events), e)
+            return 0
+
+
+analytics_buffer = AnalyticsEventBuffer()
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from core.models import TimeStampedModel
 
 User = get_user_model()
@@ -99,7 +100,8 @@ class AnalyticsEvent(TimeStampedModel):
     referrer = models.URLField(blank=True)
     
     # Timestamp
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add so buffered events keep the time they happened
+    timestamp = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-timestamp']
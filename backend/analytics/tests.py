@@ -0,0 +1,38 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+from chat.models import ChatSession
+from chat.services import track_chat_query
+from core.testing import CacheTestCase
+from .buffer import AnalyticsEventBuffer
+from .models import AnalyticsEvent
+
+
+class AnalyticsEventBufferTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.buffer = AnalyticsEventBuffer()
+
+    def tearDown(self):
+        self.buffer.flush()
+
+    def test_buffered_event_keeps_the_time_it_was_recorded(self):
+        before_midnight = datetime(2026, 3, 1, 23, 59, 58, tzinfo=dt_timezone.utc)
+        with mock.patch('core.buffers.threading.Timer') as timer, \
+                mock.patch('analytics.buffer.timezone.now', return_value=before_midnight):
+            self.buffer.record(event_type='chat_query', session_id='visitor')
+
+        timer.assert_called_once_with(10, self.buffer.flush_from_timer)
+        self.assertEqual(AnalyticsEvent.objects.count(), 0)
+        self.buffer.flush()
+
+        self.assertEqual(AnalyticsEvent.objects.get().timestamp, before_midnight)
+
+    def test_background_chat_queries_are_written_straight_away(self):
+        session = ChatSession.objects.create(session_id='visitor')
+        with mock.patch('chat.services.analytics_buffer.record') as record:
+            track_chat_query(None, session, 'Hello', 120, 'general', 'professional', 'medium', 10)
+
+        record.assert_not_called()
+        event = AnalyticsEvent.objects.get()
+        self.assertEqual((event.event_type, event.session_id), ('chat_query', 'visitor'))
+        self.assertEqual(event.metadata['chat_session_id'], str(session.id))
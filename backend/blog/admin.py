@@ -19,8 +19,9 @@ class BlogCategoryAdmin(admin.ModelAdmin):
     color_display.short_description = 'Color'
     
     def post_count(self, obj):
-        return obj.posts.filter(status='published').count()
+        return obj.published_post_count
     post_count.short_description = 'Posts'
+    post_count.admin_order_field = 'published_post_count'
 
 
 @admin.register(BlogPost)
@@ -47,7 +48,7 @@ class BlogPostAdmin(admin.ModelAdmin):
             'fields': ('status', 'published_at', 'is_featured', 'allow_comments')
         }),
         ('Metadata', {
-            'fields': ('reading_time', 'external_link', 'view_count'),
+            'fields': ('reading_time', 'external_link', 'view_count', 'approved_comment_count'),
             'classes': ('collapse',)
         }),
         ('SEO', {
@@ -56,18 +57,26 @@ class BlogPostAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ['view_count']
+    readonly_fields = ['view_count', 'approved_comment_count']
     
     actions = ['make_published', 'make_featured']
     
     def make_published(self, request, queryset):
-        queryset.update(status='published')
-        self.message_user(request, f"{queryset.count()} posts published.")
+        # Resolve the selection first: a changelist filtered on status would
+        # match nothing once the update has run
+        post_ids = list(queryset.values_list('pk', flat=True))
+        posts = BlogPost.objects.filter(pk__in=post_ids)
+        # Bulk update() bypasses signals, so recount the affected categories here
+        category_ids = set(posts.exclude(category=None).values_list('category_id', flat=True))
+        updated = posts.update(status='published')
+        BlogCategory.refresh_post_counts(category_ids)
+        self.message_user(request, f"{updated} posts published.")
     make_published.short_description = "Publish selected posts"
     
     def make_featured(self, request, queryset):
-        queryset.update(is_featured=True)
-        self.message_user(request, f"{queryset.count()} posts featured.")
+        post_ids = list(queryset.values_list('pk', flat=True))
+        updated = BlogPost.objects.filter(pk__in=post_ids).update(is_featured=True)
+        self.message_user(request, f"{updated} posts featured.")
     make_featured.short_description = "Feature selected posts"
 
 
@@ -90,14 +99,22 @@ class BlogCommentAdmin(admin.ModelAdmin):
     
     actions = ['approve_comments', 'mark_as_spam']
     
+    def update_comments(self, queryset, **fields):
+        """Update the selected comments by pk, so filters on the updated fields can't empty the selection"""
+        comments = BlogComment.objects.filter(pk__in=list(queryset.values_list('pk', flat=True)))
+        post_ids = set(comments.values_list('post_id', flat=True))
+        updated = comments.update(**fields)
+        BlogPost.refresh_comment_counts(post_ids)
+        return updated
+    
     def approve_comments(self, request, queryset):
-        queryset.update(is_approved=True, is_spam=False)
-        self.message_user(request, f"{queryset.count()} comments approved.")
+        updated = self.update_comments(queryset, is_approved=True, is_spam=False)
+        self.message_user(request, f"{updated} comments approved.")
     approve_comments.short_description = "Approve selected comments"
     
     def mark_as_spam(self, request, queryset):
-        queryset.update(is_spam=True, is_approved=False)
-        self.message_user(request, f"{queryset.count()} comments marked as spam.")
+        updated = self.update_comments(queryset, is_spam=True, is_approved=False)
+        self.message_user(request, f"{updated} comments marked as spam.")
     mark_as_spam.short_description = "Mark as spam"
 
 
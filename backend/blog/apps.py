@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'blog'
\ No newline at end of file
+    name = 'blog'
+    
+    def ready(self):
+        import blog.signals
\ No newline at end of file
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from ckeditor.fields import RichTextField
@@ -18,6 +20,9 @@ class BlogCategory(TimeStampedModel):
     order = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
     
+    # Denormalized counter maintained by blog.signals
+    published_post_count = models.PositiveIntegerField(default=0, editable=False)
+    
     class Meta:
         ordering = ['order', 'name']
         verbose_name = 'Blog Category'
@@ -30,6 +35,21 @@ class BlogCategory(TimeStampedModel):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def refresh_post_counts(cls, category_ids=None):
+        """Recount published posts for the given categories (all if None) in one UPDATE"""
+        published_posts = (BlogPost.objects
+                           .filter(category=OuterRef('pk'), status='published')
+                           .order_by()
+                           .values('category')
+                           .annotate(count=Count('pk'))
+                           .values('count'))
+        
+        queryset = cls.objects.all()
+        if category_ids is not None:
+            queryset = queryset.filter(pk__in=category_ids)
+        return queryset.update(published_post_count=Coalesce(Subquery(published_posts), 0))
 
 
 class BlogPost(TimeStampedModel, SEOModel):
@@ -63,6 +83,7 @@ class BlogPost(TimeStampedModel, SEOModel):
     is_featured = models.BooleanField(default=False)
     allow_comments = models.BooleanField(default=True)
     view_count = models.PositiveIntegerField(default=0)
+    approved_comment_count = models.PositiveIntegerField(default=0, editable=False)
     
     # Reading time
     reading_time = models.PositiveIntegerField(default=5, help_text="Estimated reading time in minutes")
@@ -92,6 +113,21 @@ class BlogPost(TimeStampedModel, SEOModel):
     @property
     def is_published(self):
         return self.status == 'published' and self.published_at is not None
+    
+    @classmethod
+    def refresh_comment_counts(cls, post_ids=None):
+        """Recount approved comments for the given posts (all if None) in one UPDATE"""
+        approved_comments = (BlogComment.objects
+                             .filter(post=OuterRef('pk'), is_approved=True)
+                             .order_by()
+                             .values('post')
+                             .annotate(count=Count('pk'))
+                             .values('count'))
+        
+        queryset = cls.objects.all()
+        if post_ids is not None:
+            queryset = queryset.filter(pk__in=post_ids)
+        return queryset.update(approved_comment_count=Coalesce(Subquery(approved_comments), 0))
 
 
 class BlogComment(TimeStampedModel):
@@ -112,6 +148,15 @@ class BlogComment(TimeStampedModel):
     
     # Threading (for replies)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
+    thread = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='thread_replies',
+        help_text="Top-level comment this reply belongs to (empty for top-level comments)"
+    )
+    depth = models.PositiveSmallIntegerField(default=0, help_text="Nesting level, 0 for top-level comments")
     
     # Metadata
     ip_address = models.GenericIPAddressField(null=True, blank=True)
@@ -119,12 +164,88 @@ class BlogComment(TimeStampedModel):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['post', 'parent', 'is_approved', 'created_at']),
+            models.Index(fields=['thread', 'is_approved']),
+        ]
         verbose_name = 'Blog Comment'
         verbose_name_plural = 'Blog Comments'
     
     def __str__(self):
         author_name = self.author.get_full_name() if self.author else self.author_name
         return f"Comment by {author_name} on {self.post.title}"
+    
+    def save(self, *args, **kwargs):
+        # Denormalize the thread root and nesting level from the parent
+        if self.parent_id:
+            parent = self.parent
+            if parent.parent_id and not parent.thread_id:
+                # The parent predates threading; stay unthreaded until rebuild_comment_threads runs
+                self.thread = None
+                self.depth = 0
+            else:
+                self.thread_id = parent.thread_id or parent.pk
+                self.depth = parent.depth + 1
+        else:
+            self.thread = None
+            self.depth = 0
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def attach_approved_replies(cls, roots):
+        """
+        Load the approved reply trees of the given top-level comments in one query.
+        
+        Each comment gets an ``approved_replies`` list; replies whose parent is not
+        approved are dropped together with their subtree. Replies saved before
+        ``thread`` existed (``thread`` empty, ``rebuild_comment_threads`` not yet
+        run) are found by walking ``parent`` one level per extra query.
+        """
+        roots = list(roots)
+        comments_by_id = {}
+        for root in roots:
+            root.approved_replies = []
+            comments_by_id[root.pk] = root
+        
+        if not roots:
+            return roots
+        
+        root_ids = list(comments_by_id)
+        approved = cls.objects.filter(is_approved=True).select_related('author').order_by('depth', 'created_at')
+        legacy = cls.place_replies(
+            approved.filter(Q(thread_id__in=root_ids) | Q(thread__isnull=True, parent_id__in=root_ids)),
+            comments_by_id
+        )
+        while legacy:
+            legacy = cls.place_replies(
+                approved.filter(parent_id__in=legacy).exclude(pk__in=list(comments_by_id)),
+                comments_by_id
+            )
+        
+        return roots
+    
+    @staticmethod
+    def place_replies(replies, comments_by_id):
+        """Attach replies under their placed parents; returns the ids of unthreaded ones placed"""
+        pending = list(replies)
+        legacy = []
+        # Depth ordering places parents first, except around unthreaded replies whose depth is unset
+        while pending:
+            remaining = []
+            for reply in pending:
+                parent = comments_by_id.get(reply.parent_id)
+                if parent is None:
+                    remaining.append(reply)
+                    continue
+                reply.approved_replies = []
+                parent.approved_replies.append(reply)
+                comments_by_id[reply.pk] = reply
+                if reply.thread_id is None:
+                    legacy.append(reply.pk)
+            if len(remaining) == len(pending):
+                break
+            pending = remaining
+        return legacy
 
 
 class BlogSubscriber(TimeStampedModel):
@@ -3,21 +3,18 @@ from .models import BlogCategory, BlogPost, BlogComment
 
 
 class BlogCategorySerializer(serializers.ModelSerializer):
-    post_count = serializers.SerializerMethodField()
+    post_count = serializers.IntegerField(source='published_post_count', read_only=True)
     
     class Meta:
         model = BlogCategory
         fields = ['id', 'name', 'slug', 'description', 'color', 'icon', 'post_count']
-    
-    def get_post_count(self, obj):
-        return obj.posts.filter(status='published').count()
 
 
 class BlogPostListSerializer(serializers.ModelSerializer):
     """Serializer for blog post listings"""
     category = BlogCategorySerializer(read_only=True)
     author_name = serializers.CharField(source='author.get_full_name', read_only=True)
-    comment_count = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(source='approved_comment_count', read_only=True)
     
     class Meta:
         model = BlogPost
@@ -26,9 +23,6 @@ class BlogPostListSerializer(serializers.ModelSerializer):
             'tags', 'featured_image', 'author_name', 'published_at',
             'reading_time', 'view_count', 'is_featured', 'comment_count'
         ]
-    
-    def get_comment_count(self, obj):
-        return obj.comments.filter(is_approved=True).count()
 
 
 class BlogPostDetailSerializer(serializers.ModelSerializer):
@@ -36,7 +30,7 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
     category = BlogCategorySerializer(read_only=True)
     author_name = serializers.CharField(source='author.get_full_name', read_only=True)
     author_avatar = serializers.ImageField(source='author.avatar', read_only=True)
-    comment_count = serializers.SerializerMethodField()
+    comment_count = serializers.IntegerField(source='approved_comment_count', read_only=True)
     
     class Meta:
         model = BlogPost
@@ -47,9 +41,6 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
             'reading_time', 'view_count', 'is_featured', 'allow_comments',
             'comment_count', 'meta_title', 'meta_description'
         ]
-    
-    def get_comment_count(self, obj):
-        return obj.comments.filter(is_approved=True).count()
 
 
 class BlogCommentSerializer(serializers.ModelSerializer):
@@ -76,13 +67,13 @@ class BlogCommentSerializer(serializers.ModelSerializer):
         return None
     
     def get_replies(self, obj):
-        if obj.replies.exists():
-            return BlogCommentSerializer(
-                obj.replies.filter(is_approved=True),
-                many=True,
-                context=self.context
-            ).data
-        return []
+        # Trees loaded by BlogComment.attach_approved_replies need no further queries
+        replies = getattr(obj, 'approved_replies', None)
+        if replies is None:
+            replies = obj.replies.filter(is_approved=True).select_related('author')
+        if not replies:
+            return []
+        return BlogCommentSerializer(replies, many=True, context=self.context).data
 
 
 class BlogCommentCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,50 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import BlogCategory, BlogPost, BlogComment
+
+
+@receiver(post_save, sender=BlogComment)
+@receiver(post_delete, sender=BlogComment)
+def update_post_comment_count(sender, instance, **kwargs):
+    """Keep BlogPost.approved_comment_count in step with comment moderation"""
+    BlogPost.refresh_comment_counts([instance.post_id])
+
+
+@receiver(pre_save, sender=BlogPost)
+def remember_previous_publication(sender, instance, update_fields=None, **kwargs):
+    """Capture the stored status and category so post_save can detect transitions"""
+    instance._previous_publication = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {'status', 'category'} & set(update_fields):
+        return
+    instance._previous_publication = (BlogPost.objects
+                                      .filter(pk=instance.pk)
+                                      .values_list('status', 'category_id')
+                                      .first())
+
+
+@receiver(post_save, sender=BlogPost)
+def update_category_post_count(sender, instance, created, **kwargs):
+    """Recount categories when a post is published, unpublished or recategorized"""
+    if created:
+        if instance.status == 'published' and instance.category_id:
+            BlogCategory.refresh_post_counts([instance.category_id])
+        return
+    
+    previous = getattr(instance, '_previous_publication', None)
+    if previous is None or previous == (instance.status, instance.category_id):
+        return
+    
+    previous_status, previous_category_id = previous
+    if 'published' not in (previous_status, instance.status):
+        return
+    category_ids = {previous_category_id, instance.category_id} - {None}
+    if category_ids:
+        BlogCategory.refresh_post_counts(category_ids)
+
+
+@receiver(post_delete, sender=BlogPost)
+def update_category_post_count_on_delete(sender, instance, **kwargs):
+    if instance.status == 'published' and instance.category_id:
+        BlogCategory.refresh_post_counts([instance.category_id])
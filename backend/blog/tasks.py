@@ -0,0 +1,13 @@
+from celery import shared_task
+from .models import BlogCategory, BlogPost
+
+
+@shared_task
+def reconcile_blog_counters():
+    """Recompute denormalized blog counters to correct any drift"""
+    try:
+        posts = BlogPost.refresh_comment_counts()
+        categories = BlogCategory.refresh_post_counts()
+        return f"Reconciled comment counts for {posts} posts and post counts for {categories} categories"
+    except Exception as e:
+        return f"Error reconciling blog counters: {e}"
@@ -0,0 +1,101 @@
+from unittest import mock
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from core.testing import CacheTestCase
+from .admin import BlogCommentAdmin, BlogPostAdmin
+from .models import BlogCategory, BlogPost, BlogComment
+
+User = get_user_model()
+
+
+class AttachApprovedRepliesTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        author = User.objects.create_user(email='author@example.com', username='author', password='x')
+        self.post = BlogPost.objects.create(title='Post', excerpt='Excerpt', content='Body', author=author)
+        self.root = self.comment()
+
+    def comment(self, parent=None, is_approved=True):
+        return BlogComment.objects.create(
+            post=self.post, parent=parent, author_name='Reader', author_email='reader@example.com',
+            content='Comment', is_approved=is_approved
+        )
+
+    def reply_ids(self, comment):
+        return [reply.pk for reply in comment.approved_replies]
+
+    def test_threaded_replies_load_in_one_query(self):
+        reply = self.comment(parent=self.root)
+        nested = self.comment(parent=reply)
+        self.comment(parent=reply, is_approved=False)
+
+        with self.assertNumQueries(1):
+            [root] = BlogComment.attach_approved_replies([self.root])
+
+        self.assertEqual(self.reply_ids(root), [reply.pk])
+        self.assertEqual(self.reply_ids(root.approved_replies[0]), [nested.pk])
+
+    def test_replies_saved_before_threading_are_still_attached(self):
+        reply = self.comment(parent=self.root)
+        nested = self.comment(parent=reply)
+        # As stored before thread and depth were added
+        BlogComment.objects.filter(pk__in=[reply.pk, nested.pk]).update(thread=None, depth=0)
+
+        [root] = BlogComment.attach_approved_replies([self.root])
+
+        self.assertEqual(self.reply_ids(root), [reply.pk])
+        self.assertEqual(self.reply_ids(root.approved_replies[0]), [nested.pk])
+
+    def test_reply_to_unthreaded_reply_is_found_through_its_parent(self):
+        reply = self.comment(parent=self.root)
+        BlogComment.objects.filter(pk=reply.pk).update(thread=None, depth=0)
+        reply.refresh_from_db()
+        answer = self.comment(parent=reply)
+
+        [root] = BlogComment.attach_approved_replies([self.root])
+
+        self.assertIsNone(answer.thread_id)
+        self.assertEqual(self.reply_ids(root.approved_replies[0]), [answer.pk])
+
+
+class BlogAdminActionTests(CacheTestCase):
+    """Actions run on changelists filtered by the very field they update"""
+
+    def setUp(self):
+        super().setUp()
+        author = User.objects.create_user(email='author@example.com', username='author', password='x')
+        self.category = BlogCategory.objects.create(name='Django')
+        self.post = BlogPost.objects.create(
+            title='Draft', excerpt='Excerpt', content='Body', author=author, category=self.category
+        )
+        self.comment = BlogComment.objects.create(
+            post=self.post, author_name='Reader', author_email='reader@example.com', content='Comment'
+        )
+        self.request = RequestFactory().post('/admin/')
+
+    def run_action(self, admin_class, model, action, queryset):
+        model_admin = admin_class(model, AdminSite())
+        with mock.patch.object(model_admin, 'message_user') as message_user:
+            getattr(model_admin, action)(self.request, queryset)
+        return message_user.call_args.args[1]
+
+    def test_publish_reports_and_recounts_posts_filtered_on_status(self):
+        message = self.run_action(BlogPostAdmin, BlogPost, 'make_published', BlogPost.objects.filter(status='draft'))
+
+        self.category.refresh_from_db()
+        self.assertEqual(message, '1 posts published.')
+        self.assertEqual(self.category.published_post_count, 1)
+
+    def test_comment_actions_report_comments_filtered_on_the_updated_flag(self):
+        message = self.run_action(
+            BlogCommentAdmin, BlogComment, 'approve_comments', BlogComment.objects.filter(is_approved=False)
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(message, '1 comments approved.')
+        self.assertEqual(self.post.approved_comment_count, 1)
+
+        message = self.run_action(BlogCommentAdmin, BlogComment, 'mark_as_spam', BlogComment.objects.filter(is_spam=False))
+        self.post.refresh_from_db()
+        self.assertEqual(message, '1 comments marked as spam.')
+        self.assertEqual(self.post.approved_comment_count, 0)
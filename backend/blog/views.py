@@ -7,6 +7,7 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from analytics.models import AnalyticsEvent
+from core.pagination import BlogCommentCursorPagination
 
 from .models import BlogCategory, BlogPost, BlogComment
 from .serializers import (
@@ -127,9 +128,10 @@ class BlogSearchView(generics.ListAPIView):
 
 
 class BlogCommentListView(generics.ListAPIView):
-    """List comments for a blog post"""
+    """List comment threads for a blog post, paginated by top-level comment"""
     permission_classes = [AllowAny]
     serializer_class = BlogCommentSerializer
+    pagination_class = BlogCommentCursorPagination
     
     def get_queryset(self):
         post_slug = self.kwargs['slug']
@@ -139,7 +141,19 @@ class BlogCommentListView(generics.ListAPIView):
             post=post,
             is_approved=True,
             parent__isnull=True  # Only top-level comments, replies are nested
-        ).select_related('author').prefetch_related('replies')
+        ).select_related('author')
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        
+        # Whole reply trees for the page are fetched in a single query
+        threads = BlogComment.attach_approved_replies(page if page is not None else queryset)
+        serializer = self.get_serializer(threads, many=True)
+        
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
 
 
 class BlogCommentCreateView(generics.CreateAPIView):
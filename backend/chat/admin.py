@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import ChatSession, ChatMessage, ChatFeedback, ChatKnowledgeBase
+from .models import ChatSession, ChatMessage, ChatFeedback, ChatKnowledgeBase, ChatUsageRollup
 
 
 @admin.register(ChatSession)
@@ -86,8 +86,20 @@ class ChatKnowledgeBaseAdmin(admin.ModelAdmin):
         ('Settings', {
             'fields': ('priority', 'is_active')
         }),
+        ('FAQ Matching', {
+            'fields': ('match_phrases', 'match_threshold'),
+            'description': 'Active FAQ entries that match a question closely enough are sent as the answer without calling the LLM.'
+        }),
         ('Usage Statistics', {
             'fields': ('usage_count', 'last_used'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(ChatUsageRollup)
+class ChatUsageRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'model_used', 'latency_bucket_ms', 'requests', 'tokens_used', 'rating_count']
+    list_filter = ['date', 'model_used']
+    readonly_fields = ['date', 'model_used', 'latency_bucket_ms', 'requests', 'tokens_used',
+                       'response_time_ms_total', 'rating_sum', 'rating_count']
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'chat'
\ No newline at end of file
+    name = 'chat'
+    
+    def ready(self):
+        import chat.signals
\ No newline at end of file
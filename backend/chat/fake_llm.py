@@ -0,0 +1,162 @@
+"""
+Minimal OpenAI-compatible chat completions server for local testing.
+
+Point the backend at it with ``OPENROUTER_BASE_URL=http://127.0.0.1:8089/v1``
+and any non-empty ``OPENROUTER_API_KEY``. Both regular and ``stream=True``
+requests are supported and paced at ``tokens_per_second``. Each request first
+waits a time-to-first-token drawn from a log-normal distribution around
+``latency`` (``latency_sigma`` 0 keeps it constant), and ``error_rate`` of
+requests fail with ``error_status`` so retries and failover can be exercised.
+"""
+import json
+import math
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    "Edzio has built several production Django and React applications. "
+    "See Project: Realtime Chat App - /projects/realtime-chat for an example, "
+    "or learn more about available services at /gigs/web-development."
+)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length) or b'{}')
+
+        time.sleep(self.server.sample_latency())
+        if random.random() < self.server.error_rate:
+            self.send_json({
+                'error': {'message': 'Simulated provider failure', 'type': 'server_error', 'code': self.server.error_status}
+            }, status=self.server.error_status)
+            return
+
+        model = payload.get('model', 'fake-llm')
+        tokens = self.server.tokenize(self.server.reply)
+        prompt_tokens = sum(len(str(message.get('content', '')).split()) for message in payload.get('messages', []))
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': len(tokens),
+            'total_tokens': prompt_tokens + len(tokens),
+        }
+
+        if payload.get('stream'):
+            self.stream_completion(model, tokens, usage, payload.get('stream_options') or {})
+        else:
+            time.sleep(len(tokens) * self.server.token_delay())
+            self.send_json({
+                'id': f'chatcmpl-{uuid.uuid4().hex}',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': ''.join(tokens)},
+                    'finish_reason': 'stop',
+                }],
+                'usage': usage,
+            })
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_completion(self, model, tokens, usage, stream_options):
+        completion_id = f'chatcmpl-{uuid.uuid4().hex}'
+        created = int(time.time())
+        delay = self.server.token_delay()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+        def chunk(delta, finish_reason=None):
+            return {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+
+        self.send_event(chunk({'role': 'assistant', 'content': ''}))
+        for token in tokens:
+            time.sleep(delay)
+            self.send_event(chunk({'content': token}))
+        self.send_event(chunk({}, 'stop'))
+
+        if stream_options.get('include_usage'):
+            self.send_event({
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [],
+                'usage': usage,
+            })
+
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+        self.close_connection = True
+
+    def send_event(self, data):
+        self.wfile.write(f'data: {json.dumps(data)}\n\n'.encode('utf-8'))
+        self.wfile.flush()
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, reply=DEFAULT_REPLY, tokens_per_second=50, latency=0, latency_sigma=0,
+                 error_rate=0, error_status=500, verbose=False):
+        super().__init__(address, FakeLLMHandler)
+        self.reply = reply
+        self.tokens_per_second = tokens_per_second
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.verbose = verbose
+
+    def sample_latency(self):
+        """Time to first token in seconds; ``latency`` is the median"""
+        if not self.latency:
+            return 0
+        return self.latency * math.exp(random.gauss(0, self.latency_sigma))
+
+    def token_delay(self):
+        return 1 / self.tokens_per_second if self.tokens_per_second else 0
+
+    @staticmethod
+    def tokenize(text):
+        # Word-sized pieces keep their leading space, like real BPE deltas
+        words = text.split(' ')
+        return [words[0]] + [f' {word}' for word in words[1:]] if words else []
+
+
+def run_fake_llm_server(host='127.0.0.1', port=8089, **options):
+    """Start a fake LLM server and block until interrupted"""
+    server = FakeLLMServer((host, port), **options)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,149 @@
+"""
+Answer common questions straight from curated FAQ entries, without calling the LLM.
+
+Active ``ChatKnowledgeBase`` entries with ``content_type='faq'`` are compiled
+into a per-process index of their title and ``match_phrases``. A query is
+scored against the phrases that share a keyword (or a keyword prefix, so
+typos still find candidates). The score is the lower of the share of query
+keywords the phrase covers and the share of phrase keywords the query covers
+(or their whole-string similarity, if higher), with near-identical words
+counted as matches. The best entry answers the query when its score reaches
+the entry's ``match_threshold`` (``CHAT_FAQ_MATCH_THRESHOLD`` by default).
+
+The index is rebuilt whenever the retrieval sequence moves, which every
+knowledge-base save and delete does (see ``chat.signals``).
+"""
+import threading
+from difflib import SequenceMatcher
+from django.conf import settings
+from .models import ChatKnowledgeBase
+from .prompt import html_to_text
+from .retrieval import get_retrieval_sequence, knowledge_usage, tokenize
+
+PREFIX_LENGTH = 4
+# Tokens at least this similar count as the same word ("pricng" ~ "pricing")
+TOKEN_SIMILARITY = 0.85
+
+
+def token_coverage(query_tokens, phrase_tokens):
+    """
+    ``(query, phrase)`` shares of tokens matched in the other side, where
+    near-identical tokens count as matches
+    """
+    if not query_tokens or not phrase_tokens:
+        return 0.0, 0.0
+    unmatched = list(phrase_tokens)
+    matched = 0
+    for token in query_tokens:
+        if token in unmatched:
+            unmatched.remove(token)
+            matched += 1
+            continue
+        for candidate in unmatched:
+            if SequenceMatcher(None, token, candidate).ratio() >= TOKEN_SIMILARITY:
+                unmatched.remove(candidate)
+                matched += 1
+                break
+    return matched / len(query_tokens), matched / len(phrase_tokens)
+
+
+class FAQMatcher:
+    """Keyword-indexed fuzzy matcher over FAQ phrasings"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sequence = None
+        self.entries = {}
+        self.phrases = []
+        self.keywords = {}
+
+    def rebuild(self, sequence):
+        entries = {}
+        phrases = []
+        keywords = {}
+        faqs = ChatKnowledgeBase.objects.filter(content_type='faq', is_active=True)
+        for entry in faqs:
+            answer = html_to_text(entry.content)
+            if not answer:
+                continue
+            entries[entry.pk] = {
+                'id': entry.pk,
+                'answer': answer,
+                'related_urls': entry.related_urls,
+                'threshold': entry.match_threshold,
+            }
+            for phrase in dict.fromkeys([entry.title, *entry.match_phrases]):
+                tokens = tokenize(phrase)
+                if not tokens:
+                    continue
+                position = len(phrases)
+                phrases.append((entry.pk, ' '.join(tokens), tokens))
+                for token in tokens:
+                    keywords.setdefault(token, set()).add(position)
+                    keywords.setdefault(token[:PREFIX_LENGTH], set()).add(position)
+        self.entries, self.phrases, self.keywords = entries, phrases, keywords
+        self.sequence = sequence
+
+    def sync(self):
+        current = get_retrieval_sequence()
+        if current == self.sequence:
+            return
+        with self.lock:
+            if current != self.sequence:
+                self.rebuild(current)
+
+    def candidates(self, tokens):
+        positions = set()
+        for token in tokens:
+            positions |= self.keywords.get(token, set())
+            positions |= self.keywords.get(token[:PREFIX_LENGTH], set())
+        return positions
+
+    def score(self, query_tokens, normalized, phrase_tokens, phrase):
+        if normalized == phrase:
+            return 1.0
+        query_coverage, phrase_coverage = token_coverage(query_tokens, phrase_tokens)
+        # Whole-string similarity can excuse extra words in the phrase, never an
+        # unmatched query word: "full time" must not answer a "part time" FAQ
+        if len(phrase) > 2 * PREFIX_LENGTH:
+            phrase_coverage = max(phrase_coverage, SequenceMatcher(None, normalized, phrase).ratio())
+        return min(query_coverage, phrase_coverage)
+
+    def match(self, query):
+        """``(entry, score)`` for the best FAQ that clears its threshold, or None"""
+        self.sync()
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return None
+        normalized = ' '.join(query_tokens)
+
+        best = {}
+        for position in self.candidates(query_tokens):
+            entry_id, phrase, phrase_tokens = self.phrases[position]
+            best[entry_id] = max(best.get(entry_id, 0.0), self.score(query_tokens, normalized, phrase_tokens, phrase))
+
+        default_threshold = getattr(settings, 'CHAT_FAQ_MATCH_THRESHOLD', 0.8)
+        matches = [
+            (self.entries[entry_id], score)
+            for entry_id, score in best.items()
+            if score >= (default_threshold if self.entries[entry_id]['threshold'] is None
+                         else self.entries[entry_id]['threshold'])
+        ]
+        if not matches:
+            return None
+        return max(matches, key=lambda item: item[1])
+
+
+faq_matcher = FAQMatcher()
+
+
+def match_faq(query):
+    """The FAQ entry that answers a query with enough confidence, or None"""
+    if not getattr(settings, 'CHAT_FAQ_ENABLED', True):
+        return None
+    match = faq_matcher.match(query)
+    if match is None:
+        return None
+    entry, _ = match
+    knowledge_usage.record({entry['id']})
+    return entry
@@ -0,0 +1,266 @@
+"""
+Admission control for LLM calls.
+
+A fixed number of slots (``LLM_CONCURRENCY_LIMIT``) is shared by every worker
+through Redis; if Redis can't be reached, each process falls back to its own
+in-memory slots. Callers that find no free slot wait in a queue ordered by
+arrival time plus a penalty for every request their client (IP or chat
+session) already has queued or running, so one busy client can't starve the
+rest. Waiters give up after ``LLM_QUEUE_MAX_WAIT`` seconds so the caller can
+answer with a degraded response instead of timing out.
+
+Slots are leases: a holder that dies without releasing frees its slot once
+``LLM_SLOT_LEASE`` seconds pass, and a waiter that stops polling drops out of
+the queue.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+LIMITER_HOLDERS_KEY = 'llm:limiter:holders'
+LIMITER_QUEUE_KEY = 'llm:limiter:queue'
+LIMITER_HEARTBEATS_KEY = 'llm:limiter:heartbeats'
+LIMITER_CLIENT_KEY = 'llm:limiter:client:{client}'
+LIMITER_STAT_KEY = 'llm:limiter:{stat}'
+
+POLL_INTERVAL = 0.05
+STALE_WAITER_AFTER = 5
+
+# Drop expired leases and abandoned waiters, queue the ticket, then admit it
+# if it ranks within the free slots
+ACQUIRE_SCRIPT = """
+local holders, queue, heartbeats = KEYS[1], KEYS[2], KEYS[3]
+local token, priority, now = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3])
+local lease, limit, stale_before = tonumber(ARGV[4]), tonumber(ARGV[5]), tonumber(ARGV[6])
+
+redis.call('ZREMRANGEBYSCORE', holders, '-inf', now)
+for _, stale in ipairs(redis.call('ZRANGEBYSCORE', heartbeats, '-inf', stale_before)) do
+    redis.call('ZREM', queue, stale)
+    redis.call('ZREM', heartbeats, stale)
+end
+
+redis.call('ZADD', queue, 'NX', priority, token)
+redis.call('ZADD', heartbeats, now, token)
+
+local free = limit - redis.call('ZCARD', holders)
+if free > 0 and redis.call('ZRANK', queue, token) < free then
+    redis.call('ZREM', queue, token)
+    redis.call('ZREM', heartbeats, token)
+    redis.call('ZADD', holders, now + lease, token)
+    return 1
+end
+return 0
+"""
+
+
+class QueueTimeout(Exception):
+    """No LLM slot became free within the maximum queue wait"""
+
+
+class RedisSlots:
+    """Slots shared by every worker through Redis sorted sets"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.script = connection.register_script(ACQUIRE_SCRIPT)
+
+    def try_acquire(self, token, priority, limit, lease):
+        now = time.time()
+        return bool(self.script(
+            keys=[LIMITER_HOLDERS_KEY, LIMITER_QUEUE_KEY, LIMITER_HEARTBEATS_KEY],
+            args=[token, priority, now, lease, limit, now - STALE_WAITER_AFTER],
+        ))
+
+    def abandon(self, token):
+        pipeline = self.connection.pipeline()
+        pipeline.zrem(LIMITER_QUEUE_KEY, token)
+        pipeline.zrem(LIMITER_HEARTBEATS_KEY, token)
+        pipeline.execute()
+
+    def release(self, token):
+        self.connection.zrem(LIMITER_HOLDERS_KEY, token)
+
+    def depth(self):
+        pipeline = self.connection.pipeline()
+        pipeline.zcard(LIMITER_QUEUE_KEY)
+        pipeline.zcount(LIMITER_HOLDERS_KEY, time.time(), '+inf')
+        queued, in_flight = pipeline.execute()
+        return queued, in_flight
+
+
+class LocalSlots:
+    """Per-process slots with the same admission rules, used when Redis is unavailable"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.holders = {}
+        self.queue = {}
+        self.heartbeats = {}
+
+    def try_acquire(self, token, priority, limit, lease):
+        now = time.time()
+        with self.lock:
+            for holder, expires in list(self.holders.items()):
+                if expires <= now:
+                    del self.holders[holder]
+            for waiter, seen in list(self.heartbeats.items()):
+                if seen <= now - STALE_WAITER_AFTER:
+                    self.queue.pop(waiter, None)
+                    del self.heartbeats[waiter]
+
+            self.queue.setdefault(token, priority)
+            self.heartbeats[token] = now
+
+            free = limit - len(self.holders)
+            rank = sorted(self.queue, key=self.queue.get).index(token)
+            if free > 0 and rank < free:
+                del self.queue[token]
+                del self.heartbeats[token]
+                self.holders[token] = now + lease
+                return True
+            return False
+
+    def abandon(self, token):
+        with self.lock:
+            self.queue.pop(token, None)
+            self.heartbeats.pop(token, None)
+
+    def release(self, token):
+        with self.lock:
+            self.holders.pop(token, None)
+
+    def depth(self):
+        now = time.time()
+        with self.lock:
+            return len(self.queue), sum(1 for expires in self.holders.values() if expires > now)
+
+
+def record_limiter_stat(stat, amount=1):
+    key = LIMITER_STAT_KEY.format(stat=stat)
+    cache.add(key, 0, None)
+    cache.incr(key, amount)
+
+
+class LLMLimiter:
+    """Fair, bounded admission of LLM calls across all workers"""
+
+    def __init__(self):
+        self.local = LocalSlots()
+        self.redis = None
+        self.redis_checked = False
+
+    @property
+    def slots(self):
+        if not self.redis_checked:
+            self.redis_checked = True
+            try:
+                from django_redis import get_redis_connection
+                self.redis = RedisSlots(get_redis_connection('default'))
+            except Exception as e:
+                logger.warning('LLM limiter using per-process slots: %s', e)
+        return self.redis or self.local
+
+    def call_slots(self, method, *args):
+        """Run a slot operation on Redis, falling back to local slots if Redis errors"""
+        try:
+            return getattr(self.slots, method)(*args)
+        except Exception as e:
+            if self.slots is self.local:
+                raise
+            logger.warning('LLM limiter falling back to per-process slots: %s', e)
+            return getattr(self.local, method)(*args)
+
+    def enqueue(self, client):
+        """Ticket and priority for a new waiter; clients with work in flight queue further back"""
+        client_key = LIMITER_CLIENT_KEY.format(client=client)
+        cache.add(client_key, 0, getattr(settings, 'LLM_SLOT_LEASE', 120))
+        outstanding = cache.incr(client_key) - 1
+        priority = time.time() + outstanding * getattr(settings, 'LLM_FAIR_SHARE_PENALTY', 2)
+        return uuid.uuid4().hex, priority, client_key
+
+    def admitted(self, token, priority):
+        return self.call_slots(
+            'try_acquire', token, priority,
+            getattr(settings, 'LLM_CONCURRENCY_LIMIT', 8), getattr(settings, 'LLM_SLOT_LEASE', 120)
+        )
+
+    def finish_wait(self, token, started, acquired):
+        waited_ms = int((time.monotonic() - started) * 1000)
+        if acquired:
+            record_limiter_stat('admitted')
+            record_limiter_stat('wait_ms', waited_ms)
+        else:
+            self.call_slots('abandon', token)
+            record_limiter_stat('timeouts')
+            logger.warning('LLM queue wait exceeded after %sms', waited_ms)
+
+    def leave(self, token, client_key):
+        self.call_slots('release', token)
+        try:
+            cache.decr(client_key)
+        except ValueError:
+            # The client counter expired while the call was running
+            pass
+
+    @contextmanager
+    def slot(self, client, max_wait=None):
+        """Hold an LLM slot for the duration of the block; raises QueueTimeout"""
+        max_wait = getattr(settings, 'LLM_QUEUE_MAX_WAIT', 10) if max_wait is None else max_wait
+        token, priority, client_key = self.enqueue(client)
+        started = time.monotonic()
+        try:
+            acquired = self.admitted(token, priority)
+            while not acquired and time.monotonic() - started < max_wait:
+                time.sleep(POLL_INTERVAL)
+                acquired = self.admitted(token, priority)
+            self.finish_wait(token, started, acquired)
+            if not acquired:
+                raise QueueTimeout(f'No LLM slot free after {max_wait}s')
+            yield
+        finally:
+            self.leave(token, client_key)
+
+    @asynccontextmanager
+    async def aslot(self, client, max_wait=None):
+        """Async variant of ``slot``; waiting yields to the event loop"""
+        max_wait = getattr(settings, 'LLM_QUEUE_MAX_WAIT', 10) if max_wait is None else max_wait
+        # Cache and Redis calls block, so each runs off the event loop. They touch no ORM
+        # state, so they needn't queue behind ORM work on the single thread-sensitive executor
+        token, priority, client_key = await sync_to_async(self.enqueue, thread_sensitive=False)(client)
+        started = time.monotonic()
+        try:
+            acquired = await sync_to_async(self.admitted, thread_sensitive=False)(token, priority)
+            while not acquired and time.monotonic() - started < max_wait:
+                await asyncio.sleep(POLL_INTERVAL)
+                acquired = await sync_to_async(self.admitted, thread_sensitive=False)(token, priority)
+            await sync_to_async(self.finish_wait, thread_sensitive=False)(token, started, acquired)
+            if not acquired:
+                raise QueueTimeout(f'No LLM slot free after {max_wait}s')
+            yield
+        finally:
+            await sync_to_async(self.leave, thread_sensitive=False)(token, client_key)
+
+    def stats(self):
+        queued, in_flight = self.call_slots('depth')
+        counters = cache.get_many([LIMITER_STAT_KEY.format(stat=stat) for stat in ('admitted', 'timeouts', 'wait_ms')])
+        admitted = counters.get(LIMITER_STAT_KEY.format(stat='admitted'), 0)
+        wait_ms = counters.get(LIMITER_STAT_KEY.format(stat='wait_ms'), 0)
+        return {
+            'queued': queued,
+            'in_flight': in_flight,
+            'limit': getattr(settings, 'LLM_CONCURRENCY_LIMIT', 8),
+            'admitted': admitted,
+            'timeouts': counters.get(LIMITER_STAT_KEY.format(stat='timeouts'), 0),
+            'average_wait_ms': wait_ms / admitted if admitted else 0,
+        }
+
+
+llm_limiter = LLMLimiter()
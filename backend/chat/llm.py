@@ -0,0 +1,247 @@
+"""
+Process-wide LLM clients with connection pooling, retries, a circuit breaker and provider failover.
+
+Providers from ``LLM_PROVIDERS`` are tried in order. Providers that share a
+base URL and key share one pooled ``openai`` client per process, so requests
+reuse keep-alive connections instead of paying TCP and TLS setup each time.
+Transient errors are retried with jittered exponential backoff; a provider
+that keeps failing has its circuit opened in the shared cache so every worker
+skips it until the cooldown passes, after which a single probe request decides
+whether it closes again.
+
+Point a provider's ``base_url`` at ``run_fake_llm`` to exercise all of this locally.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+import httpx
+import openai
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURES_KEY = 'llm:breaker:{name}:failures'
+BREAKER_OPEN_KEY = 'llm:breaker:{name}:open'
+BREAKER_TRIPPED_KEY = 'llm:breaker:{name}:tripped'
+BREAKER_PROBE_KEY = 'llm:breaker:{name}:probe'
+
+# Worth retrying on the same provider
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+# Worth moving on to the next provider; anything else (bad request) is raised as-is
+FAILOVER_ERRORS = RETRYABLE_ERRORS + (
+    openai.AuthenticationError, openai.PermissionDeniedError, openai.NotFoundError,
+)
+
+
+class LLMUnavailable(Exception):
+    """Every configured provider failed or has its circuit open"""
+
+
+class CircuitBreaker:
+    """Failure counter shared through the cache so all workers see the same circuit state"""
+
+    def __init__(self, name):
+        self.failures_key = BREAKER_FAILURES_KEY.format(name=name)
+        self.open_key = BREAKER_OPEN_KEY.format(name=name)
+        self.tripped_key = BREAKER_TRIPPED_KEY.format(name=name)
+        self.probe_key = BREAKER_PROBE_KEY.format(name=name)
+
+    def allow(self):
+        state = cache.get_many([self.open_key, self.tripped_key])
+        if state.get(self.open_key):
+            return False
+        if state.get(self.tripped_key):
+            # Half-open: let one request through to test the provider
+            return cache.add(self.probe_key, True, getattr(settings, 'LLM_TIMEOUT', 30))
+        return True
+
+    def record_success(self):
+        cache.delete_many([self.failures_key, self.tripped_key, self.probe_key])
+
+    def record_failure(self):
+        cache.add(self.failures_key, 0, getattr(settings, 'LLM_BREAKER_WINDOW', 60))
+        failures = cache.incr(self.failures_key)
+        if failures >= getattr(settings, 'LLM_BREAKER_THRESHOLD', 5) or cache.get(self.tripped_key):
+            cache.set(self.open_key, True, getattr(settings, 'LLM_BREAKER_COOLDOWN', 30))
+            cache.set(self.tripped_key, True, None)
+            cache.delete_many([self.failures_key, self.probe_key])
+
+
+class LLMProvider:
+    """One model on one OpenAI-compatible endpoint"""
+
+    def __init__(self, registry, name, base_url, api_key, model):
+        self.registry = registry
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.model = model
+        self.breaker = CircuitBreaker(name)
+
+    @property
+    def client(self):
+        return self.registry.get_client(self.base_url, self.api_key)
+
+    @property
+    def async_client(self):
+        return self.registry.get_client(self.base_url, self.api_key, asynchronous=True)
+
+
+class LLMRegistry:
+    """Ordered providers and the pooled clients they share"""
+
+    def __init__(self, providers):
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.providers = [
+            LLMProvider(self, provider.get('name') or provider['model'], provider['base_url'],
+                        provider['api_key'], provider['model'])
+            for provider in providers
+            if provider.get('api_key')
+        ]
+
+    @property
+    def available(self):
+        return bool(self.providers)
+
+    def get_client(self, base_url, api_key, asynchronous=False):
+        key = (base_url, api_key, asynchronous)
+        client = self.clients.get(key)
+        if client is None:
+            with self.lock:
+                client = self.clients.get(key)
+                if client is None:
+                    client = self.clients[key] = self.build_client(base_url, api_key, asynchronous)
+        return client
+
+    def build_client(self, base_url, api_key, asynchronous):
+        timeout = httpx.Timeout(
+            getattr(settings, 'LLM_TIMEOUT', 30),
+            connect=getattr(settings, 'LLM_CONNECT_TIMEOUT', 5)
+        )
+        limits = httpx.Limits(
+            max_connections=getattr(settings, 'LLM_MAX_CONNECTIONS', 20),
+            max_keepalive_connections=getattr(settings, 'LLM_MAX_KEEPALIVE_CONNECTIONS', 10),
+            keepalive_expiry=getattr(settings, 'LLM_KEEPALIVE_EXPIRY', 60)
+        )
+        client_class, http_client_class = (
+            (openai.AsyncOpenAI, httpx.AsyncClient) if asynchronous else (openai.OpenAI, httpx.Client)
+        )
+        return client_class(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            # Retries are handled here so they can fail over between providers
+            max_retries=0,
+            http_client=http_client_class(timeout=timeout, limits=limits),
+            default_headers={
+                "HTTP-Referer": getattr(settings, 'FRONTEND_URL', 'http://localhost:3000'),
+                "X-Title": getattr(settings, 'SITE_NAME', "Edzio's Portfolio"),
+            }
+        )
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        ceiling = min(
+            getattr(settings, 'LLM_RETRY_MAX_DELAY', 4),
+            getattr(settings, 'LLM_RETRY_BASE_DELAY', 0.5) * 2 ** attempt
+        )
+        return random.uniform(0, ceiling)
+
+    def attempts(self):
+        """Yield ``(provider, attempt)`` pairs in failover order, skipping open circuits"""
+        for provider in self.providers:
+            if not provider.breaker.allow():
+                logger.info('Skipping LLM provider %s: circuit open', provider.name)
+                continue
+            for attempt in range(getattr(settings, 'LLM_MAX_RETRIES', 2) + 1):
+                yield provider, attempt
+
+    async def aattempts(self):
+        """Async variant of ``attempts``; circuit checks hit the cache, so they run off the event loop"""
+        for provider in self.providers:
+            if not await sync_to_async(provider.breaker.allow, thread_sensitive=False)():
+                logger.info('Skipping LLM provider %s: circuit open', provider.name)
+                continue
+            for attempt in range(getattr(settings, 'LLM_MAX_RETRIES', 2) + 1):
+                yield provider, attempt
+
+    def handle_error(self, provider, attempt, error):
+        """Record a failed attempt; return the delay before retrying, or None to move on"""
+        logger.warning('LLM provider %s failed (attempt %s): %s', provider.name, attempt + 1, error)
+        if isinstance(error, RETRYABLE_ERRORS) and attempt < getattr(settings, 'LLM_MAX_RETRIES', 2):
+            return self.backoff(attempt)
+        provider.breaker.record_failure()
+        return None
+
+    def complete(self, **kwargs):
+        """
+        Create a chat completion on the first healthy provider.
+
+        Returns ``(response, provider)``. ``stream=True`` is supported; failover
+        only happens before the stream starts.
+        """
+        last_error = None
+        skip = None
+        for provider, attempt in self.attempts():
+            if provider is skip:
+                continue
+            try:
+                response = provider.client.chat.completions.create(model=provider.model, **kwargs)
+            except FAILOVER_ERRORS as e:
+                last_error = e
+                delay = self.handle_error(provider, attempt, e)
+                if delay is None:
+                    skip = provider
+                else:
+                    time.sleep(delay)
+                continue
+            provider.breaker.record_success()
+            return response, provider
+        raise LLMUnavailable('No LLM provider could serve the request') from last_error
+
+    async def acomplete(self, **kwargs):
+        """Async variant of ``complete``"""
+        last_error = None
+        skip = None
+        async for provider, attempt in self.aattempts():
+            if provider is skip:
+                continue
+            try:
+                response = await provider.async_client.chat.completions.create(model=provider.model, **kwargs)
+            except FAILOVER_ERRORS as e:
+                last_error = e
+                delay = await sync_to_async(self.handle_error, thread_sensitive=False)(provider, attempt, e)
+                if delay is None:
+                    skip = provider
+                else:
+                    await asyncio.sleep(delay)
+                continue
+            await sync_to_async(provider.breaker.record_success, thread_sensitive=False)()
+            return response, provider
+        raise LLMUnavailable('No LLM provider could serve the request') from last_error
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_llm():
+    """The process-wide provider registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMRegistry(getattr(settings, 'LLM_PROVIDERS', []))
+    return _registry
+
+
+def reset_llm():
+    """Drop the registry so the next call rebuilds it from current settings"""
+    global _registry
+    with _registry_lock:
+        _registry = None
@@ -1,10 +1,23 @@
-from django.db import models
+from collections import Counter, defaultdict
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Greatest, NullIf
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from core.models import TimeStampedModel
 import uuid
 
 User = get_user_model()
 
+# Lower bounds (ms) of the response-time histogram buckets
+LATENCY_BUCKETS_MS = (0, 250, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+def latency_bucket(response_time_ms):
+    """Lower bound of the histogram bucket a response time falls in"""
+    response_time_ms = response_time_ms or 0
+    return max(bound for bound in LATENCY_BUCKETS_MS if bound <= response_time_ms)
+
 
 class ChatSession(TimeStampedModel):
     """Chat session for grouping related messages"""
@@ -44,9 +57,22 @@ class ChatSession(TimeStampedModel):
     # Analytics
     total_tokens_used = models.PositiveIntegerField(default=0)
     average_rating = models.FloatField(null=True, blank=True)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    
+    # Rolling summary of turns too old to send verbatim
+    conversation_summary = models.TextField(blank=True)
+    summary_through = models.DateTimeField(
+        null=True, blank=True, help_text="Messages up to this time are folded into the summary"
+    )
     
     class Meta:
         ordering = ['-last_activity']
+        indexes = [
+            # Keyset pagination of history, newest first
+            models.Index(fields=['user', 'created_at', 'id']),
+            models.Index(fields=['session_id', 'created_at', 'id']),
+        ]
         verbose_name = 'Chat Session'
         verbose_name_plural = 'Chat Sessions'
     
@@ -54,22 +80,40 @@ class ChatSession(TimeStampedModel):
         user_info = self.user.email if self.user else f"Anonymous ({self.session_id[:8]})"
         return f"Chat Session - {user_info} ({self.message_count} messages)"
     
-    def update_average_rating(self):
-        """Update average rating based on message ratings"""
-        ratings = self.messages.filter(rating__isnull=False).values_list('rating', flat=True)
-        if ratings:
-            self.average_rating = sum(ratings) / len(ratings)
-            self.save(update_fields=['average_rating'])
+    @classmethod
+    def apply_rating_change(cls, session_id, previous, rating):
+        """Move the rating counters and average by one message's rating change in one UPDATE"""
+        sum_delta = (rating or 0) - (previous or 0)
+        count_delta = (rating is not None) - (previous is not None)
+        # Every right-hand side reads the row as it was before this UPDATE
+        return cls.objects.filter(pk=session_id).update(
+            rating_sum=F('rating_sum') + sum_delta,
+            rating_count=F('rating_count') + count_delta,
+            average_rating=(Cast(F('rating_sum') + sum_delta, FloatField())
+                            / NullIf(F('rating_count') + count_delta, 0))
+        )
 
 
 class ChatMessage(TimeStampedModel):
     """Individual chat messages"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    ]
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     session = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name='messages')
     
     # Message content
     content = models.TextField()
     is_from_user = models.BooleanField(help_text="True if from user, False if from AI")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='complete',
+        help_text="Pending while a background worker generates the reply"
+    )
     
     # AI response metadata
     response_time_ms = models.PositiveIntegerField(null=True, blank=True, help_text="Response time in milliseconds")
@@ -101,6 +145,10 @@ class ChatMessage(TimeStampedModel):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination of a session's messages and its latest window
+            models.Index(fields=['session', 'created_at', 'id']),
+        ]
         verbose_name = 'Chat Message'
         verbose_name_plural = 'Chat Messages'
     
@@ -176,10 +224,106 @@ class ChatKnowledgeBase(TimeStampedModel):
     is_active = models.BooleanField(default=True)
     priority = models.PositiveSmallIntegerField(default=1, help_text="Higher priority content is preferred")
     
+    # FAQ fast path: answer matching questions with the content, without the LLM
+    match_phrases = models.JSONField(
+        default=list, blank=True, help_text="Other ways visitors ask this FAQ (the title is always matched)"
+    )
+    match_threshold = models.FloatField(
+        null=True, blank=True,
+        help_text="Match confidence (0-1) needed to answer directly; blank uses the site default, above 1 disables"
+    )
+    
     class Meta:
         ordering = ['-priority', 'title']
         verbose_name = 'Knowledge Base Entry'
         verbose_name_plural = 'Knowledge Base'
     
     def __str__(self):
-        return f"{self.title} ({self.get_content_type_display()})"
\ No newline at end of file
+        return f"{self.title} ({self.get_content_type_display()})"
+
+
+class ChatUsageRollup(models.Model):
+    """
+    Assistant reply totals per day, model and response-time bucket.
+    
+    Rows are incremented as replies finish and ratings change (see
+    ``chat.signals``), so cost, latency and rating reports read this table
+    instead of scanning messages. Summing a day's rows gives its totals;
+    ``requests`` per ``latency_bucket_ms`` is the latency histogram.
+    """
+    date = models.DateField()
+    model_used = models.CharField(max_length=50, blank=True)
+    latency_bucket_ms = models.PositiveIntegerField(help_text="Lower bound of the response-time bucket")
+    
+    requests = models.PositiveIntegerField(default=0)
+    tokens_used = models.PositiveBigIntegerField(default=0)
+    response_time_ms_total = models.PositiveBigIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-date', 'model_used', 'latency_bucket_ms']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'model_used', 'latency_bucket_ms'], name='unique_chat_usage_rollup'
+            ),
+        ]
+        verbose_name = 'Chat Usage Rollup'
+        verbose_name_plural = 'Chat Usage Rollups'
+    
+    def __str__(self):
+        return f"{self.date} {self.model_used or 'unknown'} >={self.latency_bucket_ms}ms: {self.requests} requests"
+    
+    @classmethod
+    def record(cls, date, model_used, response_time_ms, **increments):
+        """Add ``increments`` to the row for this day, model and latency bucket"""
+        increments = {field: value for field, value in increments.items() if value}
+        if not increments:
+            return
+        key = {
+            'date': date,
+            'model_used': (model_used or '')[:50],
+            'latency_bucket_ms': latency_bucket(response_time_ms),
+        }
+        updates = {field: F(field) + value for field, value in increments.items()}
+        if cls.objects.filter(**key).update(**updates):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(**key, **increments)
+        except IntegrityError:
+            # Another worker created the row first
+            cls.objects.filter(**key).update(**updates)
+    
+    @classmethod
+    def tally(cls, messages):
+        """Rollup totals for finished assistant ``messages``, keyed by ``(date, model_used, latency_bucket_ms)``"""
+        totals = defaultdict(Counter)
+        rows = (messages
+                .filter(is_from_user=False)
+                .exclude(status='pending')
+                .values('created_at', 'model_used', 'response_time_ms', 'tokens_used', 'rating')
+                .iterator())
+        for message in rows:
+            key = (
+                timezone.localdate(message['created_at']),
+                (message['model_used'] or '')[:50],
+                latency_bucket(message['response_time_ms']),
+            )
+            totals[key].update(
+                requests=1,
+                tokens_used=message['tokens_used'] or 0,
+                response_time_ms_total=message['response_time_ms'] or 0,
+                rating_sum=message['rating'] or 0,
+                rating_count=message['rating'] is not None,
+            )
+        return totals
+    
+    @classmethod
+    def subtract(cls, totals):
+        """Take ``tally`` totals back out, e.g. before deleting the messages they came from"""
+        for (date, model_used, bucket), counts in totals.items():
+            cls.objects.filter(date=date, model_used=model_used, latency_bucket_ms=bucket).update(**{
+                field: Greatest(F(field) - value, 0) for field, value in counts.items()
+            })
+        cls.objects.filter(requests=0, rating_count=0).delete()
@@ -0,0 +1,56 @@
+"""Token estimation, text cleanup and budgeting for chat prompt assembly"""
+import html
+import re
+from django.utils.html import strip_tags
+
+WHITESPACE_RE = re.compile(r'\s+')
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s')
+
+
+def html_to_text(value):
+    """Plain text from rich-text fields"""
+    return WHITESPACE_RE.sub(' ', html.unescape(strip_tags(value or ''))).strip()
+
+
+def estimate_tokens(text):
+    """Rough LLM token count (about four characters per token)"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def truncate_to_tokens(text, budget):
+    """Cut text on a word boundary so it fits the token budget"""
+    if estimate_tokens(text) <= budget:
+        return text
+    if budget <= 0:
+        return ''
+    cut = text[:budget * 4 - 1].rsplit(' ', 1)[0]
+    return f'{cut}…'
+
+
+def summarize_message(content, max_words=30):
+    """First sentence of a message, capped at max_words, for the rolling summary"""
+    text = WHITESPACE_RE.sub(' ', content).strip()
+    first_sentence = SENTENCE_END_RE.split(text, 1)[0]
+    words = first_sentence.split()
+    if len(words) > max_words:
+        return ' '.join(words[:max_words]) + '…'
+    return first_sentence
+
+
+class PromptBudget:
+    """Tracks the estimated tokens left under the prompt ceiling as sections are added"""
+
+    def __init__(self, ceiling):
+        self.remaining = ceiling
+
+    def limit(self, cap):
+        return max(0, min(cap, self.remaining))
+
+    def spend(self, text):
+        self.remaining -= estimate_tokens(text)
+
+    def take(self, text, cap):
+        """Fit text into what is left of the section cap and charge it to the budget"""
+        text = truncate_to_tokens(text, self.limit(cap))
+        self.spend(text)
+        return text
@@ -0,0 +1,294 @@
+"""
+In-process BM25 retrieval over knowledge-base entries, projects, case studies and blog posts.
+
+Each worker keeps its own index. Content changes are appended to a short
+changelog in the shared cache (see ``chat.signals``); before every search the
+index compares its applied sequence with the cache and re-indexes only the
+documents that changed, falling back to a full rebuild if it missed entries.
+"""
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from blog.models import BlogPost
+from core.buffers import WriteBuffer
+from projects.models import Project, CaseStudy
+from .models import ChatKnowledgeBase
+from .prompt import estimate_tokens, html_to_text
+
+RETRIEVAL_SEQUENCE_KEY = 'chat:retrieval:sequence'
+RETRIEVAL_CHANGELOG_KEY = 'chat:retrieval:changelog'
+RETRIEVAL_CHANGELOG_SIZE = 500
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'do', 'for', 'from', 'has', 'have',
+    'how', 'i', 'in', 'is', 'it', 'me', 'my', 'of', 'on', 'or', 'that', 'the', 'this',
+    'to', 'was', 'what', 'when', 'which', 'who', 'with', 'you', 'your',
+))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_text(text, size=120, overlap=20):
+    """Split text into overlapping word windows"""
+    words = text.split()
+    if len(words) <= size:
+        return [' '.join(words)] if words else []
+    step = size - overlap
+    return [' '.join(words[start:start + size]) for start in range(0, len(words) - overlap, step)]
+
+
+def get_retrieval_sequence():
+    return cache.get(RETRIEVAL_SEQUENCE_KEY, 0)
+
+
+def record_retrieval_change(doc_key):
+    """Tell every worker's index that a document needs re-indexing"""
+    cache.add(RETRIEVAL_SEQUENCE_KEY, 0, None)
+    sequence = cache.incr(RETRIEVAL_SEQUENCE_KEY)
+    changelog = cache.get(RETRIEVAL_CHANGELOG_KEY, [])
+    changelog.append((sequence, doc_key))
+    cache.set(RETRIEVAL_CHANGELOG_KEY, changelog[-RETRIEVAL_CHANGELOG_SIZE:], None)
+
+
+def _passages(doc_key, title, url, text, kb_id=None):
+    return [
+        {
+            'id': f'{doc_key}#{position}',
+            'doc_key': doc_key,
+            'title': title,
+            'url': url,
+            'text': chunk,
+            'kb_id': kb_id,
+        }
+        for position, chunk in enumerate(chunk_text(text))
+    ]
+
+
+def load_documents(doc_keys=None):
+    """
+    Passages per document key, loaded from the database.
+
+    With ``doc_keys`` only those documents are loaded; keys whose object no
+    longer exists or is no longer public map to an empty list.
+    """
+    wanted = {}
+    for doc_key in doc_keys or []:
+        kind, _, pk = doc_key.partition(':')
+        wanted.setdefault(kind, []).append(pk)
+
+    def scoped(queryset, kind):
+        if doc_keys is None:
+            return queryset
+        return queryset.filter(pk__in=wanted.get(kind, []))
+
+    documents = {doc_key: [] for doc_key in doc_keys or []}
+
+    for entry in scoped(ChatKnowledgeBase.objects.filter(is_active=True), 'kb'):
+        url = entry.related_urls[0] if entry.related_urls else ''
+        documents[f'kb:{entry.pk}'] = _passages(
+            f'kb:{entry.pk}', entry.title, url, html_to_text(entry.content), kb_id=entry.pk
+        )
+
+    for project in scoped(Project.objects.filter(visibility='public'), 'project'):
+        text = ' '.join([project.short_tagline, project.description_short, html_to_text(project.description_long)])
+        documents[f'project:{project.pk}'] = _passages(
+            f'project:{project.pk}', project.title, f'/projects/{project.slug}', text
+        )
+
+    case_studies = (CaseStudy.objects
+                    .filter(is_published=True, project__visibility='public')
+                    .select_related('project'))
+    for case_study in scoped(case_studies, 'case_study'):
+        sections = [
+            case_study.problem_statement, case_study.approach, case_study.architecture_description,
+            case_study.implementation_notes, case_study.challenges, case_study.results,
+            case_study.lessons_learned,
+        ]
+        documents[f'case_study:{case_study.pk}'] = _passages(
+            f'case_study:{case_study.pk}',
+            f'{case_study.project.title} case study',
+            f'/projects/{case_study.project.slug}',
+            ' '.join(html_to_text(section) for section in sections),
+        )
+
+    for post in scoped(BlogPost.objects.filter(status='published'), 'blog'):
+        documents[f'blog:{post.pk}'] = _passages(
+            f'blog:{post.pk}', post.title, f'/blog/{post.slug}',
+            ' '.join([post.excerpt, html_to_text(post.content)])
+        )
+
+    return documents
+
+
+class RetrievalIndex:
+    """BM25 index over passages that supports per-document add and remove"""
+
+    def __init__(self):
+        # ``lock`` serializes syncs (which load from the database); ``index_lock``
+        # guards the index structures, so searches never see a half-applied change
+        self.lock = threading.Lock()
+        self.index_lock = threading.Lock()
+        self.sequence = None
+        self.reset()
+
+    def reset(self):
+        self.passages = {}
+        self.doc_passages = {}
+        self.postings = {}
+        self.lengths = {}
+        self.total_length = 0
+
+    def add_document(self, doc_key, passages):
+        self.remove_document(doc_key)
+        self.doc_passages[doc_key] = [passage['id'] for passage in passages]
+        for passage in passages:
+            terms = Counter(tokenize(f"{passage['title']} {passage['text']}"))
+            self.passages[passage['id']] = passage
+            self.lengths[passage['id']] = sum(terms.values())
+            self.total_length += self.lengths[passage['id']]
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, {})[passage['id']] = frequency
+
+    def remove_document(self, doc_key):
+        for passage_id in self.doc_passages.pop(doc_key, []):
+            passage = self.passages.pop(passage_id)
+            self.total_length -= self.lengths.pop(passage_id)
+            for term in set(tokenize(f"{passage['title']} {passage['text']}")):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(passage_id, None)
+                    if not postings:
+                        del self.postings[term]
+
+    def rebuild(self, sequence):
+        # Build aside and swap in, so searches keep using the old index meanwhile
+        fresh = RetrievalIndex()
+        for doc_key, passages in load_documents().items():
+            fresh.add_document(doc_key, passages)
+        with self.index_lock:
+            self.passages, self.doc_passages, self.postings = fresh.passages, fresh.doc_passages, fresh.postings
+            self.lengths, self.total_length = fresh.lengths, fresh.total_length
+        self.sequence = sequence
+
+    def sync(self):
+        """Apply content changes recorded since this index was last synced"""
+        current = get_retrieval_sequence()
+        if current == self.sequence:
+            return
+
+        with self.lock:
+            if current == self.sequence:
+                return
+            if self.sequence is None or current < self.sequence:
+                self.rebuild(current)
+                return
+
+            changes = [(sequence, doc_key) for sequence, doc_key in cache.get(RETRIEVAL_CHANGELOG_KEY, [])
+                       if self.sequence < sequence <= current]
+            # A gap means the changelog was trimmed or a write was lost: start over
+            if sorted(sequence for sequence, _ in changes) != list(range(self.sequence + 1, current + 1)):
+                self.rebuild(current)
+                return
+
+            documents = load_documents({doc_key for _, doc_key in changes})
+            with self.index_lock:
+                for doc_key, passages in documents.items():
+                    self.add_document(doc_key, passages)
+            self.sequence = current
+
+    def search(self, query, limit=5):
+        terms = set(tokenize(query))
+        with self.index_lock:
+            count = len(self.passages)
+            if not terms or not count:
+                return []
+
+            average_length = self.total_length / count
+            scores = Counter()
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for passage_id, frequency in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[passage_id] / average_length)
+                    scores[passage_id] += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+            return [
+                (self.passages[passage_id], score)
+                for passage_id, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            ]
+
+
+class KnowledgeUsageBuffer(WriteBuffer):
+    """Accumulate knowledge-base hits in memory and write them in one UPDATE"""
+
+    size_setting = 'CHAT_KB_USAGE_FLUSH_SIZE'
+    default_size = 50
+    interval_setting = 'CHAT_KB_USAGE_FLUSH_INTERVAL'
+    default_interval = 60
+
+    def __init__(self):
+        super().__init__()
+        self.counts = Counter()
+
+    def record(self, kb_ids):
+        with self.lock:
+            self.counts.update(kb_ids)
+            size = len(self.counts)
+        self.pending_added(size)
+
+    def take(self):
+        counts, self.counts = self.counts, Counter()
+        return counts
+
+    def write(self, counts):
+        increment = Case(
+            *[When(pk=kb_id, then=Value(count)) for kb_id, count in counts.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        return ChatKnowledgeBase.objects.filter(pk__in=counts).update(
+            usage_count=F('usage_count') + increment,
+            last_used=timezone.now(),
+        )
+
+
+retrieval_index = RetrievalIndex()
+knowledge_usage = KnowledgeUsageBuffer()
+
+
+def retrieve_passages(query, limit=None, token_budget=None):
+    """Top-ranked passages for a query that fit within the token budget"""
+    limit = limit or getattr(settings, 'CHAT_RETRIEVAL_TOP_K', 5)
+    if token_budget is None:
+        token_budget = getattr(settings, 'CHAT_RETRIEVAL_TOKEN_BUDGET', 800)
+
+    retrieval_index.sync()
+
+    selected = []
+    used_tokens = 0
+    for passage, score in retrieval_index.search(query, limit):
+        cost = estimate_tokens(passage['text'])
+        if used_tokens + cost > token_budget:
+            continue
+        selected.append(passage)
+        used_tokens += cost
+
+    kb_ids = [passage['kb_id'] for passage in selected if passage['kb_id']]
+    if kb_ids:
+        knowledge_usage.record(set(kb_ids))
+
+    return selected
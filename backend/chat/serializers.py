@@ -1,4 +1,6 @@
+from django.conf import settings
 from rest_framework import serializers
+from core.pagination import ChatMessagePagination
 from .models import ChatSession, ChatMessage, ChatFeedback
 
 
@@ -8,21 +10,47 @@ class ChatMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChatMessage
         fields = [
-            'id', 'content', 'is_from_user', 'sources', 'rating',
+            'id', 'content', 'is_from_user', 'status', 'sources', 'rating',
             'feedback_comment', 'created_at', 'response_time_ms'
         ]
 
 
 class ChatSessionSerializer(serializers.ModelSerializer):
-    """Serializer for chat sessions"""
-    messages = ChatMessageSerializer(many=True, read_only=True)
+    """
+    Serializer for chat sessions with their latest window of messages.
+    
+    ``messages`` holds the newest ``CHAT_MESSAGE_WINDOW`` messages in
+    chronological order; ``older_messages_cursor`` pages back through the
+    session messages endpoint. Views should prefetch the window into
+    ``recent_messages`` (see ``chat.views.with_recent_messages``).
+    """
+    messages = serializers.SerializerMethodField()
+    older_messages_cursor = serializers.SerializerMethodField()
     
     class Meta:
         model = ChatSession
         fields = [
             'id', 'audience_tag', 'persona_tone', 'message_count',
-            'last_activity', 'messages'
+            'last_activity', 'messages', 'older_messages_cursor'
         ]
+    
+    def recent_window(self, obj):
+        recent = getattr(obj, 'recent_messages', None)
+        if recent is None:
+            window = getattr(settings, 'CHAT_MESSAGE_WINDOW', 20)
+            recent = list(obj.messages.order_by('-created_at', '-id')[:window + 1])
+        return recent
+    
+    def get_messages(self, obj):
+        window = self.recent_window(obj)[:getattr(settings, 'CHAT_MESSAGE_WINDOW', 20)]
+        return ChatMessageSerializer(window[::-1], many=True, context=self.context).data
+    
+    def get_older_messages_cursor(self, obj):
+        size = getattr(settings, 'CHAT_MESSAGE_WINDOW', 20)
+        recent = self.recent_window(obj)
+        if len(recent) <= size:
+            return None
+        return ChatMessagePagination.encode_position(recent[size - 1])
 
 
 class ChatQuerySerializer(serializers.Serializer):
@@ -53,6 +81,11 @@ class ChatQuerySerializer(serializers.Serializer):
         ],
         default='professional'
     )
+    background = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Generate the reply on a worker and poll the message status for it"
+    )
 
 
 class ChatFeedbackSerializer(serializers.ModelSerializer):
@@ -1,32 +1,469 @@
-import openai
+import hashlib
+import json
+import logging
+import math
+import re
+import time
+import uuid
+from asgiref.sync import sync_to_async
+from functools import cached_property
 from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
+from core.cache import get_or_refresh
 from core.models import SiteConfiguration
 from projects.models import Project, CaseStudy, Skill
 from gigs.models import Gig
-from .models import ChatKnowledgeBase
+from analytics.buffer import analytics_buffer
+from analytics.models import AnalyticsEvent
+from .faq import match_faq
+from .limiter import QueueTimeout, llm_limiter
+from .llm import get_llm
+from .models import ChatSession, ChatMessage, ChatKnowledgeBase, ChatUsageRollup
+from .prompt import PromptBudget, estimate_tokens, html_to_text, summarize_message, truncate_to_tokens
+from .retrieval import get_retrieval_sequence, retrieve_passages
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_CONTEXT_VERSION_KEY = 'chat:portfolio_context:version'
+PORTFOLIO_CONTEXT_CACHE_KEY = 'chat:portfolio_context:{version}'
+SYSTEM_PREFIX_CACHE_KEY = 'chat:system_prefix:{version}:{mode}:{tone}:{audience}:{depth}'
+RESPONSE_CACHE_KEY = 'chat:response:{scope}:{digest}'
+RESPONSE_INDEX_KEY = 'chat:response_index:{scope}'
+RESPONSE_CACHE_STAT_KEY = 'chat:response_cache:{stat}'
+CHAT_JOB_KEY = 'chat:job:{session}:{digest}'
+
+QUERY_WORD_RE = re.compile(r"[a-z0-9']+")
+SOURCE_LINK_RE = re.compile(r'/(projects|gigs)/([a-zA-Z0-9-]+)')
+
+DEPTH_INSTRUCTIONS = {
+    'short': "Keep responses concise and to the point (1-2 sentences for simple questions, 1-2 paragraphs for complex ones).",
+    'medium': "Provide balanced responses with good detail (2-3 paragraphs typically).",
+    'long': "Provide comprehensive, detailed responses with examples and context."
+}
+
+SYSTEM_MESSAGE_SUFFIX = """
+
+Example response format:
+"Based on the portfolio, Edzio has extensive experience with React and Django, as demonstrated in the Realtime Chat App project (See Project: Realtime Chat App - /projects/realtime-chat). This project achieved 99.9% uptime and served over 10,000 users."
+
+Remember: Always be helpful, accurate, and cite your sources with internal links!"""
+
+# Returned when no LLM slot frees up within LLM_QUEUE_MAX_WAIT
+BUSY_RESPONSE = {
+    'response': "I'm answering a lot of questions right now. Please try again in a moment, or contact me directly via email.",
+    'sources': [],
+    'tokens_used': 0,
+    'model_used': 'busy'
+}
+
+
+def get_portfolio_context_version():
+    """Current version of the precomputed portfolio context"""
+    version = cache.get(PORTFOLIO_CONTEXT_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(PORTFOLIO_CONTEXT_VERSION_KEY, version, None)
+        version = cache.get(PORTFOLIO_CONTEXT_VERSION_KEY, version)
+    return version
+
+
+def bump_portfolio_context_version():
+    """Retire the cached context and prompt prefixes after portfolio content changes"""
+    cache.set(PORTFOLIO_CONTEXT_VERSION_KEY, time.time_ns(), None)
+
+
+def normalize_query(query):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return ' '.join(QUERY_WORD_RE.findall(query.lower()))
+
+
+def hashed_vector(text, dimensions=512):
+    """Unit-length sparse vector of hashed word unigrams and bigrams"""
+    words = text.split()
+    features = words + [f'{first} {second}' for first, second in zip(words, words[1:])]
+    
+    vector = {}
+    for feature in features:
+        digest = hashlib.md5(feature.encode('utf-8')).digest()
+        index = int.from_bytes(digest[:4], 'little') % dimensions
+        vector[index] = vector.get(index, 0) + (1 if digest[4] & 1 else -1)
+    
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {index: weight / norm for index, weight in vector.items()} if norm else {}
+
+
+def cosine_similarity(first, second):
+    if len(first) > len(second):
+        first, second = second, first
+    return sum(weight * second.get(index, 0) for index, weight in first.items())
+
+
+def record_response_cache_stat(stat, amount=1):
+    key = RESPONSE_CACHE_STAT_KEY.format(stat=stat)
+    cache.add(key, 0, None)
+    cache.incr(key, amount)
+
+
+def get_response_cache_stats():
+    stats = cache.get_many([RESPONSE_CACHE_STAT_KEY.format(stat=stat) for stat in ('hits', 'misses', 'tokens_saved')])
+    hits = stats.get(RESPONSE_CACHE_STAT_KEY.format(stat='hits'), 0)
+    misses = stats.get(RESPONSE_CACHE_STAT_KEY.format(stat='misses'), 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0,
+        'tokens_saved': stats.get(RESPONSE_CACHE_STAT_KEY.format(stat='tokens_saved'), 0),
+    }
+
+
+class ResponseCache:
+    """
+    Reuse answers to repeated opening questions.
+    
+    Entries are scoped by portfolio-context and retrieval versions, audience,
+    tone, depth and focused project, so content edits and persona changes never serve stale
+    answers. Lookups try the exact normalized query first, then the closest
+    hashed-vector match in the scope's bounded index above
+    ``CHAT_RESPONSE_CACHE_THRESHOLD``.
+    """
+    
+    def __init__(self, audience, tone, depth, context=None):
+        project_id = (context or {}).get('project_id', '-')
+        scope = (f"{get_portfolio_context_version()}:{get_retrieval_sequence()}:"
+                 f"{audience}:{tone}:{depth}:{project_id}")
+        self.scope = hashlib.md5(scope.encode('utf-8')).hexdigest()
+        self.timeout = getattr(settings, 'CHAT_RESPONSE_CACHE_TIMEOUT', 60 * 60 * 24)
+    
+    def entry_key(self, normalized):
+        digest = hashlib.md5(normalized.encode('utf-8')).hexdigest()
+        return RESPONSE_CACHE_KEY.format(scope=self.scope, digest=digest)
+    
+    def lookup(self, query):
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        
+        match_type, similarity = 'exact', 1.0
+        entry = cache.get(self.entry_key(normalized))
+        
+        if entry is None:
+            vector = hashed_vector(normalized)
+            threshold = getattr(settings, 'CHAT_RESPONSE_CACHE_THRESHOLD', 0.9)
+            best_key, best_score = None, threshold
+            for key, candidate in cache.get(RESPONSE_INDEX_KEY.format(scope=self.scope), []):
+                score = cosine_similarity(vector, candidate)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key:
+                entry = cache.get(best_key)
+                match_type, similarity = 'semantic', round(best_score, 4)
+        
+        if entry is None:
+            record_response_cache_stat('misses')
+            return None
+        
+        record_response_cache_stat('hits')
+        record_response_cache_stat('tokens_saved', entry['tokens_used'])
+        return {
+            'response': entry['response'],
+            'sources': entry['sources'],
+            'tokens_used': 0,
+            'model_used': f'cache:{match_type}',
+            'cache': {
+                'type': match_type,
+                'similarity': similarity,
+                'tokens_saved': entry['tokens_used'],
+                'model': entry['model_used'],
+            }
+        }
+    
+    def store(self, query, response_data):
+        normalized = normalize_query(query)
+        if not normalized:
+            return
+        
+        key = self.entry_key(normalized)
+        cache.set(key, {
+            'response': response_data['response'],
+            'sources': response_data['sources'],
+            'tokens_used': response_data['tokens_used'],
+            'model_used': response_data['model_used'],
+        }, self.timeout)
+        
+        index_key = RESPONSE_INDEX_KEY.format(scope=self.scope)
+        index = [item for item in cache.get(index_key, []) if item[0] != key]
+        index.append((key, hashed_vector(normalized)))
+        cache.set(index_key, index[-getattr(settings, 'CHAT_RESPONSE_CACHE_INDEX_SIZE', 200):], self.timeout)
+
+
+def get_response_cache(session, audience, tone, depth, context=None):
+    """Response cache for this turn, or None when the answer may depend on history"""
+    if not getattr(settings, 'CHAT_RESPONSE_CACHE_ENABLED', True) or session.message_count:
+        return None
+    return ResponseCache(audience, tone, depth, context)
+
+
+class SourceIndex:
+    """
+    Per-process slug -> source card lookup for links the model cites.
+    
+    Entries, including misses for slugs that don't exist, are kept until the
+    portfolio context version moves, which happens on any project or gig change.
+    Unknown slugs are resolved with one ``slug__in`` query per type.
+    """
+    
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self.version = None
+        self.cards = {}
+    
+    def resolve(self, links):
+        """Source cards for ``(kind, slug)`` pairs, in order, skipping unknown slugs"""
+        version = get_portfolio_context_version()
+        if version != self.version or len(self.cards) > self.max_entries:
+            self.version, self.cards = version, {}
+        cards = self.cards
+        
+        missing = {}
+        for kind, slug in links:
+            if (kind, slug) not in cards:
+                missing.setdefault(kind, []).append(slug)
+        for kind, slugs in missing.items():
+            found = self.load(kind, slugs)
+            for slug in slugs:
+                cards[(kind, slug)] = found.get(slug)
+        
+        return [cards[link] for link in links if cards.get(link)]
+    
+    def load(self, kind, slugs):
+        if kind == 'projects':
+            projects = (Project.objects
+                        .filter(slug__in=slugs, visibility='public')
+                        .values('slug', 'title', 'short_tagline'))
+            return {
+                project['slug']: {
+                    'type': 'project',
+                    'title': project['title'],
+                    'url': f"/projects/{project['slug']}",
+                    'description': project['short_tagline']
+                }
+                for project in projects
+            }
+        gigs = Gig.objects.filter(slug__in=slugs).values('slug', 'title', 'short_description')
+        return {
+            gig['slug']: {
+                'type': 'gig',
+                'title': gig['title'],
+                'url': f"/gigs/{gig['slug']}",
+                'description': gig['short_description']
+            }
+            for gig in gigs
+        }
+
+
+source_index = SourceIndex()
+
+
+def create_chat_session(request, audience, tone):
+    """Create new chat session"""
+    return ChatSession.objects.create(
+        user=request.user if request.user.is_authenticated else None,
+        session_id=request.session.session_key if request.session.session_key else str(uuid.uuid4()),
+        audience_tag=audience,
+        persona_tone=tone
+    )
+
+
+def resolve_chat_session(request, session_id, audience, tone):
+    """Find the caller's chat session or start a new one"""
+    if request.user.is_authenticated:
+        # For authenticated users, find their existing session or create a new one
+        # Ignore session_id from frontend to prevent cross-user contamination
+        try:
+            session = ChatSession.objects.filter(user=request.user, is_active=True).first()
+            if not session:
+                session = create_chat_session(request, audience, tone)
+        except Exception:
+            session = create_chat_session(request, audience, tone)
+        return session
+    
+    # For anonymous users, use session_id logic
+    if session_id:
+        try:
+            return ChatSession.objects.get(id=session_id, user__isnull=True)
+        except ChatSession.DoesNotExist:
+            pass
+    return create_chat_session(request, audience, tone)
+
+
+def assistant_message_fields(content, response_time_ms, tokens_used=0, model_used='', context_data=None,
+                             sources=None, response_cache=None, status='complete'):
+    context_data = dict(context_data or {})
+    if response_cache:
+        context_data['response_cache'] = response_cache
+    return {
+        'content': content,
+        'status': status,
+        'response_time_ms': response_time_ms,
+        'tokens_used': tokens_used,
+        'model_used': model_used,
+        'context_data': context_data,
+        'sources': sources or [],
+    }
+
+
+def record_session_exchange(session, tokens_used):
+    """Add one question and reply to the session counters without a read-modify-write"""
+    now = timezone.now()
+    ChatSession.objects.filter(pk=session.pk).update(
+        message_count=F('message_count') + 2,
+        total_tokens_used=F('total_tokens_used') + tokens_used,
+        last_activity=now,
+        updated_at=now
+    )
+    # Mirror the change for the response; concurrent turns may have moved the stored values further
+    session.message_count += 2
+    session.total_tokens_used += tokens_used
+
+
+def save_chat_turn(session, query, content, response_time_ms, **fields):
+    """
+    Persist a question and its reply in one transaction.
+    
+    Both messages go in with a single ``bulk_create`` and the session
+    counters move with one ``F()`` UPDATE. ``bulk_create`` skips
+    ``post_save``, so the reply is added to the usage rollups here.
+    """
+    fields = assistant_message_fields(content, response_time_ms, **fields)
+    with transaction.atomic():
+        _, ai_message = ChatMessage.objects.bulk_create([
+            ChatMessage(session=session, content=query, is_from_user=True),
+            ChatMessage(session=session, is_from_user=False, **fields),
+        ])
+        record_session_exchange(session, fields['tokens_used'])
+        ChatUsageRollup.record(
+            timezone.localdate(ai_message.created_at),
+            fields['model_used'],
+            response_time_ms,
+            requests=1,
+            tokens_used=fields['tokens_used'],
+            response_time_ms_total=response_time_ms
+        )
+    return ai_message
+
+
+def save_assistant_message(session, content, response_time_ms, message=None, **fields):
+    """
+    Persist the assistant reply to an already stored question and roll the
+    exchange into the session counters.
+    
+    Pass the pending ``message`` of a background job to fill it in instead of
+    creating a new one.
+    """
+    fields = assistant_message_fields(content, response_time_ms, **fields)
+    with transaction.atomic():
+        if message is None:
+            ai_message = ChatMessage.objects.create(session=session, is_from_user=False, **fields)
+        else:
+            for field, value in fields.items():
+                setattr(message, field, value)
+            message.save(update_fields=[*fields, 'updated_at'])
+            ai_message = message
+        record_session_exchange(session, fields['tokens_used'])
+    return ai_message
+
+
+def chat_job_key(session, query, audience, depth, tone):
+    digest = hashlib.sha256(f"{normalize_query(query)}:{audience}:{depth}:{tone}".encode('utf-8')).hexdigest()
+    return CHAT_JOB_KEY.format(session=session.id, digest=digest)
+
+
+def claim_chat_job(session, query, audience, depth, tone):
+    """
+    Message id for a background reply to this query.
+    
+    Returns ``(message_id, created)``; a repeat of the same query in the same
+    session within ``CHAT_JOB_DEDUP_WINDOW`` gets the first submission's id and
+    ``created=False``.
+    """
+    key = chat_job_key(session, query, audience, depth, tone)
+    message_id = uuid.uuid4()
+    if cache.add(key, message_id, getattr(settings, 'CHAT_JOB_DEDUP_WINDOW', 300)):
+        return message_id, True
+    existing = cache.get(key)
+    if existing is None:
+        # The claim expired between add() and get()
+        cache.set(key, message_id, getattr(settings, 'CHAT_JOB_DEDUP_WINDOW', 300))
+        return message_id, True
+    return existing, False
+
+
+def release_chat_job(session, query, audience, depth, tone):
+    """Let a failed job's query be submitted again straight away"""
+    cache.delete(chat_job_key(session, query, audience, depth, tone))
+
+
+def track_chat_query(request, session, query, response_time_ms, audience, tone, depth, tokens_used):
+    metadata = {
+        'chat_session_id': str(session.id),
+        'query_length': len(query),
+        'response_time_ms': response_time_ms,
+        'audience': audience,
+        'tone': tone,
+        'depth': depth,
+        'tokens_used': tokens_used,
+    }
+    if request is None:
+        # Background jobs have no request; attribute them to the chat session. A worker
+        # isn't latency-bound and its pool processes can exit without flushing, so write now
+        AnalyticsEvent.objects.create(
+            event_type='chat_query', user=session.user, session_id=session.session_id, metadata=metadata
+        )
+        return
+    # Buffered: the event is written in a later batch rather than on this request
+    analytics_buffer.record(
+        event_type='chat_query',
+        user=request.user if request.user.is_authenticated else None,
+        session_id=request.session.session_key,
+        metadata=metadata,
+    )
+
+
+def format_sse(event, data):
+    """Encode one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
 
 
 class ChatAIService:
     """Service for handling AI chat interactions"""
     
     def __init__(self):
-        if settings.OPENAI_API_KEY:
-            self.client = openai.OpenAI(
-                api_key=settings.OPENAI_API_KEY,
-                base_url=getattr(settings, 'OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'),
-                default_headers={
-                    "HTTP-Referer": getattr(settings, 'FRONTEND_URL', 'http://localhost:3000'),
-                    "X-Title": getattr(settings, 'SITE_NAME', "Edzio's Portfolio"),
-                }
-            )
-        else:
-            self.client = None
-        self.site_config = SiteConfiguration.load()
+        # Shared registry: pooled connections, retries and provider failover
+        self.llm = get_llm()
+    
+    @cached_property
+    def site_config(self):
+        # Only needed when a prompt prefix has to be rendered
+        return SiteConfiguration.load()
     
-    def generate_response(self, query, session, context=None, audience='general', depth='medium', tone='professional'):
+    def generate_response(self, query, session, context=None, audience='general', depth='medium', tone='professional',
+                          client=None):
         """Generate AI response to user query"""
-        if not self.client:
+        faq_answer = self.answer_from_faq(query, context)
+        if faq_answer:
+            return faq_answer
+        
+        response_cache = get_response_cache(session, audience, tone, depth, context)
+        if response_cache:
+            cached = response_cache.lookup(query)
+            if cached:
+                return cached
+        
+        if not self.llm.available:
             return {
                 'response': "I apologize, but the AI assistant is currently unavailable. Please try contacting directly via email.",
                 'sources': [],
@@ -34,34 +471,11 @@ class ChatAIService:
                 'model_used': 'none'
             }
         
-        # Build context from portfolio data
-        portfolio_context = self.build_portfolio_context(context)
-        
-        # Get persona prompt
-        persona_prompt = self.get_persona_prompt(audience, tone)
-        
-        # Build system message
-        system_message = self.build_system_message(persona_prompt, portfolio_context, depth)
-        
-        # Get conversation history
-        conversation_history = self.get_conversation_history(session)
-        
-        # Build messages
-        messages = [
-            {"role": "system", "content": system_message},
-            *conversation_history,
-            {"role": "user", "content": query}
-        ]
+        messages = self.build_messages(query, session, context, audience, depth, tone)
         
         try:
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=messages,
-                max_tokens=settings.OPENAI_MAX_TOKENS,
-                temperature=0.7,
-                presence_penalty=0.1,
-                frequency_penalty=0.1
-            )
+            with llm_limiter.slot(client or f'session:{session.id}'):
+                response, provider = self.llm.complete(**self.completion_kwargs(messages))
             
             ai_response = response.choices[0].message.content
             tokens_used = response.usage.total_tokens
@@ -69,15 +483,71 @@ class ChatAIService:
             # Extract sources from response
             sources = self.extract_sources(ai_response, context)
             
-            return {
+            result = {
                 'response': ai_response,
                 'sources': sources,
                 'tokens_used': tokens_used,
-                'model_used': settings.OPENAI_MODEL
+                'model_used': provider.model
             }
+            if response_cache:
+                response_cache.store(query, result)
+            return result
+        
+        except QueueTimeout:
+            return dict(BUSY_RESPONSE)
+        except Exception as e:
+            logger.exception("OpenAI API error: %s", e)
+            return {
+                'response': "I'm having trouble processing your request. Please try rephrasing your question or contact me directly.",
+                'sources': [],
+                'tokens_used': 0,
+                'model_used': 'error'
+            }
+    
+    async def agenerate_response(self, query, session, context=None, audience='general', depth='medium', tone='professional',
+                                 client=None):
+        """Async variant of generate_response; the LLM call awaits instead of blocking a worker"""
+        faq_answer = await sync_to_async(self.answer_from_faq)(query, context)
+        if faq_answer:
+            return faq_answer
+        
+        response_cache = await sync_to_async(get_response_cache)(session, audience, tone, depth, context)
+        if response_cache:
+            cached = await sync_to_async(response_cache.lookup)(query)
+            if cached:
+                return cached
+        
+        if not self.llm.available:
+            return {
+                'response': "I apologize, but the AI assistant is currently unavailable. Please try contacting directly via email.",
+                'sources': [],
+                'tokens_used': 0,
+                'model_used': 'none'
+            }
+        
+        messages = await sync_to_async(self.build_messages)(query, session, context, audience, depth, tone)
+        
+        try:
+            async with llm_limiter.aslot(client or f'session:{session.id}'):
+                response, provider = await self.llm.acomplete(**self.completion_kwargs(messages))
+            
+            ai_response = response.choices[0].message.content
+            sources = await sync_to_async(self.extract_sources)(ai_response, context)
             
+            result = {
+                'response': ai_response,
+                'sources': sources,
+                'tokens_used': response.usage.total_tokens,
+                'model_used': provider.model
+            }
+            if response_cache:
+                await sync_to_async(response_cache.store)(query, result)
+            return result
+        
+        except QueueTimeout:
+            return dict(BUSY_RESPONSE)
         except Exception as e:
-            print(f"OpenAI API error: {e}")
+            logger.exception("OpenAI API error: %s", e)
             return {
                 'response': "I'm having trouble processing your request. Please try rephrasing your question or contact me directly.",
                 'sources': [],
@@ -85,16 +555,238 @@ class ChatAIService:
                 'model_used': 'error'
             }
     
+    def answer_from_faq(self, query, context=None):
+        """A curated FAQ answer when the query matches one confidently, or None"""
+        entry = match_faq(query)
+        if entry is None:
+            return None
+        return {
+            'response': entry['answer'],
+            'sources': self.extract_sources(' '.join([entry['answer'], *entry['related_urls']]), context),
+            'tokens_used': 0,
+            'model_used': 'faq'
+        }
+    
+    def completion_kwargs(self, messages):
+        return {
+            'messages': messages,
+            'max_tokens': settings.OPENAI_MAX_TOKENS,
+            'temperature': 0.7,
+            'presence_penalty': 0.1,
+            'frequency_penalty': 0.1,
+        }
+    
+    def stream_response(self, query, session, context=None, audience='general', depth='medium', tone='professional',
+                        client=None):
+        """
+        Stream an AI response as it is generated.
+        
+        Yields ``{'event': 'token', 'content': ...}`` for each text delta and
+        finishes with one ``{'event': 'done', ...}`` carrying the same keys as
+        ``generate_response``.
+        """
+        faq_answer = self.answer_from_faq(query, context)
+        if faq_answer:
+            yield {'event': 'token', 'content': faq_answer['response']}
+            yield {'event': 'done', **faq_answer}
+            return
+        
+        response_cache = get_response_cache(session, audience, tone, depth, context)
+        if response_cache:
+            cached = response_cache.lookup(query)
+            if cached:
+                yield {'event': 'token', 'content': cached['response']}
+                yield {'event': 'done', **cached}
+                return
+        
+        if not self.llm.available:
+            message = "I apologize, but the AI assistant is currently unavailable. Please try contacting directly via email."
+            yield {'event': 'token', 'content': message}
+            yield {'event': 'done', 'response': message, 'sources': [], 'tokens_used': 0, 'model_used': 'none'}
+            return
+        
+        messages = self.build_messages(query, session, context, audience, depth, tone)
+        chunks = []
+        tokens_used = 0
+        
+        try:
+            # The slot is held until the stream is fully read or the client goes away
+            with llm_limiter.slot(client or f'session:{session.id}'):
+                stream, provider = self.llm.complete(
+                    **self.completion_kwargs(messages),
+                    stream=True,
+                    stream_options={'include_usage': True}
+                )
+                
+                for chunk in stream:
+                    # The final chunk carries usage and no choices
+                    if getattr(chunk, 'usage', None):
+                        tokens_used = chunk.usage.total_tokens
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        chunks.append(delta)
+                        yield {'event': 'token', 'content': delta}
+        
+        except QueueTimeout:
+            yield {'event': 'token', 'content': BUSY_RESPONSE['response']}
+            yield {'event': 'done', **BUSY_RESPONSE}
+            return
+        except Exception as e:
+            logger.exception("OpenAI API error: %s", e)
+            message = "I'm having trouble processing your request. Please try rephrasing your question or contact me directly."
+            if not chunks:
+                yield {'event': 'token', 'content': message}
+            yield {
+                'event': 'done',
+                'response': ''.join(chunks) or message,
+                'sources': [],
+                'tokens_used': tokens_used,
+                'model_used': 'error'
+            }
+            return
+        
+        ai_response = ''.join(chunks)
+        result = {
+            'response': ai_response,
+            'sources': self.extract_sources(ai_response, context),
+            'tokens_used': tokens_used,
+            'model_used': provider.model
+        }
+        if response_cache:
+            response_cache.store(query, result)
+        yield {'event': 'done', **result}
+    
+    def build_messages(self, query, session, context, audience, depth, tone):
+        """Assemble the system prompt, recent history and the new query under the token ceiling"""
+        ceiling = getattr(settings, 'CHAT_PROMPT_TOKEN_CEILING', 6000)
+        budget = PromptBudget(ceiling)
+        
+        # The question and the cached prefix always go in; the prefix gets whatever the question leaves
+        user_query = truncate_to_tokens(query, getattr(settings, 'CHAT_PROMPT_QUERY_TOKENS', 500))
+        budget.spend(user_query + SYSTEM_MESSAGE_SUFFIX)
+        system_prefix = self.fit_system_prefix(audience, tone, depth, budget.limit(ceiling))
+        budget.spend(system_prefix)
+        
+        sections = []
+        focused_project = self.build_focused_project_context(context)
+        if focused_project:
+            focused_text = budget.take(
+                json.dumps(focused_project, cls=DjangoJSONEncoder, ensure_ascii=False),
+                getattr(settings, 'CHAT_PROMPT_FOCUSED_TOKENS', 600)
+            )
+            sections.append(f"Focused Project:\n{focused_text}")
+        
+        # Recent turns verbatim, older ones through the rolling summary
+        conversation_history = self.get_conversation_history(
+            session,
+            token_budget=budget.limit(getattr(settings, 'CHAT_PROMPT_HISTORY_TOKENS', 1500)),
+            current_query=query
+        )
+        for message in conversation_history:
+            budget.spend(message['content'])
+        if session.conversation_summary:
+            summary = budget.take(session.conversation_summary, getattr(settings, 'CHAT_PROMPT_SUMMARY_TOKENS', 300))
+            sections.append(f"Earlier in this conversation:\n{summary}")
+        
+        if getattr(settings, 'CHAT_RETRIEVAL_ENABLED', True):
+            passages = retrieve_passages(
+                query, token_budget=budget.limit(getattr(settings, 'CHAT_RETRIEVAL_TOKEN_BUDGET', 800))
+            )
+            if passages:
+                sections.append("Relevant Passages:\n" + '\n\n'.join(self.format_passage(passage) for passage in passages))
+        
+        return [
+            {"role": "system", "content": self.build_system_message(system_prefix, sections)},
+            *conversation_history,
+            {"role": "user", "content": user_query}
+        ]
+    
+    def get_portfolio_document(self, version=None):
+        """Precomputed portfolio context and its JSON rendering for the current version"""
+        version = version or get_portfolio_context_version()
+        # Rebuilt only after a version bump; the soft TTL is a safety net against missed signals
+        return get_or_refresh(
+            PORTFOLIO_CONTEXT_CACHE_KEY.format(version=version),
+            self.build_portfolio_document,
+            getattr(settings, 'PORTFOLIO_CONTEXT_SOFT_TTL', 60 * 60 * 6),
+            hard_ttl=getattr(settings, 'PORTFOLIO_CONTEXT_HARD_TTL', 60 * 60 * 24),
+        )
+    
+    def build_portfolio_document(self):
+        context_data = self.build_base_portfolio_context()
+        # Retrieval supplies the details, so its prompts only need an outline
+        summary = {
+            'site_info': context_data['site_info'],
+            'projects': [
+                {key: project[key] for key in ('title', 'short_tagline', 'skills', 'url')}
+                for project in context_data['projects']
+            ],
+            'skills': [skill['name'] for skill in context_data['skills']],
+            'gigs': [
+                {key: gig[key] for key in ('title', 'price_display', 'url')}
+                for gig in context_data['gigs']
+            ],
+        }
+        return {
+            'data': context_data,
+            'text': json.dumps(context_data, cls=DjangoJSONEncoder, ensure_ascii=False),
+            'summary': json.dumps(summary, cls=DjangoJSONEncoder, ensure_ascii=False),
+        }
+    
     def build_portfolio_context(self, context=None):
         """Build context from portfolio data"""
+        context_data = dict(self.get_portfolio_document()['data'])
+        focused_project = self.build_focused_project_context(context)
+        if focused_project:
+            context_data['focused_project'] = focused_project
+        return context_data
+    
+    def build_focused_project_context(self, context=None):
+        """Per-request details for the project the visitor is looking at"""
+        if not context or 'project_id' not in context:
+            return None
+        
+        try:
+            project = (Project.objects
+                       .select_related('case_study')
+                       .prefetch_related('skills')
+                       .get(id=context['project_id'], visibility='public'))
+        except Project.DoesNotExist:
+            return None
+        
+        focused_project = {
+            'id': project.id,
+            'title': project.title,
+            'description_long': html_to_text(project.description_long),
+            'role': project.role,
+            'skills': [skill.name for skill in project.skills.all()],
+            'metrics': project.metrics,
+            'has_case_study': hasattr(project, 'case_study')
+        }
+        
+        if hasattr(project, 'case_study') and project.case_study.is_published:
+            case_study = project.case_study
+            focused_project['case_study'] = {
+                'problem_statement': html_to_text(case_study.problem_statement),
+                'approach': html_to_text(case_study.approach),
+                'results': html_to_text(case_study.results)
+            }
+        
+        return focused_project
+    
+    def build_base_portfolio_context(self):
+        """Site, project, skill and gig data shared by every conversation"""
+        site_config = SiteConfiguration.load()
         context_data = {
             'site_info': {
-                'name': self.site_config.site_name,
-                'tagline': self.site_config.site_tagline,
-                'email': self.site_config.email,
-                'location': self.site_config.location,
-                'about_short': self.site_config.about_short,
-                'about_medium': self.site_config.about_medium,
+                'name': site_config.site_name,
+                'tagline': site_config.site_tagline,
+                'email': site_config.email,
+                'location': site_config.location,
+                'about_short': site_config.about_short,
+                'about_medium': site_config.about_medium,
             },
             'projects': [],
             'skills': [],
@@ -121,14 +813,14 @@ class ChatAIService:
             context_data['projects'].append(project_data)
         
         # Get skills
-        skills = Skill.objects.filter(projects__visibility='public').distinct()
+        skills = Skill.objects.filter(public_project_count__gt=0)
         for skill in skills:
             skill_data = {
                 'name': skill.name,
                 'category': skill.category,
                 'proficiency_level': skill.proficiency_level,
                 'description': skill.description,
-                'project_count': skill.projects.filter(visibility='public').count()
+                'project_count': skill.public_project_count
             }
             context_data['skills'].append(skill_data)
         
@@ -145,31 +837,6 @@ class ChatAIService:
             }
             context_data['gigs'].append(gig_data)
         
-        # Add specific context if provided
-        if context:
-            if 'project_id' in context:
-                try:
-                    project = Project.objects.get(id=context['project_id'], visibility='public')
-                    context_data['focused_project'] = {
-                        'id': project.id,
-                        'title': project.title,
-                        'description_long': project.description_long,
-                        'role': project.role,
-                        'skills': [skill.name for skill in project.skills.all()],
-                        'metrics': project.metrics,
-                        'has_case_study': hasattr(project, 'case_study')
-                    }
-                    
-                    if hasattr(project, 'case_study') and project.case_study.is_published:
-                        case_study = project.case_study
-                        context_data['focused_project']['case_study'] = {
-                            'problem_statement': case_study.problem_statement,
-                            'approach': case_study.approach,
-                            'results': case_study.results
-                        }
-                except Project.DoesNotExist:
-                    pass
-        
         return context_data
     
     def get_persona_prompt(self, audience, tone):
@@ -195,17 +862,44 @@ class ChatAIService:
         
         return f"{base_prompt}\n\n{persona}\n\nAudience context: {audience_prompts.get(audience, audience_prompts['general'])}"
     
-    def build_system_message(self, persona_prompt, portfolio_context, depth):
-        """Build comprehensive system message for AI"""
-        depth_instructions = {
-            'short': "Keep responses concise and to the point (1-2 sentences for simple questions, 1-2 paragraphs for complex ones).",
-            'medium': "Provide balanced responses with good detail (2-3 paragraphs typically).",
-            'long': "Provide comprehensive, detailed responses with examples and context."
-        }
+    def fit_system_prefix(self, audience, tone, depth, token_limit):
+        """The system prefix, shrunk to ``token_limit``: the portfolio outline first, then a hard cut"""
+        prefix = self.get_system_prefix(audience, tone, depth)
+        if estimate_tokens(prefix) <= token_limit:
+            return prefix
+        if not getattr(settings, 'CHAT_RETRIEVAL_ENABLED', True):
+            prefix = self.get_system_prefix(audience, tone, depth, outline=True)
+            if estimate_tokens(prefix) <= token_limit:
+                return prefix
+        logger.warning('System prompt prefix cut to %s tokens to fit the prompt ceiling', token_limit)
+        return truncate_to_tokens(prefix, token_limit)
+    
+    def get_system_prefix(self, audience, tone, depth, outline=None):
+        """
+        Pre-rendered persona, instructions and portfolio data for a persona/audience/depth.
         
-        system_message = f"""{persona_prompt}
+        The portfolio goes in as an outline when ``outline`` is set (the default
+        with retrieval on, which supplies the details) and in full otherwise.
+        """
+        if outline is None:
+            outline = getattr(settings, 'CHAT_RETRIEVAL_ENABLED', True)
+        version = get_portfolio_context_version()
+        mode = 'retrieval' if outline else 'full'
+        key = SYSTEM_PREFIX_CACHE_KEY.format(version=version, mode=mode, tone=tone, audience=audience, depth=depth)
+        prefix = cache.get(key)
+        if prefix is None:
+            prefix = self.render_system_prefix(audience, tone, depth, version, outline)
+            cache.set(key, prefix, getattr(settings, 'PORTFOLIO_CONTEXT_HARD_TTL', 60 * 60 * 24))
+        return prefix
+    
+    def render_system_prefix(self, audience, tone, depth, version=None, outline=True):
+        persona_prompt = self.get_persona_prompt(audience, tone)
+        document = self.get_portfolio_document(version)
+        portfolio_text = document['summary'] if outline else document['text']
+        
+        return f"""{persona_prompt}
 
-{depth_instructions[depth]}
+{DEPTH_INSTRUCTIONS[depth]}
 
 CRITICAL REQUIREMENTS:
 1. You must ALWAYS cite sources when making factual claims about projects, skills, or achievements
@@ -215,61 +909,84 @@ CRITICAL REQUIREMENTS:
 5. Never invent project details, metrics, or capabilities not present in the provided data
 
 Portfolio Data:
-{str(portfolio_context)}
-
-Example response format:
-"Based on the portfolio, Edzio has extensive experience with React and Django, as demonstrated in the Realtime Chat App project (See Project: Realtime Chat App - /projects/realtime-chat). This project achieved 99.9% uptime and served over 10,000 users."
-
-Remember: Always be helpful, accurate, and cite your sources with internal links!"""
-        
-        return system_message
+{portfolio_text}"""
+    
+    def build_system_message(self, system_prefix, sections=()):
+        """Build comprehensive system message for AI"""
+        return '\n\n'.join([system_prefix, *sections]) + SYSTEM_MESSAGE_SUFFIX
     
-    def get_conversation_history(self, session, max_messages=10):
-        """Get recent conversation history"""
-        messages = session.messages.order_by('-created_at')[:max_messages]
+    def format_passage(self, passage):
+        heading = f"[{passage['title']}]"
+        if passage['url']:
+            heading += f" ({passage['url']})"
+        return f"{heading}\n{passage['text']}"
+    
+    def get_conversation_history(self, session, max_messages=10, token_budget=None, current_query=None):
+        """
+        Get recent conversation history that fits the token budget.
+        
+        Turns that no longer fit (or fall outside ``max_messages``) are folded
+        into ``session.conversation_summary`` so they are summarized once and
+        never re-read.
+        """
+        # Replies still being generated by a background job have no content yet
+        messages = session.messages.exclude(status='pending').order_by('-created_at')
+        if session.summary_through:
+            messages = messages.filter(created_at__gt=session.summary_through)
+        messages = list(messages[:max_messages + 1])
+        
+        # Some views store the incoming question before generating; it is sent separately
+        current = None
+        if messages and messages[0].is_from_user and messages[0].content == current_query:
+            current = messages.pop(0)
+        
+        kept = []
+        used = 0
+        for msg in messages[:max_messages]:
+            cost = estimate_tokens(msg.content)
+            if token_budget is not None and used + cost > token_budget:
+                break
+            kept.append(msg)
+            used += cost
+        
+        if len(kept) < len(messages):
+            cutoff = kept[-1] if kept else current
+            self.compact_history(session, before=cutoff.created_at if cutoff else timezone.now())
         
         history = []
-        for msg in reversed(messages):
+        for msg in reversed(kept):
             role = "user" if msg.is_from_user else "assistant"
             history.append({"role": role, "content": msg.content})
         
         return history
     
-    def extract_sources(self, response, context=None):
-        """Extract source links from AI response"""
-        sources = []
+    def compact_history(self, session, before):
+        """Fold unsummarized messages older than ``before`` into the rolling summary"""
+        older = session.messages.filter(created_at__lt=before).exclude(status='pending').order_by('created_at')
+        if session.summary_through:
+            older = older.filter(created_at__gt=session.summary_through)
+        older = list(older)
+        if not older:
+            return
         
-        # Look for project references in the response
-        import re
-        project_pattern = r'/projects/([a-zA-Z0-9-]+)'
-        project_matches = re.findall(project_pattern, response)
+        lines = session.conversation_summary.splitlines() if session.conversation_summary else []
+        for msg in older:
+            speaker = 'Visitor' if msg.is_from_user else 'Assistant'
+            lines.append(f"- {speaker}: {summarize_message(msg.content)}")
         
-        for slug in project_matches:
-            try:
-                project = Project.objects.get(slug=slug, visibility='public')
-                sources.append({
-                    'type': 'project',
-                    'title': project.title,
-                    'url': f'/projects/{project.slug}',
-                    'description': project.short_tagline
-                })
-            except Project.DoesNotExist:
-                pass
-        
-        # Look for gig references
-        gig_pattern = r'/gigs/([a-zA-Z0-9-]+)'
-        gig_matches = re.findall(gig_pattern, response)
-        
-        for slug in gig_matches:
-            try:
-                gig = Gig.objects.get(slug=slug)
-                sources.append({
-                    'type': 'gig',
-                    'title': gig.title,
-                    'url': f'/gigs/{gig.slug}',
-                    'description': gig.short_description
-                })
-            except Gig.DoesNotExist:
-                pass
-        
-        return sources
\ No newline at end of file
+        # Keep the most recent lines that fit the summary budget
+        limit = getattr(settings, 'CHAT_PROMPT_SUMMARY_TOKENS', 300)
+        while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > limit:
+            lines.pop(0)
+        
+        session.conversation_summary = '\n'.join(lines)
+        session.summary_through = older[-1].created_at
+        session.save(update_fields=['conversation_summary', 'summary_through'])
+    
+    def extract_sources(self, response, context=None):
+        """Extract source links from AI response"""
+        # Each cited project or gig once, in the order it first appears
+        links = list(dict.fromkeys(match.groups() for match in SOURCE_LINK_RE.finditer(response)))
+        if not links:
+            return []
+        return source_index.resolve(links)
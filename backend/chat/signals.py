@@ -0,0 +1,117 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from core.models import SiteConfiguration
+from projects.models import Skill, Project, CaseStudy
+from gigs.models import Gig
+from blog.models import BlogPost
+from .models import ChatKnowledgeBase, ChatMessage, ChatSession, ChatUsageRollup
+from .retrieval import record_retrieval_change
+from .services import bump_portfolio_context_version
+
+# Counter-only saves don't change anything the chat context shows
+CONTEXT_IGNORED_UPDATE_FIELDS = {
+    'view_count', 'click_count', 'inquiry_count', 'hire_count', 'usage_count', 'last_used',
+}
+
+RETRIEVAL_DOC_KINDS = {
+    ChatKnowledgeBase: 'kb',
+    Project: 'project',
+    CaseStudy: 'case_study',
+    BlogPost: 'blog',
+}
+
+
+@receiver(post_save, sender=SiteConfiguration)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Gig)
+@receiver(post_delete, sender=Gig)
+def refresh_portfolio_context(sender, update_fields=None, **kwargs):
+    """Version the precomputed chat context whenever portfolio content changes"""
+    if update_fields and set(update_fields) <= CONTEXT_IGNORED_UPDATE_FIELDS:
+        return
+    transaction.on_commit(bump_portfolio_context_version)
+
+
+@receiver(m2m_changed, sender=Project.skills.through)
+def refresh_portfolio_context_on_skills_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(bump_portfolio_context_version)
+
+
+def record_retrieval_changes(doc_keys):
+    for doc_key in doc_keys:
+        record_retrieval_change(doc_key)
+
+
+@receiver(post_save, sender=ChatKnowledgeBase)
+@receiver(post_delete, sender=ChatKnowledgeBase)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=CaseStudy)
+@receiver(post_delete, sender=CaseStudy)
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def refresh_retrieval_index(sender, instance, update_fields=None, **kwargs):
+    """Queue the changed document for re-indexing by every worker's retrieval index"""
+    if update_fields and set(update_fields) <= CONTEXT_IGNORED_UPDATE_FIELDS:
+        return
+    
+    doc_keys = [f'{RETRIEVAL_DOC_KINDS[sender]}:{instance.pk}']
+    # A case study is only indexed while its project is public
+    if sender is Project and kwargs.get('signal') is post_save:
+        doc_keys += [f'case_study:{pk}' for pk in CaseStudy.objects.filter(project=instance).values_list('pk', flat=True)]
+    
+    transaction.on_commit(partial(record_retrieval_changes, doc_keys))
+
+
+@receiver(pre_save, sender=ChatMessage)
+def remember_previous_usage(sender, instance, update_fields=None, **kwargs):
+    """Capture the stored status and rating so post_save rolls up only what changed"""
+    instance._previous_usage = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {'status', 'rating'} & set(update_fields):
+        return
+    instance._previous_usage = (ChatMessage.objects
+                                .filter(pk=instance.pk)
+                                .values_list('status', 'rating')
+                                .first())
+
+
+@receiver(post_save, sender=ChatMessage)
+def update_chat_usage(sender, instance, created, **kwargs):
+    """Count finished replies and rating changes into the usage rollups and session ratings"""
+    if created:
+        previous_status, previous_rating = None, None
+    else:
+        previous_status, previous_rating = (getattr(instance, '_previous_usage', None)
+                                            or (instance.status, instance.rating))
+    
+    increments = {}
+    if instance.status != 'pending' and previous_status in (None, 'pending'):
+        increments.update(
+            requests=1,
+            tokens_used=instance.tokens_used or 0,
+            response_time_ms_total=instance.response_time_ms or 0,
+        )
+    if instance.rating != previous_rating:
+        ChatSession.apply_rating_change(instance.session_id, previous_rating, instance.rating)
+        increments.update(
+            rating_sum=(instance.rating or 0) - (previous_rating or 0),
+            rating_count=(instance.rating is not None) - (previous_rating is not None),
+        )
+    
+    if instance.is_from_user:
+        return
+    ChatUsageRollup.record(
+        timezone.localdate(instance.created_at),
+        instance.model_used,
+        instance.response_time_ms,
+        **increments
+    )
@@ -0,0 +1,79 @@
+import random
+from celery import shared_task
+from celery.exceptions import Retry
+from django.conf import settings
+from django.utils import timezone
+from .models import ChatMessage
+from .services import ChatAIService, release_chat_job, save_assistant_message, track_chat_query
+
+FAILED_REPLY = "I apologize, but I'm having trouble processing your request right now. Please try again in a moment."
+
+
+@shared_task(
+    bind=True,
+    max_retries=getattr(settings, 'CHAT_JOB_MAX_RETRIES', 2),
+    soft_time_limit=getattr(settings, 'CHAT_JOB_TIME_LIMIT', 120),
+    time_limit=getattr(settings, 'CHAT_JOB_TIME_LIMIT', 120) + 15,
+)
+def generate_chat_response(self, message_id, query, context, audience, depth, tone, client=None):
+    """Generate a queued chat reply and store it on its pending message"""
+    message = None
+    try:
+        message = ChatMessage.objects.select_related('session').get(id=message_id)
+        if message.status != 'pending':
+            # Duplicate delivery, or a retry racing an attempt that already finished
+            return f"Chat message {message_id} already {message.status}"
+
+        session = message.session
+        response_data = ChatAIService().generate_response(
+            query=query,
+            session=session,
+            context=context,
+            audience=audience,
+            depth=depth,
+            tone=tone,
+            client=client
+        )
+
+        failed = response_data['model_used'] in ('error', 'busy')
+        if failed and self.request.retries < self.max_retries:
+            raise self.retry(countdown=2 ** self.request.retries + random.uniform(0, 1))
+
+        # Measured from submission, which is what the visitor waited
+        response_time = int((timezone.now() - message.created_at).total_seconds() * 1000)
+        save_assistant_message(
+            session,
+            response_data['response'],
+            response_time,
+            tokens_used=response_data.get('tokens_used', 0),
+            model_used=response_data.get('model_used', ''),
+            context_data=context,
+            sources=response_data.get('sources', []),
+            response_cache=response_data.get('cache'),
+            message=message,
+            status='failed' if failed else 'complete'
+        )
+        if failed:
+            release_chat_job(session, query, audience, depth, tone)
+        track_chat_query(
+            None, session, query, response_time, audience, tone, depth,
+            response_data.get('tokens_used', 0)
+        )
+        return f"Generated chat response {message_id}"
+
+    except Retry:
+        raise
+    except ChatMessage.DoesNotExist:
+        return f"Chat message {message_id} no longer exists"
+    except Exception as e:
+        # Includes SoftTimeLimitExceeded: don't leave the poller waiting on a dead job
+        if message is not None and message.status == 'pending':
+            save_assistant_message(
+                message.session,
+                FAILED_REPLY,
+                int((timezone.now() - message.created_at).total_seconds() * 1000),
+                message=message,
+                status='failed'
+            )
+            release_chat_job(message.session, query, audience, depth, tone)
+        return f"Error generating chat response {message_id}: {e}"
@@ -0,0 +1,269 @@
+import threading
+from unittest import mock
+import httpx
+import openai
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from django.urls import reverse
+from core.buffers import flush_write_buffers
+from core.testing import CacheTestCase, CacheTransactionTestCase
+from .faq import FAQMatcher
+from .limiter import LLMLimiter, QueueTimeout
+from .llm import CircuitBreaker, LLMRegistry
+from .models import ChatKnowledgeBase, ChatMessage, ChatSession, ChatUsageRollup
+from .prompt import estimate_tokens
+from .retrieval import KnowledgeUsageBuffer, RetrievalIndex
+from .services import ChatAIService, claim_chat_job, save_chat_turn
+
+
+class KnowledgeUsageBufferTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.entry = ChatKnowledgeBase.objects.create(title='Rates', content='Hourly rates')
+        self.buffer = KnowledgeUsageBuffer()
+
+    def tearDown(self):
+        self.buffer.flush()
+
+    def test_first_hit_schedules_a_timed_flush(self):
+        with mock.patch('core.buffers.threading.Timer') as timer:
+            self.buffer.record({self.entry.pk})
+            self.buffer.record({self.entry.pk})
+
+        timer.assert_called_once_with(60, self.buffer.flush_from_timer)
+        timer.return_value.start.assert_called_once_with()
+
+    def test_timed_flush_writes_pending_hits(self):
+        with mock.patch('core.buffers.threading.Timer'):
+            self.buffer.record({self.entry.pk})
+            self.buffer.record({self.entry.pk})
+        with mock.patch('core.buffers.connections'):
+            self.buffer.flush_from_timer()
+
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.usage_count, 2)
+        self.assertIsNone(self.buffer.timer)
+
+    def test_shutdown_flushes_every_buffer(self):
+        with mock.patch('core.buffers.threading.Timer'):
+            self.buffer.record({self.entry.pk})
+        flush_write_buffers()
+
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.usage_count, 1)
+
+
+@override_settings(LLM_CONCURRENCY_LIMIT=1)
+class AsyncSlotTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.limiter = LLMLimiter()
+
+    async def test_async_slot_is_held_then_released(self):
+        async with self.limiter.aslot('client'):
+            with self.assertRaises(QueueTimeout):
+                async with self.limiter.aslot('other', max_wait=0):
+                    pass
+        async with self.limiter.aslot('other', max_wait=0):
+            pass
+
+    async def test_async_slot_polls_outside_the_thread_sensitive_executor(self):
+        orm_thread = await sync_to_async(threading.get_ident)()
+        threads = []
+        enqueue = self.limiter.enqueue
+
+        def tracked_enqueue(client):
+            threads.append(threading.get_ident())
+            return enqueue(client)
+
+        with mock.patch.object(self.limiter, 'enqueue', side_effect=tracked_enqueue):
+            async with self.limiter.aslot('client'):
+                pass
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], orm_thread)
+
+
+class BackgroundChatQueryTests(CacheTransactionTestCase):
+    def test_unreachable_broker_fails_the_message_and_frees_the_query(self):
+        with mock.patch('chat.views.generate_chat_response.delay', side_effect=ConnectionError('broker down')):
+            response = self.client.post(
+                reverse('chat:chat_query'), {'query': 'Hello', 'background': True}, content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, 503)
+        message = ChatMessage.objects.get(id=response.json()['message_id'])
+        self.assertEqual(message.status, 'failed')
+        # The same question can be submitted again instead of pointing at the dead message
+        _, created = claim_chat_job(message.session, 'Hello', 'general', 'medium', 'professional')
+        self.assertTrue(created)
+
+
+class ChatUsageRollupSubtractTests(CacheTestCase):
+    def test_subtracting_a_tally_removes_only_those_replies(self):
+        kept = ChatSession.objects.create(session_id='visitor')
+        load_test = ChatSession.objects.create(session_id='load-test')
+        save_chat_turn(kept, 'Hi', 'Hello', 120, tokens_used=10, model_used='gpt')
+        save_chat_turn(load_test, 'Hi', 'Hello', 130, tokens_used=20, model_used='gpt')
+        save_chat_turn(load_test, 'Hi', 'Hello', 5000, tokens_used=30, model_used='fake-llm')
+
+        ChatUsageRollup.subtract(ChatUsageRollup.tally(ChatMessage.objects.filter(session=load_test)))
+
+        expected = ChatUsageRollup.tally(ChatMessage.objects.filter(session=kept))
+        rows = {
+            (row.date, row.model_used, row.latency_bucket_ms): (row.requests, row.tokens_used)
+            for row in ChatUsageRollup.objects.all()
+        }
+        self.assertEqual(rows, {key: (counts['requests'], counts['tokens_used']) for key, counts in expected.items()})
+
+
+class FAQMatcherTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.part_time = ChatKnowledgeBase.objects.create(
+            title='Part-time work', content='Yes, I take part-time contracts.', content_type='faq',
+            match_phrases=['Are you available for part-time work'],
+        )
+        self.python = ChatKnowledgeBase.objects.create(
+            title='Python', content='Python is my main language.', content_type='faq',
+            match_phrases=['Can you do Python'],
+        )
+        self.matcher = FAQMatcher()
+
+    def matched_id(self, query):
+        match = self.matcher.match(query)
+        return match[0]['id'] if match else None
+
+    def test_rephrasings_and_typos_match(self):
+        self.assertEqual(self.matched_id('are you available for part-time work?'), self.part_time.pk)
+        self.assertEqual(self.matched_id('Can you do pythn'), self.python.pk)
+
+    def test_near_misses_with_an_unmatched_query_word_do_not_match(self):
+        for query in ('Are you available for full-time work', 'can you not do python'):
+            with self.subTest(query=query):
+                self.assertIsNone(self.matched_id(query))
+
+
+class RetrievalIndexConcurrencyTests(CacheTestCase):
+    documents = {
+        f'kb:{index}': [{
+            'id': f'kb:{index}#0', 'doc_key': f'kb:{index}', 'title': f'Topic {index}', 'url': '',
+            'text': f'django celery redis caching number{index}', 'kb_id': index,
+        }]
+        for index in range(50)
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.index = RetrievalIndex()
+        with mock.patch('chat.retrieval.load_documents', return_value=self.documents):
+            self.index.rebuild(1)
+
+    def test_search_waits_for_changes_being_applied(self):
+        finished = threading.Event()
+        worker = threading.Thread(target=lambda: (self.index.search('django'), finished.set()))
+        with self.index.index_lock:
+            worker.start()
+            self.assertFalse(finished.wait(0.1))
+        worker.join()
+        self.assertTrue(finished.is_set())
+
+    def test_searches_during_rebuilds_see_a_whole_index(self):
+        errors = []
+        stop = threading.Event()
+
+        def search():
+            while not stop.is_set():
+                try:
+                    results = self.index.search('django caching')
+                    if len(results) != 5:
+                        errors.append(len(results))
+                except Exception as e:
+                    errors.append(e)
+
+        searcher = threading.Thread(target=search)
+        searcher.start()
+        with mock.patch('chat.retrieval.load_documents', return_value=self.documents):
+            for sequence in range(2, 40):
+                self.index.rebuild(sequence)
+        stop.set()
+        searcher.join()
+        self.assertEqual(errors, [])
+
+
+@override_settings(LLM_MAX_RETRIES=0)
+class AsyncCompleteTests(CacheTestCase):
+    async def test_circuit_breaker_cache_calls_run_off_the_event_loop(self):
+        registry = LLMRegistry([
+            {'name': name, 'base_url': f'http://{name}', 'api_key': 'key', 'model': 'model'}
+            for name in ('primary', 'fallback')
+        ])
+        down = mock.Mock()
+        down.chat.completions.create = mock.AsyncMock(
+            side_effect=openai.APIConnectionError(request=httpx.Request('POST', 'http://primary'))
+        )
+        up = mock.Mock()
+        up.chat.completions.create = mock.AsyncMock(return_value='response')
+
+        breaker_threads = []
+
+        def on_thread(method):
+            def wrapper(breaker, *args):
+                breaker_threads.append(threading.get_ident())
+                return method(breaker, *args)
+            return wrapper
+
+        with mock.patch.object(registry, 'get_client', side_effect=lambda base_url, *args, **kwargs: (
+                    down if base_url == 'http://primary' else up)), \
+                mock.patch.multiple(CircuitBreaker, **{
+                    name: on_thread(getattr(CircuitBreaker, name))
+                    for name in ('allow', 'record_failure', 'record_success')
+                }):
+            response, provider = await registry.acomplete(messages=[])
+
+        self.assertEqual((response, provider.name), ('response', 'fallback'))
+        # allow x2, record_failure, record_success
+        self.assertEqual(len(breaker_threads), 4)
+        self.assertNotIn(threading.get_ident(), breaker_threads)
+
+
+class AsyncGenerateResponseTests(CacheTestCase):
+    async def test_response_cache_lookup_runs_off_the_event_loop(self):
+        service = ChatAIService()
+        service.llm = mock.Mock(available=False)
+        threads = []
+
+        def get_response_cache(*args):
+            threads.append(threading.get_ident())
+
+        with mock.patch.object(service, 'answer_from_faq', return_value=None), \
+                mock.patch('chat.services.get_response_cache', side_effect=get_response_cache):
+            result = await service.agenerate_response('Hello', mock.Mock())
+
+        self.assertEqual(result['model_used'], 'none')
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.get_ident(), threads)
+
+
+@override_settings(CHAT_PROMPT_TOKEN_CEILING=1000, CHAT_RETRIEVAL_ENABLED=False)
+class BuildMessagesCeilingTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = ChatSession.objects.create(session_id='visitor')
+        self.service = ChatAIService()
+
+    def prompt_tokens(self, document):
+        with mock.patch.object(self.service, 'get_portfolio_document', return_value=document):
+            messages = self.service.build_messages('What do you build?', self.session, {}, 'general', 'medium', 'professional')
+        return messages, sum(estimate_tokens(message['content']) for message in messages)
+
+    def test_oversized_portfolio_document_falls_back_to_the_outline(self):
+        messages, tokens = self.prompt_tokens({'data': {}, 'text': 'project ' * 5000, 'summary': '{"projects": ["Outline"]}'})
+
+        self.assertLessEqual(tokens, 1000)
+        self.assertIn('"Outline"', messages[0]['content'])
+
+    def test_oversized_outline_is_cut_to_the_ceiling(self):
+        _, tokens = self.prompt_tokens({'data': {}, 'text': 'project ' * 5000, 'summary': 'outline ' * 5000})
+
+        self.assertLessEqual(tokens, 1000)
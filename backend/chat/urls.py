@@ -5,8 +5,12 @@ app_name = 'chat'
 
 urlpatterns = [
     path('query', views.ChatQueryView.as_view(), name='chat_query'),
+    path('query/stream', views.ChatStreamView.as_view(), name='chat_query_stream'),
+    path('query/async', views.AsyncChatQueryView.as_view(), name='chat_query_async'),
+    path('message/<uuid:message_id>/status', views.ChatMessageStatusView.as_view(), name='chat_message_status'),
     path('history', views.ChatHistoryView.as_view(), name='chat_history'),
     path('session/<uuid:session_id>', views.ChatSessionView.as_view(), name='chat_session'),
+    path('session/<uuid:session_id>/messages', views.ChatSessionMessagesView.as_view(), name='chat_session_messages'),
     path('feedback/message', views.MessageFeedbackView.as_view(), name='message_feedback'),
     path('feedback/session', views.SessionFeedbackView.as_view(), name='session_feedback'),
 ]
\ No newline at end of file
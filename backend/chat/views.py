@@ -2,12 +2,25 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
 from django.shortcuts import get_object_or_404
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+import json
+import logging
 from django.utils import timezone
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.urls import reverse
 import openai
 import time
-import uuid
 from django.conf import settings
 
 from .models import ChatSession, ChatMessage, ChatFeedback, ChatKnowledgeBase
@@ -15,8 +28,19 @@ from .serializers import (
     ChatSessionSerializer, ChatMessageSerializer, ChatQuerySerializer,
     ChatFeedbackSerializer, MessageFeedbackSerializer
 )
-from .services import ChatAIService
+from .renderers import EventStreamRenderer
+from .services import (
+    ChatAIService, resolve_chat_session, claim_chat_job, release_chat_job,
+    save_assistant_message, save_chat_turn, track_chat_query, format_sse
+)
+from .tasks import generate_chat_response
 from analytics.models import AnalyticsEvent
+from core.pagination import ChatHistoryPagination, ChatMessagePagination
+from core.utils import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+QUEUE_ERROR_MESSAGE = "Chat is busy right now and couldn't take your question. Please try again in a moment."
 
 
 class ChatQueryView(APIView):
@@ -37,35 +61,12 @@ class ChatQueryView(APIView):
         tone = data.get('tone', 'professional')
         
         # Get or create session - prioritize authenticated user
-        session = None
-        
-        if request.user.is_authenticated:
-            # For authenticated users, find their existing session or create a new one
-            # Ignore session_id from frontend to prevent cross-user contamination
-            try:
-                session = ChatSession.objects.filter(user=request.user, is_active=True).first()
-                if not session:
-                    session = self.create_session(request, audience, tone)
-            except Exception:
-                session = self.create_session(request, audience, tone)
-        else:
-            # For anonymous users, use session_id logic
-            if session_id:
-                try:
-                    session = ChatSession.objects.get(id=session_id, user__isnull=True)
-                except ChatSession.DoesNotExist:
-                    session = self.create_session(request, audience, tone)
-            else:
-                session = self.create_session(request, audience, tone)
+        session = resolve_chat_session(request, session_id, audience, tone)
         
-        # Create user message
-        user_message = ChatMessage.objects.create(
-            session=session,
-            content=query,
-            is_from_user=True
-        )
+        if data.get('background'):
+            return self.enqueue(request, session, query, context, audience, depth, tone)
         
-        # Generate AI response
+        # Generate AI response; the question is stored with the reply in one transaction
         start_time = time.time()
         try:
             ai_service = ChatAIService()
@@ -75,42 +76,29 @@ class ChatQueryView(APIView):
                 context=context,
                 audience=audience,
                 depth=depth,
-                tone=tone
+                tone=tone,
+                client=f'ip:{get_client_ip(request)}'
             )
             
             response_time = int((time.time() - start_time) * 1000)
             
-            # Create AI message
-            ai_message = ChatMessage.objects.create(
-                session=session,
-                content=response_data['response'],
-                is_from_user=False,
-                response_time_ms=response_time,
+            # Store the question and reply and update the session
+            ai_message = save_chat_turn(
+                session,
+                query,
+                response_data['response'],
+                response_time,
                 tokens_used=response_data.get('tokens_used', 0),
                 model_used=response_data.get('model_used', ''),
                 context_data=context,
-                sources=response_data.get('sources', [])
+                sources=response_data.get('sources', []),
+                response_cache=response_data.get('cache')
             )
             
-            # Update session
-            session.message_count += 2
-            session.total_tokens_used += response_data.get('tokens_used', 0)
-            session.save()
-            
             # Track analytics
-            AnalyticsEvent.objects.create(
-                event_type='chat_query',
-                user=request.user if request.user.is_authenticated else None,
-                session_id=request.session.session_key,
-                metadata={
-                    'chat_session_id': str(session.id),
-                    'query_length': len(query),
-                    'response_time_ms': response_time,
-                    'audience': audience,
-                    'tone': tone,
-                    'depth': depth,
-                    'tokens_used': response_data.get('tokens_used', 0),
-                }
+            track_chat_query(
+                request, session, query, response_time, audience, tone, depth,
+                response_data.get('tokens_used', 0)
             )
             
             return Response({
@@ -126,16 +114,10 @@ class ChatQueryView(APIView):
             # Handle AI service errors
             error_message = "I apologize, but I'm having trouble processing your request right now. Please try again in a moment."
             
-            ai_message = ChatMessage.objects.create(
-                session=session,
-                content=error_message,
-                is_from_user=False,
-                response_time_ms=int((time.time() - start_time) * 1000),
+            ai_message = save_chat_turn(
+                session, query, error_message, int((time.time() - start_time) * 1000)
             )
             
-            session.message_count += 2
-            session.save()
-            
             return Response({
                 'session_id': session.id,
                 'message_id': ai_message.id,
@@ -144,49 +126,312 @@ class ChatQueryView(APIView):
                 'error': True
             })
     
-    def create_session(self, request, audience, tone):
-        """Create new chat session"""
-        return ChatSession.objects.create(
-            user=request.user if request.user.is_authenticated else None,
-            session_id=request.session.session_key if request.session.session_key else str(uuid.uuid4()),
-            audience_tag=audience,
-            persona_tone=tone
+    def enqueue(self, request, session, query, context, audience, depth, tone):
+        """Hand generation to a worker and return the pending message to poll"""
+        message_id, created = claim_chat_job(session, query, audience, depth, tone)
+        if created:
+            client = f'ip:{get_client_ip(request)}'
+            queued = True
+
+            def publish():
+                nonlocal queued
+                try:
+                    generate_chat_response.delay(str(message_id), query, context, audience, depth, tone, client)
+                except Exception:
+                    # The broker is unreachable: no worker will ever pick this message up
+                    logger.exception('Could not queue chat message %s', message_id)
+                    queued = False
+                    ChatMessage.objects.filter(id=message_id).update(status='failed', content=QUEUE_ERROR_MESSAGE)
+                    release_chat_job(session, query, audience, depth, tone)
+
+            try:
+                with transaction.atomic():
+                    ChatMessage.objects.bulk_create([
+                        ChatMessage(session=session, content=query, is_from_user=True),
+                        ChatMessage(
+                            id=message_id,
+                            session=session,
+                            content='',
+                            is_from_user=False,
+                            status='pending',
+                            context_data=context
+                        ),
+                    ])
+                    transaction.on_commit(publish)
+            except Exception:
+                # Don't point repeat submissions at a message that was never saved
+                release_chat_job(session, query, audience, depth, tone)
+                raise
+            if not queued:
+                return Response({
+                    'session_id': session.id,
+                    'message_id': message_id,
+                    'status': 'failed',
+                    'response': QUEUE_ERROR_MESSAGE,
+                    'error': True
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        return Response({
+            'session_id': session.id,
+            'message_id': message_id,
+            'status': 'pending',
+            'status_url': reverse('chat:chat_message_status', kwargs={'message_id': message_id})
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class ChatMessageStatusView(APIView):
+    """Poll for the reply to a background chat query"""
+    permission_classes = [AllowAny]
+    
+    def get(self, request, message_id):
+        message = get_object_or_404(
+            ChatMessage.objects.only(
+                'id', 'session_id', 'status', 'content', 'sources', 'response_time_ms'
+            ),
+            id=message_id,
+            is_from_user=False
         )
+        if message.status == 'pending':
+            response = Response({'message_id': message.id, 'status': message.status})
+            response['Retry-After'] = str(getattr(settings, 'CHAT_JOB_POLL_INTERVAL', 1))
+            return response
+        
+        return Response({
+            'session_id': message.session_id,
+            'message_id': message.id,
+            'status': message.status,
+            'response': message.content,
+            'sources': message.sources,
+            'response_time_ms': message.response_time_ms,
+            'error': message.status == 'failed'
+        })
+
+
+class ChatStreamView(APIView):
+    """Stream chat responses to the client as Server-Sent Events"""
+    permission_classes = [AllowAny]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+    
+    def post(self, request):
+        serializer = ChatQuerySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        query = data['query']
+        context = data.get('context', {})
+        audience = data.get('audience', 'general')
+        depth = data.get('depth', 'medium')
+        tone = data.get('tone', 'professional')
+        
+        session = resolve_chat_session(request, data.get('session_id'), audience, tone)
+        ChatMessage.objects.create(session=session, content=query, is_from_user=True)
+        
+        response = StreamingHttpResponse(
+            self.event_stream(request, session, query, context, audience, depth, tone),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    def event_stream(self, request, session, query, context, audience, depth, tone):
+        yield format_sse('session', {'session_id': session.id})
+        
+        start_time = time.time()
+        result = None
+        try:
+            events = ChatAIService().stream_response(
+                query=query,
+                session=session,
+                context=context,
+                audience=audience,
+                depth=depth,
+                tone=tone,
+                client=f'ip:{get_client_ip(request)}'
+            )
+            for event in events:
+                if event['event'] == 'token':
+                    yield format_sse('token', {'content': event['content']})
+                else:
+                    result = event
+        except Exception:
+            result = None
+        
+        response_time = int((time.time() - start_time) * 1000)
+        
+        if result is None:
+            error_message = "I apologize, but I'm having trouble processing your request right now. Please try again in a moment."
+            ai_message = save_assistant_message(session, error_message, response_time)
+            yield format_sse('error', {'message_id': ai_message.id, 'response': error_message})
+            return
+        
+        ai_message = save_assistant_message(
+            session,
+            result['response'],
+            response_time,
+            tokens_used=result['tokens_used'],
+            model_used=result['model_used'],
+            context_data=context,
+            sources=result['sources'],
+            response_cache=result.get('cache')
+        )
+        track_chat_query(request, session, query, response_time, audience, tone, depth, result['tokens_used'])
+        
+        yield format_sse('done', {
+            'session_id': session.id,
+            'message_id': ai_message.id,
+            'sources': result['sources'],
+            'response_time_ms': response_time,
+            'message_count': session.message_count
+        })
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncChatQueryView(View):
+    """
+    Chat query endpoint for ASGI deployments.
+    
+    The LLM round trip is awaited on the event loop, so many in-flight chats
+    share one worker; ORM work runs in short sync_to_async hops. Same
+    request and response shape as ChatQueryView.
+    """
+    
+    async def post(self, request):
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = ChatQuerySerializer(data=payload)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        query = data['query']
+        context = data.get('context', {})
+        audience = data.get('audience', 'general')
+        depth = data.get('depth', 'medium')
+        tone = data.get('tone', 'professional')
+        
+        try:
+            session = await sync_to_async(self.start_exchange)(request, data.get('session_id'), audience, tone)
+        except APIException as e:
+            return JsonResponse({'detail': str(e.detail)}, status=e.status_code)
+        
+        start_time = time.time()
+        response_data = await ChatAIService().agenerate_response(
+            query=query,
+            session=session,
+            context=context,
+            audience=audience,
+            depth=depth,
+            tone=tone,
+            client=f'ip:{get_client_ip(request)}'
+        )
+        response_time = int((time.time() - start_time) * 1000)
+        
+        ai_message = await sync_to_async(self.finish_exchange)(
+            request, session, query, response_data, response_time, context, audience, tone, depth
+        )
+        
+        return JsonResponse({
+            'session_id': session.id,
+            'message_id': ai_message.id,
+            'response': response_data['response'],
+            'sources': response_data.get('sources', []),
+            'response_time_ms': response_time,
+            'message_count': session.message_count
+        }, encoder=DjangoJSONEncoder)
+    
+    def start_exchange(self, request, session_id, audience, tone):
+        # Authenticate exactly like the DRF views (JWT, then session with CSRF checks)
+        drf_request = Request(
+            request,
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        )
+        request.user = drf_request.user
+        
+        return resolve_chat_session(request, session_id, audience, tone)
+    
+    def finish_exchange(self, request, session, query, response_data, response_time, context, audience, tone, depth):
+        ai_message = save_chat_turn(
+            session,
+            query,
+            response_data['response'],
+            response_time,
+            tokens_used=response_data.get('tokens_used', 0),
+            model_used=response_data.get('model_used', ''),
+            context_data=context,
+            sources=response_data.get('sources', []),
+            response_cache=response_data.get('cache')
+        )
+        track_chat_query(
+            request, session, query, response_time, audience, tone, depth,
+            response_data.get('tokens_used', 0)
+        )
+        return ai_message
+
+
+def with_recent_messages(sessions):
+    """Prefetch each session's newest message window, plus one row to tell if older messages exist"""
+    window = getattr(settings, 'CHAT_MESSAGE_WINDOW', 20)
+    return sessions.prefetch_related(Prefetch(
+        'messages',
+        queryset=ChatMessage.objects.order_by('-created_at', '-id')[:window + 1],
+        to_attr='recent_messages'
+    ))
 
 
 class ChatHistoryView(generics.ListAPIView):
-    """Get chat history for user"""
+    """Get chat history for user, newest session first"""
     serializer_class = ChatSessionSerializer
+    pagination_class = ChatHistoryPagination
     
     def get_queryset(self):
         if self.request.user.is_authenticated:
-            return ChatSession.objects.filter(
+            return with_recent_messages(ChatSession.objects.filter(
                 user=self.request.user
-            ).prefetch_related('messages')
+            ))
         else:
             session_id = self.request.session.session_key
             if session_id:
-                return ChatSession.objects.filter(
+                return with_recent_messages(ChatSession.objects.filter(
                     session_id=session_id,
                     user__isnull=True
-                ).prefetch_related('messages')
+                ))
         return ChatSession.objects.none()
 
 
+def get_visible_sessions(request):
+    """Chat sessions the requester may open"""
+    if request.user.is_authenticated:
+        return ChatSession.objects.filter(user=request.user)
+    session_id = request.session.session_key
+    if session_id:
+        return ChatSession.objects.filter(session_id=session_id)
+    return ChatSession.objects.none()
+
+
 class ChatSessionView(generics.RetrieveAPIView):
-    """Get specific chat session"""
+    """Get specific chat session with its latest messages"""
     serializer_class = ChatSessionSerializer
     lookup_field = 'id'
     lookup_url_kwarg = 'session_id'
     
     def get_queryset(self):
-        if self.request.user.is_authenticated:
-            return ChatSession.objects.filter(user=self.request.user).prefetch_related('messages')
-        else:
-            session_id = self.request.session.session_key
-            if session_id:
-                return ChatSession.objects.filter(session_id=session_id).prefetch_related('messages')
-        return ChatSession.objects.none()
+        return with_recent_messages(get_visible_sessions(self.request))
+
+
+class ChatSessionMessagesView(generics.ListAPIView):
+    """Page back through a session's messages, newest first"""
+    serializer_class = ChatMessageSerializer
+    pagination_class = ChatMessagePagination
+    
+    def get_queryset(self):
+        session = get_object_or_404(get_visible_sessions(self.request).only('id'), id=self.kwargs['session_id'])
+        return ChatMessage.objects.filter(session=session)
 
 
 class MessageFeedbackView(APIView):
@@ -204,10 +449,8 @@ class MessageFeedbackView(APIView):
                 message = ChatMessage.objects.get(id=message_id)
                 message.rating = rating
                 message.feedback_comment = comment
-                message.save()
-                
-                # Update session average rating
-                message.session.update_average_rating()
+                # The chat signals roll the change into the session rating and usage rollups
+                message.save(update_fields=['rating', 'feedback_comment', 'updated_at'])
                 
                 # Track feedback
                 AnalyticsEvent.objects.create(
@@ -252,6 +495,10 @@ class ClearChatSessionView(APIView):
             session.message_count = 0
             session.total_tokens_used = 0
             session.average_rating = None
+            session.rating_sum = 0
+            session.rating_count = 0
+            session.conversation_summary = ''
+            session.summary_through = None
             session.save()
             
             # Track analytics
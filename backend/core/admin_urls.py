@@ -9,5 +9,6 @@ urlpatterns = [
     path('leads', admin_views.LeadManagementView.as_view(), name='leads'),
     path('leads/<int:lead_id>', admin_views.LeadDetailView.as_view(), name='lead_detail'),
     path('chat/logs', admin_views.ChatLogsView.as_view(), name='chat_logs'),
+    path('chat/usage', admin_views.ChatUsageView.as_view(), name='chat_usage'),
     path('analytics/export', admin_views.AnalyticsExportView.as_view(), name='analytics_export'),
 ]
\ No newline at end of file
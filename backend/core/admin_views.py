@@ -2,8 +2,11 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
 from rest_framework import status
-from django.db.models import Count, Q
+from django.conf import settings
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Left
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
 from django.contrib.auth import get_user_model
 from django.http import HttpResponse
@@ -11,7 +14,8 @@ import csv
 
 from analytics.models import AnalyticsEvent
 from gigs.models import HireRequest
-from chat.models import ChatSession, ChatMessage
+from core.pagination import LargeResultsSetPagination
+from chat.models import ChatSession, ChatMessage, ChatUsageRollup, LATENCY_BUCKETS_MS
 from notifications.models import Notification
 from projects.models import Project
 
@@ -217,30 +221,136 @@ class ChatLogsView(APIView):
     permission_classes = [IsAdminUser]
     
     def get(self, request):
-        sessions = (ChatSession.objects
-                   .prefetch_related('messages')
-                   .order_by('-created_at')[:50])
+        params = request.query_params
+        sessions = ChatSession.objects.all()
         
-        sessions_data = []
-        for session in sessions:
-            messages = session.messages.order_by('created_at')
-            sessions_data.append({
+        for param, lookup in (('date_from', 'created_at__date__gte'), ('date_to', 'created_at__date__lte')):
+            if params.get(param):
+                try:
+                    value = parse_date(params[param])
+                except ValueError:
+                    value = None
+                if value is None:
+                    return Response({'error': f'{param} must be a YYYY-MM-DD date'}, status=status.HTTP_400_BAD_REQUEST)
+                sessions = sessions.filter(**{lookup: value})
+        
+        if params.get('audience'):
+            sessions = sessions.filter(audience_tag=params['audience'])
+        
+        for param, lookup in (('min_rating', 'average_rating__gte'), ('max_rating', 'average_rating__lte')):
+            if params.get(param):
+                try:
+                    sessions = sessions.filter(**{lookup: float(params[param])})
+                except ValueError:
+                    return Response({'error': f'{param} must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get('rated') in ('true', 'false'):
+            sessions = sessions.filter(average_rating__isnull=params['rated'] == 'false')
+        
+        # Counts and excerpts come from correlated subqueries so a page costs
+        # one query however many sessions it holds
+        session_messages = ChatMessage.objects.filter(session=OuterRef('pk'))
+        sessions = (sessions
+                    .select_related('user')
+                    .only('id', 'created_at', 'audience_tag', 'average_rating', 'user__email')
+                    .annotate(
+                        messages_total=Coalesce(
+                            Subquery(session_messages.order_by().values('session')
+                                     .annotate(total=Count('id')).values('total')),
+                            0
+                        ),
+                        last_message=Subquery(session_messages.exclude(status='pending')
+                                              .order_by('-created_at', '-id')
+                                              .annotate(excerpt=Left('content', 100))
+                                              .values('excerpt')[:1]),
+                    )
+                    .order_by('-created_at', '-id'))
+        
+        paginator = LargeResultsSetPagination()
+        page = paginator.paginate_queryset(sessions, request, view=self)
+        sessions_data = [
+            {
                 'id': session.id,
                 'user': session.user.email if session.user else 'Anonymous',
                 'created_at': session.created_at,
-                'message_count': messages.count(),
-                'last_message': messages.last().content[:100] if messages.exists() else None,
+                'message_count': session.messages_total,
+                'last_message': session.last_message,
                 'audience_tag': session.audience_tag,
                 'average_rating': session.average_rating,
-            })
+            }
+            for session in page
+        ]
         
         return Response({
             'sessions': sessions_data,
+            'count': paginator.page.paginator.count,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
             'total_sessions': ChatSession.objects.count(),
             'total_messages': ChatMessage.objects.count(),
         })
 
 
+class ChatUsageView(APIView):
+    """Chat token spend, latency percentiles and ratings from the usage rollups"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        try:
+            days = min(max(int(request.query_params.get('days', 30)), 1), 365)
+        except ValueError:
+            return Response({'error': 'days must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        rollups = ChatUsageRollup.objects.filter(date__gte=timezone.localdate() - timedelta(days=days - 1))
+        totals = ('requests', 'tokens_used', 'response_time_ms_total', 'rating_sum', 'rating_count')
+        price = getattr(settings, 'CHAT_TOKEN_PRICE_PER_1K', 0)
+        
+        def summarize(row):
+            requests = row['requests'] or 0
+            tokens = row['tokens_used'] or 0
+            return {
+                'requests': requests,
+                'tokens_used': tokens,
+                'estimated_cost': round(tokens / 1000 * price, 4),
+                'average_response_time_ms': round(row['response_time_ms_total'] / requests) if requests else None,
+                'average_rating': round(row['rating_sum'] / row['rating_count'], 2) if row['rating_count'] else None,
+                'rating_count': row['rating_count'] or 0,
+            }
+        
+        by_day = (rollups.values('date')
+                  .annotate(**{field: Sum(field) for field in totals})
+                  .order_by('date'))
+        by_model = (rollups.values('model_used')
+                    .annotate(**{field: Sum(field) for field in totals})
+                    .order_by('-tokens_used'))
+        histogram = dict(rollups.values_list('latency_bucket_ms').annotate(Sum('requests')).order_by())
+        
+        return Response({
+            'days': days,
+            'totals': summarize(rollups.aggregate(**{field: Sum(field) for field in totals})),
+            'latency_percentiles_ms': {
+                name: self.percentile(histogram, fraction)
+                for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+            },
+            'latency_histogram': [
+                {'from_ms': bound, 'requests': histogram.get(bound, 0)} for bound in LATENCY_BUCKETS_MS
+            ],
+            'by_day': [{'date': row['date'], **summarize(row)} for row in by_day],
+            'by_model': [{'model_used': row['model_used'], **summarize(row)} for row in by_model],
+        })
+    
+    def percentile(self, histogram, fraction):
+        """Upper bound of the bucket holding the percentile (the last bucket reports its lower bound)"""
+        total = sum(histogram.values())
+        if not total:
+            return None
+        seen = 0
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            seen += histogram.get(bound, 0)
+            if seen >= fraction * total:
+                return LATENCY_BUCKETS_MS[index + 1] if index + 1 < len(LATENCY_BUCKETS_MS) else bound
+        return LATENCY_BUCKETS_MS[-1]
+
+
 class AnalyticsExportView(APIView):
     """Export analytics data as CSV"""
     permission_classes = [IsAdminUser]
@@ -0,0 +1,83 @@
+"""
+In-memory write buffers for hot paths.
+
+A buffer collects pending writes per process and flushes them when it grows
+past its size limit, from a timer at most ``interval`` seconds after the
+first pending write, at interpreter exit, and when a Celery pool process
+shuts down (prefork children leave through ``os._exit``, which skips
+``atexit``; see ``portfolio.celery``).
+"""
+import atexit
+import logging
+import threading
+import weakref
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_buffers = weakref.WeakSet()
+
+
+class WriteBuffer:
+    """Base class: subclasses store pending writes and implement ``take`` and ``write``"""
+
+    size_setting = None
+    default_size = 100
+    interval_setting = None
+    default_interval = 60
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timer = None
+        _buffers.add(self)
+
+    def take(self):
+        """Remove and return everything pending; called with the lock held"""
+        raise NotImplementedError
+
+    def write(self, pending):
+        """Persist what ``take`` returned and return the number of rows written"""
+        raise NotImplementedError
+
+    def pending_added(self, size):
+        """Flush now once ``size`` reaches the limit, otherwise make sure a timed flush is coming"""
+        if size >= getattr(settings, self.size_setting, self.default_size):
+            self.flush()
+            return
+        with self.lock:
+            # A timer inherited through fork() never fires in the child
+            if self.timer is None or not self.timer.is_alive():
+                self.timer = threading.Timer(
+                    getattr(settings, self.interval_setting, self.default_interval), self.flush_from_timer
+                )
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            pending = self.take()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not pending:
+            return 0
+        return self.write(pending)
+
+    def flush_from_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Timed flush of %s failed', type(self).__name__)
+        finally:
+            # Timer threads open their own connections; don't leak one per flush
+            connections.close_all()
+
+
+def flush_write_buffers():
+    """Flush every buffer in this process"""
+    for buffer in list(_buffers):
+        buffer.flush()
+
+
+atexit.register(flush_write_buffers)
@@ -0,0 +1,221 @@
+import functools
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, models
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+FRAGMENT_VERSION_KEY = 'fragments:version:{name}'
+SWR_LOCK_KEY = '{key}:refresh_lock'
+
+
+def _serializer_name(serializer_class):
+    return f"{serializer_class.__module__}.{serializer_class.__qualname__}"
+
+
+def get_fragment_version(serializer_class):
+    """Current cache namespace version for a serializer class"""
+    key = FRAGMENT_VERSION_KEY.format(name=_serializer_name(serializer_class))
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        # add() keeps the first writer's version if several workers race here
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate_fragments(*serializer_classes):
+    """Drop every cached fragment of the given serializers by moving their namespace"""
+    cache.set_many({
+        FRAGMENT_VERSION_KEY.format(name=_serializer_name(serializer_class)): time.time_ns()
+        for serializer_class in serializer_classes
+    }, None)
+
+
+class CachedFragmentListSerializer(serializers.ListSerializer):
+    """List serializer that assembles items from cached fragments in one round trip"""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        if not items:
+            return []
+
+        child = self.child
+        version = get_fragment_version(type(child))
+        keys = [child.get_fragment_cache_key(item, version) for item in items]
+        cached = cache.get_many(keys)
+
+        fragments = []
+        misses = {}
+        for item, key in zip(items, keys):
+            fragment = cached.get(key)
+            if fragment is None:
+                fragment = child.serialize_fragment(item)
+                misses[key] = fragment
+            fragments.append(fragment)
+
+        if misses:
+            cache.set_many(misses, child.get_fragment_cache_timeout())
+
+        return fragments
+
+
+class CachedFragmentMixin:
+    """
+    Cache each object's serialized dict keyed by serializer class, pk and version fields.
+
+    Serializers using the mixin should set ``list_serializer_class =
+    CachedFragmentListSerializer`` on their Meta so list pages batch-fetch
+    fragments with ``get_many`` and only serialize the misses. Changes that are
+    not reflected in ``fragment_version_fields`` (related objects, computed
+    counts) must call ``invalidate_fragments`` for the serializer.
+    """
+    fragment_version_fields = ('updated_at',)
+    fragment_cache_timeout = None
+
+    def get_fragment_cache_timeout(self):
+        if self.fragment_cache_timeout is not None:
+            return self.fragment_cache_timeout
+        return getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60)
+
+    def get_fragment_cache_key(self, instance, version):
+        parts = [str(getattr(instance, field, '')) for field in self.fragment_version_fields]
+
+        # Absolute media URLs depend on the host the request came in on
+        request = self.context.get('request')
+        host = f"{request.scheme}://{request.get_host()}" if request else ''
+
+        return ':'.join([
+            'fragments', _serializer_name(type(self)), str(version), host, str(instance.pk), *parts
+        ])
+
+    def serialize_fragment(self, instance):
+        return super().to_representation(instance)
+
+    def to_representation(self, instance):
+        if getattr(instance, 'pk', None) is None:
+            return super().to_representation(instance)
+
+        key = self.get_fragment_cache_key(instance, get_fragment_version(type(self)))
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = self.serialize_fragment(instance)
+            cache.set(key, fragment, self.get_fragment_cache_timeout())
+        return fragment
+
+
+def _store_envelope(key, value, soft_ttl, hard_ttl, jitter):
+    # Jitter the soft expiry so entries written together don't go stale together
+    fresh_for = soft_ttl * (1 + random.uniform(-jitter, jitter))
+    cache.set(key, (value, time.time() + fresh_for), hard_ttl)
+
+
+def _refresh(key, compute, soft_ttl, hard_ttl, jitter):
+    lock_key = SWR_LOCK_KEY.format(key=key)
+    try:
+        value = compute()
+        _store_envelope(key, value, soft_ttl, hard_ttl, jitter)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+def _refresh_in_background(key, compute, soft_ttl, hard_ttl, jitter):
+    try:
+        _refresh(key, compute, soft_ttl, hard_ttl, jitter)
+    except Exception:
+        logger.exception('Background refresh of %s failed', key)
+    finally:
+        connections.close_all()
+
+
+def get_or_refresh(key, compute, soft_ttl, hard_ttl=None, jitter=0.1, lock_timeout=30, wait_timeout=5):
+    """
+    Stale-while-revalidate cache read with single-flight recompute.
+
+    Values younger than ``soft_ttl`` are served as-is. Past it, the stale value
+    is still served while the one caller that wins the distributed lock
+    recomputes it on a background thread. Only a cold key or one older than
+    ``hard_ttl`` blocks; concurrent callers then wait for the lock holder's
+    result for up to ``wait_timeout`` seconds before computing it themselves.
+    """
+    hard_ttl = hard_ttl or soft_ttl * 2
+    lock_key = SWR_LOCK_KEY.format(key=key)
+
+    envelope = cache.get(key)
+    if envelope is not None:
+        value, fresh_until = envelope
+        if time.time() >= fresh_until and cache.add(lock_key, True, lock_timeout):
+            threading.Thread(
+                target=_refresh_in_background,
+                args=(key, compute, soft_ttl, hard_ttl, jitter),
+                daemon=True,
+            ).start()
+        return value
+
+    if cache.add(lock_key, True, lock_timeout):
+        return _refresh(key, compute, soft_ttl, hard_ttl, jitter)
+
+    deadline = time.time() + wait_timeout
+    while time.time() < deadline:
+        time.sleep(0.05)
+        envelope = cache.get(key)
+        if envelope is not None:
+            return envelope[0]
+    return compute()
+
+
+def expire_soft(key):
+    """Mark a cached value stale so the next read serves it once and refreshes it"""
+    envelope = cache.get(key)
+    if envelope is None:
+        return
+    # Keep the remaining hard TTL where the backend can report it (django-redis)
+    timeout = cache.ttl(key) if hasattr(cache, 'ttl') else cache.default_timeout
+    if timeout != 0:
+        cache.set(key, (envelope[0], 0), timeout)
+
+
+def stale_while_revalidate(soft_ttl, hard_ttl=None, key=None, jitter=0.1):
+    """
+    Decorator form of ``get_or_refresh``.
+
+    ``key`` may be a string or a callable taking the wrapped function's
+    arguments. Without it the key is derived from the function name and its
+    JSON-encoded arguments, so pass one explicitly for methods and other calls
+    whose arguments have no stable representation.
+    """
+    def decorator(func):
+        prefix = f"swr:{func.__module__}.{func.__qualname__}"
+
+        def build_key(*args, **kwargs):
+            if callable(key):
+                return f"{prefix}:{key(*args, **kwargs)}"
+            if key is not None:
+                return f"{prefix}:{key}"
+            encoded = json.dumps([args, kwargs], sort_keys=True, default=str)
+            return f"{prefix}:{hashlib.md5(encoded.encode('utf-8')).hexdigest()}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_refresh(
+                build_key(*args, **kwargs),
+                lambda: func(*args, **kwargs),
+                soft_ttl,
+                hard_ttl=hard_ttl,
+                jitter=jitter,
+            )
+
+        wrapper.cache_key = build_key
+        return wrapper
+
+    return decorator
@@ -0,0 +1,205 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from analytics.buffer import analytics_buffer
+from analytics.models import AnalyticsEvent
+from chat.fake_llm import FakeLLMServer
+from chat.llm import reset_llm
+from chat.models import ChatSession, ChatMessage, ChatUsageRollup
+
+SYNTHETIC_QUERIES = [
+    "What projects has Edzio built with Django?",
+    "Do you have experience with React and Next.js?",
+    "Tell me about the realtime chat app",
+    "What services do you offer for startups?",
+    "How long does a typical web application take to build?",
+    "Which cloud platforms have you deployed to?",
+    "Can you help with an AI integration for my product?",
+    "What was the hardest technical challenge in your case studies?",
+    "How do you approach testing and CI/CD?",
+    "What is your availability for a new project?",
+]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0
+    index = max(0, min(len(values) - 1, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = 'Replay chat queries through ChatQueryView at several concurrency levels and report latency and cost'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            default='1,4,16',
+            help='Comma-separated concurrency levels to run',
+        )
+        parser.add_argument('--requests', type=int, default=50, help='Chat turns per concurrency level')
+        parser.add_argument(
+            '--source',
+            choices=['synthetic', 'logged'],
+            default='synthetic',
+            help='Replay built-in questions or the most recent logged user messages',
+        )
+        parser.add_argument(
+            '--fake-llm',
+            action='store_true',
+            help='Serve completions from an in-process fake LLM instead of the configured providers',
+        )
+        parser.add_argument('--latency', type=float, default=0.5, help='Fake LLM median time to first token')
+        parser.add_argument('--latency-sigma', type=float, default=0.3, help='Fake LLM latency spread')
+        parser.add_argument('--tokens-per-second', type=float, default=50, help='Fake LLM token throughput')
+        parser.add_argument('--error-rate', type=float, default=0, help='Fraction of fake LLM requests that fail')
+        parser.add_argument(
+            '--response-cache',
+            action='store_true',
+            help='Leave the chat response cache on (off by default so every turn reaches the LLM)',
+        )
+        parser.add_argument('--keep-data', action='store_true', help='Keep the chat sessions created by the run')
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+        queries = self.load_queries(options['source'], options['requests'])
+
+        overrides = {
+            'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+            'CHAT_RESPONSE_CACHE_ENABLED': (options['response_cache']
+                                            and getattr(settings, 'CHAT_RESPONSE_CACHE_ENABLED', True)),
+        }
+
+        server = None
+        if options['fake_llm']:
+            server = FakeLLMServer(
+                ('127.0.0.1', 0),
+                tokens_per_second=options['tokens_per_second'],
+                latency=options['latency'],
+                latency_sigma=options['latency_sigma'],
+                error_rate=options['error_rate'],
+            )
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            overrides['LLM_PROVIDERS'] = [{
+                'name': 'load-test-fake',
+                'base_url': f'http://127.0.0.1:{server.server_address[1]}/v1',
+                'api_key': 'fake',
+                'model': 'fake-llm',
+            }]
+
+        session_ids = []
+        try:
+            with override_settings(**overrides):
+                reset_llm()
+                for level in levels:
+                    results, elapsed = self.run_level(level, queries, options['requests'])
+                    session_ids.extend(result['session_id'] for result in results if result['session_id'])
+                    self.report(level, results, elapsed)
+        finally:
+            reset_llm()
+            if server:
+                server.shutdown()
+                server.server_close()
+            if not options['keep_data']:
+                self.cleanup(session_ids)
+
+    def load_queries(self, source, count):
+        if source == 'logged':
+            logged = list(ChatMessage.objects
+                          .filter(is_from_user=True)
+                          .order_by('-created_at')
+                          .values_list('content', flat=True)[:count])
+            if logged:
+                return logged
+            self.stdout.write(self.style.WARNING('No logged chat messages; using synthetic queries'))
+        return SYNTHETIC_QUERIES
+
+    def run_level(self, concurrency, queries, total):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(
+                lambda index: self.run_turn(index, queries[index % len(queries)]),
+                range(total)
+            ))
+        elapsed = time.perf_counter() - started
+
+        # Token counts and fallback markers are read back after timing so they don't skew it
+        messages = {
+            message['id']: message
+            for message in ChatMessage.objects
+            .filter(id__in=[result['message_id'] for result in results if result['message_id']])
+            .values('id', 'tokens_used', 'model_used')
+        }
+        for result in results:
+            message = messages.get(result['message_id'], {})
+            result['tokens_used'] = message.get('tokens_used', 0)
+            result['failed'] = result['failed'] or message.get('model_used') in ('error', 'busy', 'none')
+        return results, elapsed
+
+    def run_turn(self, index, query):
+        """Post one chat query in this thread, counting the SQL it runs"""
+        statements = []
+
+        def count_queries(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        # A distinct address per simulated visitor keeps the fair queue honest
+        client = Client(REMOTE_ADDR=f'10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}')
+        try:
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                response = client.post(reverse('chat:chat_query'), {'query': query}, content_type='application/json')
+                latency_ms = (time.perf_counter() - started) * 1000
+            payload = response.json() if response.status_code == 200 else {}
+            return {
+                'latency_ms': latency_ms,
+                'queries': len(statements),
+                'session_id': payload.get('session_id'),
+                'message_id': payload.get('message_id'),
+                'failed': response.status_code != 200 or bool(payload.get('error')),
+            }
+        finally:
+            connections.close_all()
+
+    def report(self, concurrency, results, elapsed):
+        latencies = sorted(result['latency_ms'] for result in results)
+        query_counts = [result['queries'] for result in results]
+        tokens = sum(result['tokens_used'] for result in results)
+        failures = sum(1 for result in results if result['failed'])
+
+        self.stdout.write(self.style.SUCCESS(f'Concurrency {concurrency}: {len(results)} turns in {elapsed:.1f}s'))
+        self.stdout.write(
+            f"  latency ms  p50 {percentile(latencies, 0.5):.0f}  p95 {percentile(latencies, 0.95):.0f}"
+            f"  p99 {percentile(latencies, 0.99):.0f}  max {latencies[-1] if latencies else 0:.0f}"
+        )
+        self.stdout.write(
+            f"  db queries per turn  avg {sum(query_counts) / len(query_counts) if query_counts else 0:.1f}"
+            f"  max {max(query_counts, default=0)}"
+        )
+        self.stdout.write(
+            f"  throughput {len(results) / elapsed if elapsed else 0:.2f} turns/s"
+            f"  tokens {tokens} ({tokens / elapsed if elapsed else 0:.0f}/s)"
+        )
+        if failures:
+            self.stdout.write(self.style.WARNING(f'  {failures} turns failed or were degraded'))
+
+    def cleanup(self, session_ids):
+        if not session_ids:
+            return
+        analytics_buffer.flush()
+        AnalyticsEvent.objects.filter(
+            event_type='chat_query',
+            metadata__chat_session_id__in=[str(session_id) for session_id in session_ids]
+        ).delete()
+        # Replies were counted into the usage rollups as they finished; take them back out
+        ChatUsageRollup.subtract(ChatUsageRollup.tally(ChatMessage.objects.filter(session_id__in=session_ids)))
+        deleted, _ = ChatSession.objects.filter(id__in=session_ids).delete()
+        self.stdout.write(f'Removed {len(session_ids)} load-test chat sessions ({deleted} rows)')
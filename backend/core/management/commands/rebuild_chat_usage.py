@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Avg, Count, Sum
+from chat.models import ChatMessage, ChatSession, ChatUsageRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild chat usage rollups and session rating counters from stored messages'
+
+    def handle(self, *args, **options):
+        totals = ChatUsageRollup.tally(ChatMessage.objects.all())
+
+        with transaction.atomic():
+            ChatUsageRollup.objects.all().delete()
+            ChatUsageRollup.objects.bulk_create([
+                ChatUsageRollup(date=date, model_used=model_used, latency_bucket_ms=bucket, **counts)
+                for (date, model_used, bucket), counts in totals.items()
+            ], batch_size=500)
+
+        sessions = ChatSession.objects.annotate(
+            actual_sum=Sum('messages__rating'),
+            actual_count=Count('messages__rating'),
+            actual_average=Avg('messages__rating'),
+        ).only('id', 'rating_sum', 'rating_count', 'average_rating')
+        fixed = []
+        for session in sessions:
+            if (session.rating_sum, session.rating_count) == (session.actual_sum or 0, session.actual_count):
+                continue
+            session.rating_sum = session.actual_sum or 0
+            session.rating_count = session.actual_count
+            session.average_rating = session.actual_average
+            fixed.append(session)
+        ChatSession.objects.bulk_update(fixed, ['rating_sum', 'rating_count', 'average_rating'], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(totals)} usage rollup rows; fixed rating counters on {len(fixed)} sessions'
+        ))
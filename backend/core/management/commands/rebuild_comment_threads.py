@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from blog.models import BlogComment
+
+
+class Command(BaseCommand):
+    help = 'Backfill thread roots and depth on blog comments'
+
+    def handle(self, *args, **options):
+        comments = {
+            comment.pk: comment
+            for comment in BlogComment.objects.only('id', 'parent_id', 'thread_id', 'depth')
+        }
+
+        def resolve(comment):
+            # Walk up the parent chain to the thread root
+            if comment.parent_id is None or comment.parent_id not in comments:
+                return None, 0
+            parent = comments[comment.parent_id]
+            parent_thread_id, parent_depth = resolve(parent)
+            return parent_thread_id or parent.pk, parent_depth + 1
+
+        changed = []
+        for comment in comments.values():
+            thread_id, depth = resolve(comment)
+            if comment.thread_id != thread_id or comment.depth != depth:
+                comment.thread_id = thread_id
+                comment.depth = depth
+                changed.append(comment)
+
+        BlogComment.objects.bulk_update(changed, ['thread', 'depth'], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(f'Updated threading for {len(changed)} comments'))
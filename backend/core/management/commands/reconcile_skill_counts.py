@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from projects.models import Skill
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized public project counts on skills'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted counters without fixing them',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        drifted = [
+            skill for skill in Skill.objects.annotate(
+                actual_count=Count('projects', filter=Q(projects__visibility='public'))
+            )
+            if skill.actual_count != skill.public_project_count
+        ]
+
+        for skill in drifted:
+            self.stdout.write(
+                f'{skill.name}: stored {skill.public_project_count}, actual {skill.actual_count}'
+            )
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All skill counters are in sync'))
+            return
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'DRY RUN - {len(drifted)} skills would be fixed'))
+            return
+
+        Skill.refresh_public_project_counts([skill.pk for skill in drifted])
+        self.stdout.write(self.style.SUCCESS(f'Fixed {len(drifted)} skill counters'))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from chat.fake_llm import DEFAULT_REPLY, run_fake_llm_server
+
+
+class Command(BaseCommand):
+    help = 'Run a local OpenAI-compatible chat completions server that returns canned replies'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8089)
+        parser.add_argument(
+            '--tokens-per-second',
+            type=float,
+            default=50,
+            help='Pace of generated tokens (0 replies as fast as possible)',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0,
+            help='Median seconds before the first token',
+        )
+        parser.add_argument(
+            '--latency-sigma',
+            type=float,
+            default=0,
+            help='Spread of the log-normal latency distribution (0 keeps latency constant)',
+        )
+        parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests that fail')
+        parser.add_argument('--error-status', type=int, default=500, help='HTTP status of failed requests')
+        parser.add_argument('--reply', default=DEFAULT_REPLY, help='Text returned for every completion')
+        parser.add_argument('--verbose', action='store_true', help='Log every request')
+
+    def handle(self, *args, **options):
+        host, port = options['host'], options['port']
+        self.stdout.write(self.style.SUCCESS(
+            f'Fake LLM listening on http://{host}:{port}/v1 (set OPENROUTER_BASE_URL to use it)'
+        ))
+        try:
+            run_fake_llm_server(
+                host,
+                port,
+                reply=options['reply'],
+                tokens_per_second=options['tokens_per_second'],
+                latency=options['latency'],
+                latency_sigma=options['latency_sigma'],
+                error_rate=options['error_rate'],
+                error_status=options['error_status'],
+                verbose=options['verbose'],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
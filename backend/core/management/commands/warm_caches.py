@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from core.warmup import warm_caches
+
+
+class Command(BaseCommand):
+    help = 'Pre-populate resume and fragment caches for the public endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Maximum number of warmup jobs to run at once',
+        )
+
+    def handle(self, *args, **options):
+        status = warm_caches(max_workers=options['concurrency'])
+
+        for name, result in sorted(status['jobs'].items()):
+            if result['ok']:
+                self.stdout.write(f"{name}: {result['items']} items")
+            else:
+                self.stdout.write(self.style.ERROR(f"{name}: {result['error']}"))
+
+        if status['state'] == 'warm':
+            self.stdout.write(self.style.SUCCESS('Caches are warm'))
+        else:
+            self.stdout.write(self.style.WARNING('Caches partially warmed'))
@@ -21,7 +21,7 @@ class AnalyticsMiddleware(MiddlewareMixin):
         """Track API requests as analytics events"""
         try:
             # Skip tracking for certain endpoints
-            skip_paths = ['/api/v1/analytics/event', '/api/v1/auth/refresh', '/api/schema/']
+            skip_paths = ['/api/v1/analytics/event', '/api/v1/auth/refresh', '/api/schema/', '/api/v1/health/']
             if any(path in request.path for path in skip_paths):
                 return
             
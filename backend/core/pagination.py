@@ -1,5 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import b64decode, b64encode
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -33,11 +40,88 @@ class SmallResultsSetPagination(PageNumberPagination):
     max_page_size = 50
 
 
-class ChatHistoryPagination(PageNumberPagination):
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on a two-field key such as ``(created_at, id)``.
+
+    DRF's CursorPagination positions on the first ordering field and skips
+    ties with an offset; here the whole key goes into the WHERE clause, so
+    every page is a single index range scan however far back the client
+    scrolls. Pages only run in ``ordering`` direction: follow ``next``.
+    """
+    ordering = ('-created_at', '-id')
+
+    @classmethod
+    def encode_position(cls, instance):
+        values = [getattr(instance, field.lstrip('-')) for field in cls.ordering]
+        values = [value.isoformat() if isinstance(value, datetime) else str(value) for value in values]
+        return b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+    def decode_position(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            values = json.loads(b64decode(cursor.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # A tampered value would otherwise fail inside the query as a 500
+        try:
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def after(self, position):
+        """Rows that sort after ``position``"""
+        (first, second), (first_value, second_value) = self.ordering, position
+        first_lookup = 'lt' if first.startswith('-') else 'gt'
+        second_lookup = 'lt' if second.startswith('-') else 'gt'
+        first, second = first.lstrip('-'), second.lstrip('-')
+        return (Q(**{f'{first}__{first_lookup}': first_value})
+                | Q(**{first: first_value, f'{second}__{second_lookup}': second_value}))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_position(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        # One extra row tells whether there is a next page
+        rows = list(queryset[:self.page_size + 1])
+        self.page = rows[:self.page_size]
+        self.next_position = self.encode_position(self.page[-1]) if len(rows) > self.page_size else None
+        return self.page
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.next_position)
+
+    def get_previous_link(self):
+        return None
+
+
+class ChatHistoryPagination(KeysetPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+
+class ChatMessagePagination(KeysetPagination):
     page_size = 50
     page_size_query_param = 'page_size'
     max_page_size = 100
-    ordering = '-created_at'
 
 
 class NotificationPagination(PageNumberPagination):
@@ -51,4 +135,11 @@ class AnalyticsEventPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = 'page_size'
     max_page_size = 500
-    ordering = '-timestamp'
\ No newline at end of file
+    ordering = '-timestamp'
+
+
+class BlogCommentCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'created_at'
\ No newline at end of file
@@ -0,0 +1,149 @@
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.utils import timezone
+from projects.models import Skill, Project
+from .models import SiteConfiguration, Achievement
+
+
+RESUME_SNAPSHOT_CACHE_KEY = 'core:resume:snapshot'
+RESUME_REBUILD_PENDING_KEY = 'core:resume:rebuild_pending'
+
+# Experience data (static for now - could be from a separate model)
+RESUME_EXPERIENCE = [
+    {
+        'title': 'Senior Full-Stack Developer',
+        'company': 'Freelance',
+        'duration': '2021 - Present',
+        'description': 'Building scalable web applications and AI-powered solutions for startups and established companies.',
+        'achievements': [
+            'Delivered 15+ production applications with 99.9% uptime',
+            'Implemented AI features that improved user engagement by 40%',
+            'Reduced development time by 30% through reusable component libraries',
+            'Mentored junior developers and established coding standards'
+        ],
+        'technologies': ['Python', 'Django', 'React', 'Next.js', 'PostgreSQL', 'AWS']
+    },
+    {
+        'title': 'Full-Stack Developer',
+        'company': 'TechStart Inc.',
+        'duration': '2019 - 2021',
+        'description': 'Led development of core platform features and API integrations.',
+        'achievements': [
+            'Built REST APIs serving 10,000+ daily requests',
+            'Implemented real-time features using WebSockets',
+            'Optimized database queries reducing response time by 50%',
+            'Established CI/CD pipelines and deployment automation'
+        ],
+        'technologies': ['Python', 'Django', 'JavaScript', 'PostgreSQL', 'Redis', 'Docker']
+    }
+]
+
+# Education data (static for now)
+RESUME_EDUCATION = [
+    {
+        'degree': 'Bachelor of Science in Computer Science',
+        'institution': 'University of Technology',
+        'year': '2019',
+        'details': 'Graduated Magna Cum Laude with focus on Software Engineering and AI'
+    },
+    {
+        'degree': 'AWS Certified Solutions Architect',
+        'institution': 'Amazon Web Services',
+        'year': '2023',
+        'details': 'Professional certification in cloud architecture and best practices'
+    }
+]
+
+
+def build_resume_data():
+    """Build the structured resume document from the database"""
+    config = SiteConfiguration.load()
+
+    # Skills used by public projects, with their maintained counters
+    skills = Skill.objects.filter(public_project_count__gt=0)
+    skills_data = [
+        {
+            'name': skill.name,
+            'category': skill.category,
+            'proficiency_level': skill.proficiency_level,
+            'proficiency': skill.proficiency_level,  # Frontend expects 'proficiency'
+            'color': skill.color,
+            'project_count': skill.public_project_count,
+        }
+        for skill in skills
+    ]
+
+    # Featured projects with their skills prefetched
+    projects = (Project.objects
+                .filter(visibility='public', is_featured=True)
+                .prefetch_related(Prefetch('skills', queryset=Skill.objects.only('id', 'name')))[:6])
+    project_data = [
+        {
+            'title': project.title,
+            'description': project.short_tagline,  # Frontend expects 'description'
+            'role': project.role,
+            'duration': project.duration_display,
+            'technologies': [skill.name for skill in project.skills.all()],  # Frontend expects 'technologies'
+            'metrics': project.metrics or {}
+        }
+        for project in projects
+    ]
+
+    achievement_data = [
+        {
+            'title': achievement.title,
+            'description': achievement.description,
+            'category': achievement.category,
+            'date': achievement.date_achieved.isoformat(),  # Frontend expects 'date'
+            'icon': achievement.icon
+        }
+        for achievement in Achievement.objects.all()[:10]
+    ]
+
+    return {
+        'personal': {
+            'name': config.site_name,
+            'title': config.site_tagline,
+            'email': config.email,
+            'location': config.location,
+            'summary': config.about_medium,
+            'github_url': config.github_url,
+            'linkedin_url': config.linkedin_url,
+        },
+        'experience': RESUME_EXPERIENCE,
+        'skills': skills_data,
+        'projects': project_data,
+        'education': RESUME_EDUCATION,
+        'achievements': achievement_data,
+        'generated_at': timezone.now().isoformat()
+    }
+
+
+def rebuild_resume_snapshot():
+    """Rebuild the resume document and store it as pre-encoded JSON"""
+    snapshot = json.dumps(build_resume_data(), cls=DjangoJSONEncoder).encode('utf-8')
+    cache.set(
+        RESUME_SNAPSHOT_CACHE_KEY,
+        snapshot,
+        getattr(settings, 'RESUME_SNAPSHOT_TIMEOUT', 60 * 60 * 24)
+    )
+    return snapshot
+
+
+def get_resume_snapshot():
+    """Return the stored resume snapshot, building it on a cold cache"""
+    snapshot = cache.get(RESUME_SNAPSHOT_CACHE_KEY)
+    if snapshot is None:
+        snapshot = rebuild_resume_snapshot()
+    return snapshot
+
+
+def schedule_resume_snapshot_rebuild():
+    """Queue a background rebuild, coalescing bursts of content edits"""
+    from .tasks import rebuild_resume_snapshot_task
+
+    if cache.add(RESUME_REBUILD_PENDING_KEY, True, 60):
+        rebuild_resume_snapshot_task.apply_async(countdown=5)
@@ -1,10 +1,17 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from notifications.models import Notification
+from projects.models import Skill, Project
+from .models import SiteConfiguration, Achievement
+from .services import schedule_resume_snapshot_rebuild
 
 User = get_user_model()
 
+# Counter-only saves (e.g. view tracking) never change what the resume shows
+RESUME_IGNORED_UPDATE_FIELDS = {'view_count'}
+
 
 @receiver(post_save, sender=User)
 def create_welcome_notification(sender, instance, created, **kwargs):
@@ -16,4 +23,25 @@ def create_welcome_notification(sender, instance, created, **kwargs):
             title='Welcome to Edzio\'s Portfolio!',
             body='Thank you for joining. Explore projects, chat with the AI assistant, and don\'t hesitate to reach out!',
             link='/projects'
-        )
\ No newline at end of file
+        )
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+@receiver(post_save, sender=SiteConfiguration)
+def refresh_resume_snapshot(sender, update_fields=None, **kwargs):
+    """Rebuild the resume snapshot once resume content changes are committed"""
+    if update_fields and set(update_fields) <= RESUME_IGNORED_UPDATE_FIELDS:
+        return
+    transaction.on_commit(schedule_resume_snapshot_rebuild)
+
+
+@receiver(m2m_changed, sender=Project.skills.through)
+def refresh_resume_snapshot_on_skills_change(sender, action, **kwargs):
+    """Project skill assignments feed resume skill counts and technologies"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(schedule_resume_snapshot_rebuild)
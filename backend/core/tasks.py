@@ -0,0 +1,27 @@
+from celery import shared_task
+from django.core.cache import cache
+from .services import rebuild_resume_snapshot, RESUME_REBUILD_PENDING_KEY
+
+
+@shared_task
+def rebuild_resume_snapshot_task():
+    """Rebuild the materialized resume snapshot"""
+    try:
+        # Clear the pending flag first so edits made during the rebuild queue another pass
+        cache.delete(RESUME_REBUILD_PENDING_KEY)
+        snapshot = rebuild_resume_snapshot()
+        return f"Rebuilt resume snapshot ({len(snapshot)} bytes)"
+    except Exception as e:
+        return f"Error rebuilding resume snapshot: {e}"
+
+
+@shared_task
+def warm_caches_task():
+    """Pre-populate public response and fragment caches"""
+    from .warmup import warm_caches
+    
+    try:
+        status = warm_caches()
+        return f"Cache warmup finished: {status['state']} ({len(status['jobs'])} jobs)"
+    except Exception as e:
+        return f"Error warming caches: {e}"
@@ -0,0 +1,28 @@
+"""
+Shared test case bases.
+
+Caching, rate limiting and the chat job claims all go through the default
+cache, which points at Redis outside tests. These bases give every test a
+private in-memory cache, emptied before each test so state never leaks
+between them. Add further ``override_settings`` on subclasses as needed.
+"""
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class LocMemCacheMixin:
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheTestCase(LocMemCacheMixin, TestCase):
+    """``TestCase`` against an empty in-memory cache"""
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheTransactionTestCase(LocMemCacheMixin, TransactionTestCase):
+    """``TransactionTestCase`` against an empty in-memory cache, for code that relies on real commits"""
@@ -0,0 +1,164 @@
+import json
+from base64 import b64encode
+from unittest import mock
+from datetime import datetime, timezone as dt_timezone
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from chat.models import ChatMessage, ChatSession
+from .cache import SWR_LOCK_KEY, expire_soft, get_or_refresh, stale_while_revalidate
+from .pagination import ChatMessagePagination
+from .testing import CacheTestCase
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = ChatSession.objects.create(session_id='visitor')
+        for index in range(3):
+            ChatMessage.objects.create(session=self.session, content=f'Message {index}', is_from_user=True)
+        self.queryset = ChatMessage.objects.filter(session=self.session)
+
+    def paginate(self, cursor):
+        request = Request(APIRequestFactory().get('/messages', {'cursor': cursor, 'page_size': 2}))
+        return ChatMessagePagination().paginate_queryset(self.queryset, request)
+
+    def cursor(self, *values):
+        return b64encode(json.dumps(list(values)).encode('utf-8')).decode('ascii')
+
+    def test_next_cursor_continues_after_the_last_row(self):
+        paginator = ChatMessagePagination()
+        request = Request(APIRequestFactory().get('/messages', {'page_size': 2}))
+        first_page = paginator.paginate_queryset(self.queryset, request)
+
+        second_page = self.paginate(paginator.next_position)
+
+        self.assertEqual(len(first_page + second_page), 3)
+        self.assertFalse({row.pk for row in first_page} & {row.pk for row in second_page})
+
+    def test_cursor_with_invalid_values_is_not_found(self):
+        message = self.queryset.first()
+        for cursor in (
+            self.cursor('not a date', str(message.pk)),
+            self.cursor(message.created_at.isoformat(), 'not a uuid'),
+            self.cursor(['nested'], str(message.pk)),
+        ):
+            with self.subTest(cursor=cursor), self.assertRaises(NotFound):
+                self.paginate(cursor)
+
+
+class ChatLogsViewTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(
+            email='admin@example.com', username='admin', password='x', is_staff=True
+        ))
+        self.url = reverse('core_admin:chat_logs')
+        self.created = 0
+
+    def add_session(self, audience='general', rating=None, day=1, messages=2):
+        self.created += 1
+        user = User.objects.create_user(email=f'visitor{self.created}@example.com', username=f'visitor{self.created}')
+        session = ChatSession.objects.create(session_id=f'visitor{self.created}', user=user, audience_tag=audience)
+        for index in range(messages):
+            ChatMessage.objects.create(session=session, content=f'Message {index}', is_from_user=index % 2 == 0)
+        ChatSession.objects.filter(pk=session.pk).update(
+            average_rating=rating, created_at=datetime(2026, 3, day, 12, tzinfo=dt_timezone.utc)
+        )
+        return session
+
+    def session_ids(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['sessions']}
+
+    def test_query_count_does_not_grow_with_sessions(self):
+        self.add_session()
+        with CaptureQueriesContext(connection) as baseline:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        for messages in (1, 3, 5):
+            self.add_session(messages=messages)
+        with self.assertNumQueries(len(baseline)):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data['sessions']), 4)
+        self.assertEqual(sorted(row['message_count'] for row in response.data['sessions']), [1, 2, 3, 5])
+        self.assertTrue(all(row['user'].startswith('visitor') for row in response.data['sessions']))
+
+    def test_date_filters(self):
+        early, middle, late = self.add_session(day=1), self.add_session(day=10), self.add_session(day=20)
+
+        self.assertEqual(self.session_ids(date_from='2026-03-10'), {middle.pk, late.pk})
+        self.assertEqual(self.session_ids(date_to='2026-03-10'), {early.pk, middle.pk})
+        self.assertEqual(self.session_ids(date_from='2026-03-05', date_to='2026-03-15'), {middle.pk})
+
+    def test_audience_filter(self):
+        recruiter = self.add_session(audience='recruiter')
+        self.add_session(audience='developer')
+
+        self.assertEqual(self.session_ids(audience='recruiter'), {recruiter.pk})
+
+    def test_rating_filters(self):
+        low, high, unrated = self.add_session(rating=2), self.add_session(rating=4.5), self.add_session()
+
+        self.assertEqual(self.session_ids(min_rating='3'), {high.pk})
+        self.assertEqual(self.session_ids(max_rating='3'), {low.pk})
+        self.assertEqual(self.session_ids(rated='true'), {low.pk, high.pk})
+        self.assertEqual(self.session_ids(rated='false'), {unrated.pk})
+
+    def test_malformed_filters_are_rejected(self):
+        for params in ({'date_from': 'yesterday'}, {'date_to': '2026-02-30'}, {'min_rating': 'high'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class StaleWhileRevalidateTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.compute = mock.Mock(side_effect=['first', 'second'])
+
+    def read(self):
+        return get_or_refresh('swr:test', self.compute, soft_ttl=60)
+
+    def test_cold_miss_computes_once_then_hits(self):
+        self.assertEqual(self.read(), 'first')
+        self.assertEqual(self.read(), 'first')
+
+        self.compute.assert_called_once_with()
+        self.assertIsNone(cache.get(SWR_LOCK_KEY.format(key='swr:test')))
+
+    def test_stale_value_is_served_while_one_caller_refreshes(self):
+        self.read()
+        expire_soft('swr:test')
+
+        with mock.patch('core.cache.threading.Thread') as thread:
+            self.assertEqual(self.read(), 'first')
+            self.assertEqual(self.read(), 'first')
+        # The cache.add lock lets only the first stale read start a refresh
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once_with()
+
+        refresh = thread.call_args.kwargs
+        with mock.patch('core.cache.connections'):
+            refresh['target'](*refresh['args'])
+        self.assertEqual(self.read(), 'second')
+        self.assertIsNone(cache.get(SWR_LOCK_KEY.format(key='swr:test')))
+
+    def test_decorator_keys_on_arguments(self):
+        @stale_while_revalidate(60)
+        def square(value):
+            return self.compute(value)
+
+        self.compute.side_effect = lambda value: value * value
+        self.assertEqual((square(3), square(3), square(4)), (9, 9, 16))
+        self.assertEqual(self.compute.call_count, 2)
+        self.assertNotEqual(square.cache_key(3), square.cache_key(4))
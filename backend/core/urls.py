@@ -4,6 +4,7 @@ from . import views
 app_name = 'core'
 
 urlpatterns = [
+    path('health/ready', views.ReadinessView.as_view(), name='readiness'),
     path('achievements/', views.AchievementListView.as_view(), name='achievements'),
     path('testimonials/', views.TestimonialListView.as_view(), name='testimonials'),
     path('testimonials/submit', views.TestimonialCreateView.as_view(), name='testimonial_submit'),
@@ -8,15 +8,19 @@ from django.contrib.auth import get_user_model
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.conf import settings
+from django.http import HttpResponse
 import os
 import uuid
 import mimetypes
 from .models import SiteConfiguration, Achievement, Testimonial, RoadmapItem
 from .serializers import SiteConfigurationSerializer, AchievementSerializer, TestimonialSerializer, TestimonialCreateSerializer, RoadmapItemSerializer
 from .serializers import FileUploadSerializer
+from .services import get_resume_snapshot
+from .warmup import get_warmup_status, schedule_cache_warmup
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 from analytics.models import AnalyticsEvent
+from chat.limiter import llm_limiter
 
 User = get_user_model()
 
@@ -89,6 +93,25 @@ class RememberUserView(APIView):
         return Response({'status': 'success', 'message': 'Preference saved'})
 
 
+class ReadinessView(APIView):
+    """Report whether public caches are warm so load balancers can hold traffic"""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    
+    def get(self, request):
+        warmup = get_warmup_status()
+        if warmup is None:
+            # Cold cache (fresh deploy or flushed Redis): kick off a warmup
+            schedule_cache_warmup()
+        
+        ready = (not getattr(settings, 'CACHE_WARMUP_GATE', False)
+                 or (warmup is not None and warmup['state'] != 'warming'))
+        return Response(
+            {'ready': ready, 'cache': warmup, 'llm_queue': llm_limiter.stats()},
+            status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
 class SiteConfigView(APIView):
     """Get site configuration for frontend"""
     permission_classes = [AllowAny]
@@ -161,117 +184,12 @@ class RoadmapItemListView(generics.ListAPIView):
 
 
 class ResumeDataView(APIView):
-    """Get structured resume data"""
+    """Get structured resume data from the materialized snapshot"""
     permission_classes = [AllowAny]
     
     def get(self, request):
-        from projects.models import Skill, Project
-        
-        config = SiteConfiguration.load()
-        
-        # Get all skills with project counts
-        skills = Skill.objects.filter(projects__visibility='public').distinct()
-        skills_data = []
-        for skill in skills:
-            skills_data.append({
-                'name': skill.name,
-                'category': skill.category,
-                'proficiency_level': skill.proficiency_level,
-                'proficiency': skill.proficiency_level,  # Frontend expects 'proficiency'
-                'color': skill.color,
-                'project_count': skill.projects.filter(visibility='public').count()
-            })
-        
-        # Get featured projects
-        projects = Project.objects.filter(visibility='public', is_featured=True)[:6]
-        project_data = []
-        for project in projects:
-            project_data.append({
-                'title': project.title,
-                'description': project.short_tagline,  # Frontend expects 'description'
-                'role': project.role,
-                'duration': project.duration_display,
-                'technologies': [skill.name for skill in project.skills.all()],  # Frontend expects 'technologies'
-                'metrics': project.metrics or {}
-            })
-        
-        # Get achievements
-        achievements = Achievement.objects.all()[:10]
-        achievement_data = []
-        for achievement in achievements:
-            achievement_data.append({
-                'title': achievement.title,
-                'description': achievement.description,
-                'category': achievement.category,
-                'date': achievement.date_achieved.isoformat(),  # Frontend expects 'date'
-                'icon': achievement.icon
-            })
-        
-        # Create experience data (mock data for now - could be from a separate model)
-        experience_data = [
-            {
-                'title': 'Senior Full-Stack Developer',
-                'company': 'Freelance',
-                'duration': '2021 - Present',
-                'description': 'Building scalable web applications and AI-powered solutions for startups and established companies.',
-                'achievements': [
-                    'Delivered 15+ production applications with 99.9% uptime',
-                    'Implemented AI features that improved user engagement by 40%',
-                    'Reduced development time by 30% through reusable component libraries',
-                    'Mentored junior developers and established coding standards'
-                ],
-                'technologies': ['Python', 'Django', 'React', 'Next.js', 'PostgreSQL', 'AWS']
-            },
-            {
-                'title': 'Full-Stack Developer',
-                'company': 'TechStart Inc.',
-                'duration': '2019 - 2021',
-                'description': 'Led development of core platform features and API integrations.',
-                'achievements': [
-                    'Built REST APIs serving 10,000+ daily requests',
-                    'Implemented real-time features using WebSockets',
-                    'Optimized database queries reducing response time by 50%',
-                    'Established CI/CD pipelines and deployment automation'
-                ],
-                'technologies': ['Python', 'Django', 'JavaScript', 'PostgreSQL', 'Redis', 'Docker']
-            }
-        ]
-        
-        # Create education data (mock data for now)
-        education_data = [
-            {
-                'degree': 'Bachelor of Science in Computer Science',
-                'institution': 'University of Technology',
-                'year': '2019',
-                'details': 'Graduated Magna Cum Laude with focus on Software Engineering and AI'
-            },
-            {
-                'degree': 'AWS Certified Solutions Architect',
-                'institution': 'Amazon Web Services',
-                'year': '2023',
-                'details': 'Professional certification in cloud architecture and best practices'
-            }
-        ]
-        
-        resume_data = {
-            'personal': {
-                'name': config.site_name,
-                'title': config.site_tagline,
-                'email': config.email,
-                'location': config.location,
-                'summary': config.about_medium,
-                'github_url': config.github_url,
-                'linkedin_url': config.linkedin_url,
-            },
-            'experience': experience_data,
-            'skills': skills_data,
-            'projects': project_data,
-            'education': education_data,
-            'achievements': achievement_data,
-            'generated_at': timezone.now().isoformat()
-        }
-        
-        return Response(resume_data)
+        # The snapshot is rebuilt in the background whenever resume content changes
+        return HttpResponse(get_resume_snapshot(), content_type='application/json')
 
 
 class ResumeDownloadView(APIView):
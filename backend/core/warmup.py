@@ -0,0 +1,110 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import RequestFactory
+from django.utils import timezone
+from projects.models import Skill, Project
+from projects.serializers import SkillSerializer, ProjectListSerializer
+from .services import rebuild_resume_snapshot
+
+logger = logging.getLogger(__name__)
+
+CACHE_WARMUP_STATUS_KEY = 'core:warmup:status'
+CACHE_WARMUP_PENDING_KEY = 'core:warmup:pending'
+
+
+def _warmup_request(host):
+    """Request stand-in so fragment keys and absolute URLs match real traffic for the host"""
+    scheme = getattr(settings, 'CACHE_WARMUP_SCHEME', 'https')
+    return RequestFactory().get('/', HTTP_HOST=host, secure=scheme == 'https')
+
+
+def warm_resume_snapshot():
+    return len(rebuild_resume_snapshot())
+
+
+def warm_project_fragments(host):
+    projects = (Project.objects
+                .filter(visibility='public')
+                .select_related('case_study')
+                .prefetch_related('skills'))
+    context = {'request': _warmup_request(host)}
+    return len(ProjectListSerializer(projects, many=True, context=context).data)
+
+
+def warm_skill_fragments(host):
+    skills = Skill.objects.filter(public_project_count__gt=0)
+    context = {'request': _warmup_request(host)}
+    return len(SkillSerializer(skills, many=True, context=context).data)
+
+
+def warm_chat_portfolio_context():
+    from chat.services import ChatAIService
+    return len(ChatAIService().get_portfolio_document()['text'])
+
+
+def get_warmup_jobs():
+    """(name, callable, args) for every cache that public endpoints read from"""
+    jobs = [
+        ('resume', warm_resume_snapshot, ()),
+        ('chat_context', warm_chat_portfolio_context, ()),
+    ]
+    for host in getattr(settings, 'CACHE_WARMUP_HOSTS', []):
+        jobs.append((f'projects@{host}', warm_project_fragments, (host,)))
+        jobs.append((f'skills@{host}', warm_skill_fragments, (host,)))
+    return jobs
+
+
+def _run_job(func, args):
+    try:
+        return {'ok': True, 'items': func(*args)}
+    except Exception as e:
+        logger.exception('Cache warmup job failed')
+        return {'ok': False, 'error': str(e)}
+    finally:
+        # Worker threads open their own connections; don't leave them dangling
+        connections.close_all()
+
+
+def warm_caches(max_workers=None):
+    """Populate the public caches in parallel and record the outcome for readiness checks"""
+    max_workers = max_workers or getattr(settings, 'CACHE_WARMUP_CONCURRENCY', 4)
+    started_at = timezone.now()
+    
+    # The in-progress marker expires so a crashed warmup doesn't hold readiness forever
+    cache.set(
+        CACHE_WARMUP_STATUS_KEY,
+        {'state': 'warming', 'started_at': started_at.isoformat()},
+        getattr(settings, 'CACHE_WARMUP_TIMEOUT', 300)
+    )
+    
+    jobs = get_warmup_jobs()
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_run_job, func, args): name for name, func, args in jobs}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    
+    status = {
+        'state': 'warm' if all(result['ok'] for result in results.values()) else 'partial',
+        'started_at': started_at.isoformat(),
+        'finished_at': timezone.now().isoformat(),
+        'jobs': results,
+    }
+    cache.set(CACHE_WARMUP_STATUS_KEY, status, None)
+    cache.delete(CACHE_WARMUP_PENDING_KEY)
+    return status
+
+
+def get_warmup_status():
+    return cache.get(CACHE_WARMUP_STATUS_KEY)
+
+
+def schedule_cache_warmup():
+    """Queue a background warmup unless one is already pending"""
+    from .tasks import warm_caches_task
+    
+    if cache.add(CACHE_WARMUP_PENDING_KEY, True, getattr(settings, 'CACHE_WARMUP_TIMEOUT', 300)):
+        warm_caches_task.delay()
@@ -11,6 +11,13 @@ class GigCategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'icon', 'color', 'gig_count']
     
     def get_gig_count(self, obj):
+        # Listing views annotate categories or pass counts for nested rows in the context
+        annotated = getattr(obj, 'open_gig_count', None)
+        if annotated is not None:
+            return annotated
+        counts = self.context.get('category_gig_counts')
+        if counts is not None:
+            return counts.get(obj.pk, 0)
         return obj.gigs.filter(status='open').count()
 
 
@@ -30,6 +37,9 @@ class GigListSerializer(serializers.ModelSerializer):
         ]
     
     def get_sample_project_count(self, obj):
+        annotated = getattr(obj, 'sample_project_count', None)
+        if annotated is not None:
+            return annotated
         return obj.sample_projects.count()
 
 
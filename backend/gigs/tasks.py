@@ -1,27 +1,20 @@
 from celery import shared_task
 from django.core.mail import send_mail
 from django.conf import settings
-import openai
+from chat.limiter import QueueTimeout, llm_limiter
+from chat.llm import get_llm
 from .models import HireRequest
 
 
-@shared_task
-def generate_hire_proposal(hire_request_id):
+@shared_task(bind=True, max_retries=5)
+def generate_hire_proposal(self, hire_request_id):
     """Generate AI proposal preview for hire request"""
     try:
         hire_request = HireRequest.objects.get(id=hire_request_id)
         
-        # Create AI proposal using OpenAI
-        if settings.OPENAI_API_KEY:
-            client = openai.OpenAI(
-                api_key=settings.OPENAI_API_KEY,
-                base_url=getattr(settings, 'OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'),
-                default_headers={
-                    "HTTP-Referer": getattr(settings, 'FRONTEND_URL', 'http://localhost:3000'),
-                    "X-Title": getattr(settings, 'SITE_NAME', "Edzio's Portfolio"),
-                }
-            )
-            
+        # Create AI proposal through the shared LLM client registry
+        llm = get_llm()
+        if llm.available:
             prompt = f"""
             Create a professional project proposal preview based on this hire request:
             
@@ -42,20 +35,24 @@ def generate_hire_proposal(hire_request_id):
             Keep it professional but friendly, around 200-300 words.
             """
             
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are Edzio, a professional full-stack developer creating project proposals. Be concise and professional."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=settings.OPENAI_MAX_TOKENS,
-                temperature=0.7
-            )
+            # Proposals share one fair-queue client so a burst of them can't crowd out live chats
+            with llm_limiter.slot('tasks:hire_proposal'):
+                response, _ = llm.complete(
+                    messages=[
+                        {"role": "system", "content": "You are Edzio, a professional full-stack developer creating project proposals. Be concise and professional."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=settings.OPENAI_MAX_TOKENS,
+                    temperature=0.7
+                )
             
             proposal = response.choices[0].message.content
             hire_request.proposal_preview = proposal
             hire_request.save(update_fields=['proposal_preview'])
             
+    except QueueTimeout:
+        # LLM slots are saturated: try again once the burst has passed, but not forever
+        raise self.retry(countdown=60)
     except Exception as e:
         print(f"Error generating proposal for hire request {hire_request_id}: {e}")
 
@@ -0,0 +1,72 @@
+from unittest import mock
+from celery.exceptions import MaxRetriesExceededError
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from chat.limiter import QueueTimeout
+from core.testing import CacheTestCase
+from .models import Gig, GigCategory, HireRequest
+from .tasks import generate_hire_proposal
+
+
+class GigListingQueryCountTests(CacheTestCase):
+    """Listing pages must cost the same number of queries however many rows they show"""
+
+    def setUp(self):
+        super().setUp()
+        self.created = 0
+
+    def add_category_with_gigs(self, gigs=2):
+        self.created += 1
+        category = GigCategory.objects.create(name=f'Category {self.created}')
+        for index in range(gigs):
+            Gig.objects.create(
+                title=f'Gig {self.created}-{index}',
+                category=category,
+                short_description='Short',
+                price_min=100,
+                delivery_time_min=3,
+            )
+        return category
+
+    def assert_constant_queries(self, url):
+        self.add_category_with_gigs()
+        with CaptureQueriesContext(connection) as baseline:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        # Start the second request cold too: no cached data, and a fresh visitor session
+        cache.clear()
+        self.client.cookies.clear()
+
+        for _ in range(3):
+            self.add_category_with_gigs(gigs=3)
+        with self.assertNumQueries(len(baseline)):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_gig_list_query_count_is_constant(self):
+        self.assert_constant_queries(reverse('gigs:gig_list'))
+
+    def test_category_list_query_count_is_constant(self):
+        self.assert_constant_queries(reverse('gigs:category_list'))
+
+    def test_category_list_keeps_admin_order(self):
+        for name, order in (('Backend', 2), ('Design', 1), ('Audits', 2)):
+            GigCategory.objects.create(name=name, order=order)
+
+        response = self.client.get(reverse('gigs:category_list'))
+
+        rows = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual([row['name'] for row in rows], ['Design', 'Audits', 'Backend'])
+
+
+class GenerateHireProposalTests(CacheTestCase):
+    def test_saturated_llm_slots_retry_a_bounded_number_of_times(self):
+        hire_request = HireRequest.objects.create(name='Client', email='client@example.com', message='Build a site')
+        llm = mock.Mock(available=True)
+        with mock.patch('gigs.tasks.get_llm', return_value=llm), \
+                mock.patch('gigs.tasks.llm_limiter.slot', side_effect=QueueTimeout) as slot:
+            result = generate_hire_proposal.apply(args=[hire_request.pk])
+
+        self.assertIsInstance(result.result, MaxRetriesExceededError)
+        self.assertEqual(slot.call_count, generate_hire_proposal.max_retries + 1)
+        llm.complete.assert_not_called()
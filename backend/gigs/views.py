@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.shortcuts import get_object_or_404
+from django.db.models import Count, Q
 from django.utils import timezone
 from analytics.models import AnalyticsEvent
 
@@ -16,9 +17,23 @@ from .serializers import (
 from .tasks import generate_hire_proposal, send_hire_confirmation
 
 
+def open_gig_counts_by_category():
+    """Open gig count per category id, fetched in a single grouped query"""
+    return dict(
+        Gig.objects.filter(status='open')
+        .exclude(category=None)
+        .order_by()
+        .values('category')
+        .annotate(count=Count('pk'))
+        .values_list('category', 'count')
+    )
+
+
 class GigCategoryListView(generics.ListAPIView):
     """List all active gig categories"""
-    queryset = GigCategory.objects.filter(is_active=True)
+    queryset = GigCategory.objects.filter(is_active=True).annotate(
+        open_gig_count=Count('gigs', filter=Q(gigs__status='open'))
+    ).order_by('order', 'name')  # Meta.ordering is dropped from GROUP BY queries
     serializer_class = GigCategorySerializer
 
 
@@ -32,7 +47,15 @@ class GigListView(generics.ListAPIView):
     ordering = ['-is_featured', 'order', 'title']
     
     def get_queryset(self):
-        return Gig.objects.filter(status__in=['open', 'limited']).select_related('category')
+        return (Gig.objects
+                .filter(status__in=['open', 'limited'])
+                .select_related('category')
+                .annotate(sample_project_count=Count('sample_projects', distinct=True)))
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['category_gig_counts'] = open_gig_counts_by_category()
+        return context
 
 
 class GigDetailView(generics.RetrieveAPIView):
@@ -178,6 +201,11 @@ class AdminGigListView(generics.ListAPIView):
     filterset_fields = ['status', 'is_featured', 'category']
     search_fields = ['title', 'short_description']
     ordering = ['-created_at']
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['category_gig_counts'] = open_gig_counts_by_category()
+        return context
 
 
 class AdminLeadListView(generics.ListAPIView):
@@ -31,17 +31,13 @@ class NotificationAdmin(admin.ModelAdmin):
     actions = ['mark_as_read', 'mark_as_unread', 'send_email']
     
     def mark_as_read(self, request, queryset):
-        count = 0
-        for notification in queryset:
-            if not notification.is_read:
-                notification.mark_as_read()
-                count += 1
+        count = queryset.mark_read()
         self.message_user(request, f"{count} notifications marked as read.")
     mark_as_read.short_description = "Mark selected notifications as read"
     
     def mark_as_unread(self, request, queryset):
-        queryset.update(is_read=False, read_at=None)
-        self.message_user(request, f"{queryset.count()} notifications marked as unread.")
+        count = queryset.mark_unread()
+        self.message_user(request, f"{count} notifications marked as unread.")
     mark_as_unread.short_description = "Mark selected notifications as unread"
 
 
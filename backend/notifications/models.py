@@ -1,10 +1,21 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from core.models import TimeStampedModel
 
 User = get_user_model()
 
 
+class NotificationQuerySet(models.QuerySet):
+    def mark_read(self):
+        """Mark the unread notifications in this queryset as read in one UPDATE; returns the count"""
+        return self.filter(is_read=False).update(is_read=True, read_at=timezone.now())
+    
+    def mark_unread(self):
+        """Mark the read notifications in this queryset as unread in one UPDATE; returns the count"""
+        return self.filter(is_read=True).update(is_read=False, read_at=None)
+
+
 class Notification(TimeStampedModel):
     """User notifications"""
     TYPE_CHOICES = [
@@ -46,6 +57,8 @@ class Notification(TimeStampedModel):
     # Expiration
     expires_at = models.DateTimeField(null=True, blank=True, help_text="When notification should be automatically removed")
     
+    objects = NotificationQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -61,7 +74,6 @@ class Notification(TimeStampedModel):
     def mark_as_read(self):
         """Mark notification as read"""
         if not self.is_read:
-            from django.utils import timezone
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at'])
@@ -64,14 +64,7 @@ class MarkNotificationsReadView(APIView):
             
             if data.get('mark_all_read'):
                 # Mark all notifications as read
-                notifications = Notification.objects.filter(
-                    user=request.user,
-                    is_read=False
-                )
-                count = 0
-                for notification in notifications:
-                    notification.mark_as_read()
-                    count += 1
+                count = Notification.objects.filter(user=request.user).mark_read()
                 
                 # Track analytics
                 AnalyticsEvent.objects.create(
@@ -88,16 +81,7 @@ class MarkNotificationsReadView(APIView):
             elif data.get('notification_ids'):
                 # Mark specific notifications as read
                 notification_ids = data['notification_ids']
-                notifications = Notification.objects.filter(
-                    user=request.user,
-                    id__in=notification_ids,
-                    is_read=False
-                )
-                
-                count = 0
-                for notification in notifications:
-                    notification.mark_as_read()
-                    count += 1
+                count = Notification.objects.filter(user=request.user, id__in=notification_ids).mark_read()
                 
                 # Track analytics
                 AnalyticsEvent.objects.create(
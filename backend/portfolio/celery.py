@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_shutdown, worker_ready
 from django.conf import settings
 
 # Set the default Django settings module for the 'celery' program.
@@ -14,6 +15,19 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+@worker_ready.connect
+def warm_caches_on_worker_ready(sender, **kwargs):
+    """Optionally warm public caches as soon as a worker comes up after a deploy"""
+    if getattr(settings, 'CACHE_WARMUP_ON_WORKER_BOOT', False):
+        from core.warmup import schedule_cache_warmup
+        schedule_cache_warmup()
+
+@worker_process_shutdown.connect
+def flush_write_buffers_on_shutdown(**kwargs):
+    """Pool processes exit through os._exit, so atexit never flushes their buffers"""
+    from core.buffers import flush_write_buffers
+    flush_write_buffers()
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
\ No newline at end of file
@@ -201,6 +201,75 @@ OPENROUTER_MODEL = config('OPENROUTER_MODEL', default='mistralai/mistral-7b-inst
 OPENROUTER_BASE_URL = config('OPENROUTER_BASE_URL', default='https://openrouter.ai/api/v1')
 OPENROUTER_MAX_TOKENS = config('OPENROUTER_MAX_TOKENS', default=2000, cast=int)
 
+# Ordered LLM providers: later entries are used when earlier ones fail or have their circuit open
+LLM_PROVIDERS = [
+    {'name': f'openrouter:{model}', 'base_url': OPENROUTER_BASE_URL, 'api_key': OPENROUTER_API_KEY, 'model': model}
+    for model in [OPENROUTER_MODEL, *config('LLM_FALLBACK_MODELS', default='', cast=Csv())]
+]
+LLM_FALLBACK_BASE_URL = config('LLM_FALLBACK_BASE_URL', default='')
+if LLM_FALLBACK_BASE_URL:
+    LLM_PROVIDERS.append({
+        'name': 'fallback',
+        'base_url': LLM_FALLBACK_BASE_URL,
+        'api_key': config('LLM_FALLBACK_API_KEY', default=''),
+        'model': config('LLM_FALLBACK_MODEL', default=OPENROUTER_MODEL),
+    })
+LLM_TIMEOUT = config('LLM_TIMEOUT', default=30, cast=float)
+LLM_CONNECT_TIMEOUT = config('LLM_CONNECT_TIMEOUT', default=5, cast=float)
+LLM_MAX_CONNECTIONS = config('LLM_MAX_CONNECTIONS', default=20, cast=int)
+LLM_MAX_KEEPALIVE_CONNECTIONS = config('LLM_MAX_KEEPALIVE_CONNECTIONS', default=10, cast=int)
+LLM_MAX_RETRIES = config('LLM_MAX_RETRIES', default=2, cast=int)
+LLM_RETRY_BASE_DELAY = config('LLM_RETRY_BASE_DELAY', default=0.5, cast=float)
+LLM_RETRY_MAX_DELAY = config('LLM_RETRY_MAX_DELAY', default=4, cast=float)
+LLM_BREAKER_THRESHOLD = config('LLM_BREAKER_THRESHOLD', default=5, cast=int)
+LLM_BREAKER_WINDOW = config('LLM_BREAKER_WINDOW', default=60, cast=int)
+LLM_BREAKER_COOLDOWN = config('LLM_BREAKER_COOLDOWN', default=30, cast=int)
+
+# LLM admission control: concurrent calls across all workers and how long callers queue for a slot
+LLM_CONCURRENCY_LIMIT = config('LLM_CONCURRENCY_LIMIT', default=8, cast=int)
+LLM_QUEUE_MAX_WAIT = config('LLM_QUEUE_MAX_WAIT', default=10, cast=float)
+LLM_SLOT_LEASE = config('LLM_SLOT_LEASE', default=120, cast=int)
+LLM_FAIR_SHARE_PENALTY = config('LLM_FAIR_SHARE_PENALTY', default=2, cast=float)
+
+# Background chat jobs (ChatQueryView with background=true)
+CHAT_JOB_TIME_LIMIT = config('CHAT_JOB_TIME_LIMIT', default=120, cast=int)
+CHAT_JOB_MAX_RETRIES = config('CHAT_JOB_MAX_RETRIES', default=2, cast=int)
+CHAT_JOB_DEDUP_WINDOW = config('CHAT_JOB_DEDUP_WINDOW', default=300, cast=int)
+CHAT_JOB_POLL_INTERVAL = config('CHAT_JOB_POLL_INTERVAL', default=1, cast=int)
+
+# Messages embedded with each session in chat history responses
+CHAT_MESSAGE_WINDOW = config('CHAT_MESSAGE_WINDOW', default=20, cast=int)
+
+# Blended LLM price used for cost estimates in the admin chat usage report
+CHAT_TOKEN_PRICE_PER_1K = config('CHAT_TOKEN_PRICE_PER_1K', default=0, cast=float)
+
+# Chat response cache (exact and near-duplicate opening questions)
+CHAT_RESPONSE_CACHE_ENABLED = config('CHAT_RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+CHAT_RESPONSE_CACHE_THRESHOLD = config('CHAT_RESPONSE_CACHE_THRESHOLD', default=0.9, cast=float)
+CHAT_RESPONSE_CACHE_TIMEOUT = config('CHAT_RESPONSE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+CHAT_RESPONSE_CACHE_INDEX_SIZE = config('CHAT_RESPONSE_CACHE_INDEX_SIZE', default=200, cast=int)
+
+# Answer close matches to FAQ knowledge-base entries without the LLM
+CHAT_FAQ_ENABLED = config('CHAT_FAQ_ENABLED', default=True, cast=bool)
+CHAT_FAQ_MATCH_THRESHOLD = config('CHAT_FAQ_MATCH_THRESHOLD', default=0.8, cast=float)
+
+# Chat retrieval over knowledge base, projects, case studies and blog posts
+CHAT_RETRIEVAL_ENABLED = config('CHAT_RETRIEVAL_ENABLED', default=True, cast=bool)
+CHAT_RETRIEVAL_TOP_K = config('CHAT_RETRIEVAL_TOP_K', default=5, cast=int)
+CHAT_RETRIEVAL_TOKEN_BUDGET = config('CHAT_RETRIEVAL_TOKEN_BUDGET', default=800, cast=int)
+CHAT_KB_USAGE_FLUSH_INTERVAL = config('CHAT_KB_USAGE_FLUSH_INTERVAL', default=60, cast=int)
+
+# Buffered analytics events (chat queries): flush after this many events or seconds
+ANALYTICS_BUFFER_SIZE = config('ANALYTICS_BUFFER_SIZE', default=100, cast=int)
+ANALYTICS_BUFFER_INTERVAL = config('ANALYTICS_BUFFER_INTERVAL', default=10, cast=int)
+
+# Chat prompt assembly (estimated tokens)
+CHAT_PROMPT_TOKEN_CEILING = config('CHAT_PROMPT_TOKEN_CEILING', default=6000, cast=int)
+CHAT_PROMPT_HISTORY_TOKENS = config('CHAT_PROMPT_HISTORY_TOKENS', default=1500, cast=int)
+CHAT_PROMPT_SUMMARY_TOKENS = config('CHAT_PROMPT_SUMMARY_TOKENS', default=300, cast=int)
+CHAT_PROMPT_FOCUSED_TOKENS = config('CHAT_PROMPT_FOCUSED_TOKENS', default=600, cast=int)
+CHAT_PROMPT_QUERY_TOKENS = config('CHAT_PROMPT_QUERY_TOKENS', default=500, cast=int)
+
 # Backward compatibility aliases for existing code
 OPENAI_API_KEY = OPENROUTER_API_KEY
 OPENAI_MODEL = OPENROUTER_MODEL
@@ -213,6 +282,12 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-blog-counters': {
+        'task': 'blog.tasks.reconcile_blog_counters',
+        'schedule': timedelta(hours=6),
+    },
+}
 
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
@@ -326,6 +401,21 @@ CACHES = {
     }
 }
 
+# Materialized and fragment cache lifetimes (seconds)
+RESUME_SNAPSHOT_TIMEOUT = config('RESUME_SNAPSHOT_TIMEOUT', default=60 * 60 * 24, cast=int)
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=60 * 60, cast=int)
+PORTFOLIO_CONTEXT_SOFT_TTL = config('PORTFOLIO_CONTEXT_SOFT_TTL', default=60 * 60 * 6, cast=int)
+PORTFOLIO_CONTEXT_HARD_TTL = config('PORTFOLIO_CONTEXT_HARD_TTL', default=60 * 60 * 24, cast=int)
+
+# Cache warmup (manage.py warm_caches, worker boot hook, readiness endpoint)
+CACHE_WARMUP_HOSTS = config('CACHE_WARMUP_HOSTS', default=ALLOWED_HOSTS[0], cast=Csv())
+CACHE_WARMUP_SCHEME = config('CACHE_WARMUP_SCHEME', default='http' if DEBUG else 'https')
+CACHE_WARMUP_CONCURRENCY = config('CACHE_WARMUP_CONCURRENCY', default=4, cast=int)
+CACHE_WARMUP_TIMEOUT = config('CACHE_WARMUP_TIMEOUT', default=300, cast=int)
+CACHE_WARMUP_ON_WORKER_BOOT = config('CACHE_WARMUP_ON_WORKER_BOOT', default=False, cast=bool)
+# When enabled, the readiness endpoint returns 503 until warmup has finished
+CACHE_WARMUP_GATE = config('CACHE_WARMUP_GATE', default=False, cast=bool)
+
 # Session configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
@@ -1,14 +1,32 @@
+from functools import partial
 from django.contrib import admin
+from django.db import transaction
 from django.utils.html import format_html
+from chat.services import bump_portfolio_context_version
+from chat.signals import record_retrieval_changes
+from core.services import schedule_resume_snapshot_rebuild
 from .models import Skill, Project, CaseStudy, ProjectUpdate, ProjectCollaboration
+from .signals import invalidate_project_fragments
+
+
+def refresh_after_bulk_update(project_ids):
+    """Run the cache refreshes that Project post_save would have triggered"""
+    doc_keys = [f'project:{pk}' for pk in project_ids]
+    doc_keys += [f'case_study:{pk}' for pk in
+                 CaseStudy.objects.filter(project__in=project_ids).values_list('pk', flat=True)]
+    transaction.on_commit(invalidate_project_fragments)
+    transaction.on_commit(schedule_resume_snapshot_rebuild)
+    transaction.on_commit(bump_portfolio_context_version)
+    transaction.on_commit(partial(record_retrieval_changes, doc_keys))
 
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
-    list_display = ['name', 'category', 'proficiency_level', 'is_featured', 'color_display', 'order']
+    list_display = ['name', 'category', 'proficiency_level', 'is_featured', 'color_display', 'public_project_count', 'order']
     list_filter = ['category', 'proficiency_level', 'is_featured']
     search_fields = ['name', 'description']
     list_editable = ['proficiency_level', 'is_featured', 'order']
+    readonly_fields = ['public_project_count']
     prepopulated_fields = {'slug': ('name',)}
     
     def color_display(self, obj):
@@ -79,13 +97,23 @@ class ProjectAdmin(admin.ModelAdmin):
     actions = ['make_public', 'make_featured']
     
     def make_public(self, request, queryset):
-        queryset.update(visibility='public')
-        self.message_user(request, f"{queryset.count()} projects made public.")
+        # Resolve the selection first: a changelist filtered on visibility
+        # would match nothing once the update has run
+        project_ids = list(queryset.values_list('pk', flat=True))
+        updated = Project.objects.filter(pk__in=project_ids).update(visibility='public')
+        # Bulk updates bypass the signals that maintain skill counters and caches
+        Skill.refresh_public_project_counts(
+            Skill.objects.filter(projects__pk__in=project_ids).values('pk')
+        )
+        refresh_after_bulk_update(project_ids)
+        self.message_user(request, f"{updated} projects made public.")
     make_public.short_description = "Make selected projects public"
     
     def make_featured(self, request, queryset):
-        queryset.update(is_featured=True)
-        self.message_user(request, f"{queryset.count()} projects featured.")
+        project_ids = list(queryset.values_list('pk', flat=True))
+        updated = Project.objects.filter(pk__in=project_ids).update(is_featured=True)
+        refresh_after_bulk_update(project_ids)
+        self.message_user(request, f"{updated} projects featured.")
     make_featured.short_description = "Feature selected projects"
 
 
@@ -78,14 +78,10 @@ class SkillFilter(django_filters.FilterSet):
     max_project_count = django_filters.NumberFilter(method='filter_max_project_count')
     
     def filter_min_project_count(self, queryset, name, value):
-        return queryset.annotate(
-            project_count=models.Count('projects', filter=models.Q(projects__visibility='public'))
-        ).filter(project_count__gte=value)
+        return queryset.filter(public_project_count__gte=value)
     
     def filter_max_project_count(self, queryset, name, value):
-        return queryset.annotate(
-            project_count=models.Count('projects', filter=models.Q(projects__visibility='public'))
-        ).filter(project_count__lte=value)
+        return queryset.filter(public_project_count__lte=value)
 
     class Meta:
         model = Skill
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from ckeditor.fields import RichTextField
@@ -40,6 +42,13 @@ class Skill(TimeStampedModel):
     is_featured = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
     
+    # Denormalized counter maintained by projects.signals
+    public_project_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of public projects using this skill"
+    )
+    
     class Meta:
         ordering = ['category', 'order', 'name']
         verbose_name = 'Skill'
@@ -52,6 +61,21 @@ class Skill(TimeStampedModel):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def refresh_public_project_counts(cls, skill_ids=None):
+        """Recount public projects for the given skills (all skills if None) in one UPDATE"""
+        public_projects = (Project.skills.through.objects
+                           .filter(skill_id=OuterRef('pk'), project__visibility='public')
+                           .order_by()
+                           .values('skill_id')
+                           .annotate(count=Count('project_id'))
+                           .values('count'))
+        
+        queryset = cls.objects.all()
+        if skill_ids is not None:
+            queryset = queryset.filter(pk__in=skill_ids)
+        return queryset.update(public_project_count=Coalesce(Subquery(public_projects), 0))
 
 
 class Project(TimeStampedModel, SEOModel):
@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from core.cache import CachedFragmentMixin, CachedFragmentListSerializer
 from .models import Skill, Project, CaseStudy, ProjectUpdate, ProjectCollaboration
 
 
-class SkillSerializer(serializers.ModelSerializer):
-    project_count = serializers.SerializerMethodField()
+class SkillSerializer(CachedFragmentMixin, serializers.ModelSerializer):
+    project_count = serializers.IntegerField(source='public_project_count', read_only=True)
     
     class Meta:
         model = Skill
@@ -11,9 +12,7 @@ class SkillSerializer(serializers.ModelSerializer):
             'id', 'name', 'slug', 'description', 'category', 
             'proficiency_level', 'icon', 'color', 'project_count'
         ]
-    
-    def get_project_count(self, obj):
-        return obj.projects.filter(visibility='public').count()
+        list_serializer_class = CachedFragmentListSerializer
 
 
 class ProjectCollaborationSerializer(serializers.ModelSerializer):
@@ -28,8 +27,11 @@ class ProjectUpdateSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'content', 'version', 'update_type', 'is_major', 'created_at']
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(CachedFragmentMixin, serializers.ModelSerializer):
     """Serializer for project listings"""
+    # view_count is bumped without touching updated_at, so it versions the fragment too
+    fragment_version_fields = ('updated_at', 'view_count')
+    
     skills = SkillSerializer(many=True, read_only=True)
     duration = serializers.CharField(source='duration_display', read_only=True)
     has_case_study = serializers.SerializerMethodField()
@@ -42,6 +44,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
             'hero_image', 'repo_url', 'live_demo_url', 'skills',
             'view_count', 'is_featured', 'has_case_study'
         ]
+        list_serializer_class = CachedFragmentListSerializer
     
     def get_has_case_study(self, obj):
         return hasattr(obj, 'case_study') and obj.case_study.is_published
@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from core.cache import invalidate_fragments
+from .models import Skill, Project, CaseStudy
+from .serializers import SkillSerializer, ProjectListSerializer
+
+# view_count is part of the project fragment key, so bumping it needs no invalidation
+FRAGMENT_IGNORED_UPDATE_FIELDS = {'view_count'}
+
+
+def invalidate_project_fragments():
+    """Skill counts and nested project cards depend on each other, so drop both"""
+    invalidate_fragments(SkillSerializer, ProjectListSerializer)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=CaseStudy)
+@receiver(post_delete, sender=CaseStudy)
+def invalidate_fragments_on_change(sender, update_fields=None, **kwargs):
+    """Invalidate cached serializer fragments after portfolio content changes"""
+    if update_fields and set(update_fields) <= FRAGMENT_IGNORED_UPDATE_FIELDS:
+        return
+    transaction.on_commit(invalidate_project_fragments)
+
+
+@receiver(m2m_changed, sender=Project.skills.through)
+def invalidate_fragments_on_skills_change(sender, action, **kwargs):
+    """Project skill assignments change both project cards and skill counts"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(invalidate_project_fragments)
+
+
+@receiver(m2m_changed, sender=Project.skills.through)
+def update_public_project_counts_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Skill.public_project_count in step with project skill assignments"""
+    if action == 'pre_clear':
+        # Remember what is about to be unlinked; pk_set is empty for clear()
+        if reverse:
+            instance._cleared_skill_ids = [instance.pk]
+        else:
+            instance._cleared_skill_ids = list(instance.skills.values_list('pk', flat=True))
+        return
+    
+    if action == 'post_clear':
+        skill_ids = getattr(instance, '_cleared_skill_ids', [])
+    elif action in ('post_add', 'post_remove'):
+        if reverse:
+            skill_ids = [instance.pk]
+        elif instance.visibility == 'public':
+            skill_ids = pk_set
+        else:
+            return
+    else:
+        return
+    
+    if skill_ids:
+        Skill.refresh_public_project_counts(skill_ids)
+
+
+@receiver(pre_save, sender=Project)
+def remember_previous_visibility(sender, instance, update_fields=None, **kwargs):
+    """Capture the stored visibility so post_save can detect public transitions"""
+    if instance.pk is None or (update_fields is not None and 'visibility' not in update_fields):
+        instance._previous_visibility = None
+        return
+    instance._previous_visibility = (Project.objects
+                                     .filter(pk=instance.pk)
+                                     .values_list('visibility', flat=True)
+                                     .first())
+
+
+@receiver(post_save, sender=Project)
+def update_public_project_counts_on_visibility_change(sender, instance, created, **kwargs):
+    """Recount skills when a project enters or leaves public visibility"""
+    previous = getattr(instance, '_previous_visibility', None)
+    if created or previous is None or previous == instance.visibility:
+        return
+    if 'public' in (previous, instance.visibility):
+        Skill.refresh_public_project_counts(instance.skills.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Project)
+def remember_deleted_project_skills(sender, instance, **kwargs):
+    """Through rows are cascade-deleted without m2m_changed, so capture them first"""
+    instance._deleted_skill_ids = list(instance.skills.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Project)
+def update_public_project_counts_on_delete(sender, instance, **kwargs):
+    if instance.visibility == 'public' and getattr(instance, '_deleted_skill_ids', None):
+        Skill.refresh_public_project_counts(instance._deleted_skill_ids)
@@ -0,0 +1,125 @@
+from datetime import date
+from unittest import mock
+from django.contrib.admin.sites import AdminSite
+from django.test import RequestFactory, override_settings
+from core.cache import get_fragment_version
+from core.testing import CacheTestCase
+from .admin import ProjectAdmin
+from .models import Skill, Project
+from .serializers import ProjectListSerializer, SkillSerializer
+
+
+class ProjectAdminActionTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.skill = Skill.objects.create(name='Django')
+        self.project = Project.objects.create(
+            title='Private project',
+            short_tagline='Tagline',
+            description_short='Short',
+            start_date=date(2024, 1, 1),
+            visibility='private',
+        )
+        self.project.skills.add(self.skill)
+        self.admin = ProjectAdmin(Project, AdminSite())
+        self.request = RequestFactory().post('/admin/projects/project/')
+
+    def test_make_public_recounts_skills_when_changelist_filtered_on_visibility(self):
+        queryset = Project.objects.filter(visibility='private')
+        with mock.patch.object(self.admin, 'message_user') as message_user, \
+                self.captureOnCommitCallbacks() as callbacks:
+            self.admin.make_public(self.request, queryset)
+
+        self.project.refresh_from_db()
+        self.skill.refresh_from_db()
+        self.assertEqual(self.project.visibility, 'public')
+        self.assertEqual(self.skill.public_project_count, 1)
+        message_user.assert_called_once_with(self.request, '1 projects made public.')
+        # Fragment, resume snapshot, chat context and retrieval refreshes
+        self.assertEqual(len(callbacks), 4)
+
+    def test_make_featured_queues_cache_refreshes(self):
+        with mock.patch.object(self.admin, 'message_user'), self.captureOnCommitCallbacks() as callbacks:
+            self.admin.make_featured(self.request, Project.objects.filter(is_featured=False))
+
+        self.project.refresh_from_db()
+        self.assertTrue(self.project.is_featured)
+        self.assertEqual(len(callbacks), 4)
+
+
+class ProjectFragmentCacheTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        # Saves also queue a resume rebuild; keep it off the broker
+        patcher = mock.patch('core.tasks.rebuild_resume_snapshot_task.apply_async')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.skill = Skill.objects.create(name='Django')
+        self.project = Project.objects.create(
+            title='Portfolio',
+            short_tagline='Tagline',
+            description_short='Short',
+            start_date=date(2024, 1, 1),
+            visibility='public',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.skills.add(self.skill)
+
+    def project_data(self, **context):
+        return ProjectListSerializer(Project.objects.get(pk=self.project.pk), context=context).data
+
+    def skill_data(self):
+        return SkillSerializer(Skill.objects.get(pk=self.skill.pk)).data
+
+    @override_settings(ALLOWED_HOSTS=['example.com', 'other.com'])
+    def test_key_covers_host_pk_and_version_fields(self):
+        serializer = ProjectListSerializer(context={'request': RequestFactory().get('/', HTTP_HOST='example.com')})
+        version = get_fragment_version(ProjectListSerializer)
+        key = serializer.get_fragment_cache_key(self.project, version)
+
+        self.assertIn('http://example.com', key)
+        self.assertIn(f':{self.project.pk}:', key)
+        self.assertTrue(key.endswith(f'{self.project.updated_at}:{self.project.view_count}'))
+        other_host = ProjectListSerializer(context={'request': RequestFactory().get('/', HTTP_HOST='other.com')})
+        self.assertNotEqual(other_host.get_fragment_cache_key(self.project, version), key)
+
+    def test_hit_skips_serialization_and_miss_fills_the_cache(self):
+        with mock.patch.object(ProjectListSerializer, 'serialize_fragment', autospec=True,
+                               side_effect=ProjectListSerializer.serialize_fragment) as serialize:
+            first = self.project_data()
+            second = self.project_data()
+            self.assertEqual(serialize.call_count, 1)
+
+            Project.objects.filter(pk=self.project.pk).update(view_count=5)
+            self.assertEqual(self.project_data()['view_count'], 5)
+            self.assertEqual(serialize.call_count, 2)
+        self.assertEqual(first, second)
+
+    def test_list_serializer_batches_hits(self):
+        ProjectListSerializer(Project.objects.all(), many=True).data
+        projects = list(Project.objects.all())
+        with self.assertNumQueries(0):
+            data = ProjectListSerializer(projects, many=True).data
+        self.assertEqual([item['title'] for item in data], ['Portfolio'])
+
+    def test_project_save_refreshes_skill_fragments(self):
+        self.assertEqual(self.skill_data()['project_count'], 1)
+
+        self.project.visibility = 'private'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+
+        self.assertEqual(self.skill_data()['project_count'], 0)
+
+    def test_skill_changes_refresh_project_fragments(self):
+        self.assertEqual([skill['name'] for skill in self.project_data()['skills']], ['Django'])
+
+        added = Skill.objects.create(name='Celery')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.skills.add(added)
+        self.assertEqual(sorted(skill['name'] for skill in self.project_data()['skills']), ['Celery', 'Django'])
+
+        self.skill.name = 'Django REST'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.skill.save()
+        self.assertIn('Django REST', [skill['name'] for skill in self.project_data()['skills']])
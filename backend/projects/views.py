@@ -17,7 +17,7 @@ from .serializers import (
 
 class SkillViewSet(viewsets.ReadOnlyModelViewSet):
     """Skills API endpoints"""
-    queryset = Skill.objects.filter(projects__visibility='public').distinct()
+    queryset = Skill.objects.filter(public_project_count__gt=0)
     serializer_class = SkillSerializer
     lookup_field = 'slug'
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -37,7 +37,10 @@ class ProjectListView(generics.ListAPIView):
     ordering = ['-is_featured', 'order', '-start_date']
     
     def get_queryset(self):
-        return Project.objects.filter(visibility='public').prefetch_related('skills')
+        return (Project.objects
+                .filter(visibility='public')
+                .select_related('case_study')
+                .prefetch_related('skills'))
 
 
 class ProjectDetailView(generics.RetrieveAPIView):